@@ -8,14 +8,45 @@ from argus.core.clock import monotonic_ns
 from argus.core.events import TraceEvent
 from argus.core.tracer import Tracer
 from argus.exporters.chrome import export_chrome_trace
+from argus.importers.chrome import load_chrome_columns
 
 if TYPE_CHECKING:
     from pathlib import Path
 
-__all__ = ["TraceEvent", "Tracer", "export_chrome", "monotonic_ns"]
+__all__ = ["TraceEvent", "Tracer", "export_chrome", "load_chrome", "monotonic_ns"]
 
 __version__ = "0.1.0"
 
 
-def export_chrome(tracer: Tracer, dest: str | Path | IO[str]) -> None:
-    export_chrome_trace(tracer.events, dest)
+def export_chrome(
+    tracer: Tracer,
+    dest: str | Path | IO[str],
+    pid: int = 1,
+    max_counter_samples: int | None = None,
+) -> None:
+    """Write the tracer's events and counter tracks as a Chrome trace."""
+    export_chrome_trace(
+        tracer.iter_events(),
+        dest,
+        pid,
+        counters=tracer.counters.values(),
+        max_counter_samples=max_counter_samples,
+    )
+
+
+def load_chrome(source: str | Path | IO[str], streaming: bool = False) -> Tracer:
+    """Load a Chrome trace written by export_chrome into a new Tracer."""
+    tracer = Tracer()
+    cols = load_chrome_columns(source, streaming=streaming)
+    tracer.record_events(
+        cols.name,
+        cols.start_ns,
+        cols.end_ns,
+        cols.category,
+        cols.scope,
+        parents=cols.parent_id,
+        token_indices=cols.token_index,
+        metadata=cols.metadata,
+        event_ids=cols.event_id,
+    )
+    return tracer
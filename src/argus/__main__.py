@@ -0,0 +1,7 @@
+from __future__ import annotations
+
+import sys
+
+from argus.cli import main
+
+sys.exit(main())
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from argus.core.events import TraceEvent
+
+UNTRACED = "untraced"
+
+
+@dataclass(frozen=True, slots=True)
+class TokenBreakdown:
+    """Where one token_generate span's time went."""
+
+    token_index: int | None
+    duration_ns: int
+    # total time of direct child spans, by name
+    children_ns: dict[str, int] = field(default_factory=dict)
+    # time inside the token span not covered by any direct child
+    untraced_ns: int = 0
+
+    @property
+    def untraced_fraction(self) -> float:
+        return self.untraced_ns / self.duration_ns if self.duration_ns else 0.0
+
+
+def token_breakdown(events: Iterable[TraceEvent]) -> list[TokenBreakdown]:
+    """Split every token span into its direct children and the untraced gap.
+
+    Overlapping children are merged before computing the gap, so it never
+    goes negative. Tokens are returned in start order.
+    """
+    events = list(events)
+    tokens = {e.event_id: e for e in events if e.category == "token"}
+    children: dict[str, list[TraceEvent]] = {eid: [] for eid in tokens}
+    for e in events:
+        if e.parent_id in children and e.end_ns > e.start_ns:
+            children[e.parent_id].append(e)
+    out = []
+    for token in sorted(tokens.values(), key=lambda e: e.start_ns):
+        kids = sorted(children[token.event_id], key=lambda e: e.start_ns)
+        by_name: dict[str, int] = {}
+        covered = 0
+        cursor = token.start_ns
+        for kid in kids:
+            by_name[kid.name] = by_name.get(kid.name, 0) + kid.duration_ns
+            start = max(kid.start_ns, cursor)
+            end = min(kid.end_ns, token.end_ns)
+            if end > start:
+                covered += end - start
+                cursor = end
+        out.append(
+            TokenBreakdown(
+                token_index=token.token_index,
+                duration_ns=token.duration_ns,
+                children_ns=by_name,
+                untraced_ns=max(0, token.duration_ns - covered),
+            )
+        )
+    return out
+
+
+def summarize_breakdown(rows: Iterable[TokenBreakdown]) -> dict[str, float]:
+    """Mean ns per token for each child span name, "untraced" and "total".
+
+    A child missing from some tokens counts as 0 for them, so the parts add
+    up to the total (up to overlap between children).
+    """
+    rows = list(rows)
+    if not rows:
+        return {}
+    sums: dict[str, int] = {}
+    for row in rows:
+        for name, ns in row.children_ns.items():
+            sums[name] = sums.get(name, 0) + ns
+    sums[UNTRACED] = sum(row.untraced_ns for row in rows)
+    sums["total"] = sum(row.duration_ns for row in rows)
+    return {name: total / len(rows) for name, total in sums.items()}
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from argus.core.cputime import PROCESS_CPU_NS, THREAD_CPU_NS
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from argus.core.events import TraceEvent
+
+
+@dataclass(frozen=True, slots=True)
+class WaitBoundSpan:
+    """A span that spent much of its wall time off the CPU."""
+
+    event: TraceEvent
+    cpu_ns: int
+    # wall time not accounted for by CPU time
+    wait_ns: int
+
+    @property
+    def cpu_ratio(self) -> float:
+        return self.cpu_ns / self.event.duration_ns if self.event.duration_ns else 0.0
+
+
+def wait_bound_spans(
+    events: Iterable[TraceEvent],
+    max_ratio: float = 0.5,
+    min_duration_ns: int = 100_000,
+    process: bool = False,
+) -> list[WaitBoundSpan]:
+    """Spans whose CPU/wall ratio is at most `max_ratio`, most waiting first.
+
+    Reads the CPU times recorded by CpuTimeTracer: the thread's by default,
+    the whole process's with `process` (needs CpuTimeTracer(process=True)).
+    Spans shorter than `min_duration_ns` or without CPU times are skipped.
+    """
+    key = PROCESS_CPU_NS if process else THREAD_CPU_NS
+    out = []
+    for e in events:
+        cpu = e.metadata.get(key)
+        duration = e.duration_ns
+        if cpu is None or duration < min_duration_ns:
+            continue
+        if cpu <= max_ratio * duration:
+            out.append(WaitBoundSpan(e, cpu, duration - cpu))
+    out.sort(key=lambda s: s.wait_ns, reverse=True)
+    return out
@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import math
+import random
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any, cast
+
+from argus.core.events import normalize_scope
+from argus.importers.chrome import iter_chrome_events
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+SpanKey = tuple[str, str]
+
+DEFAULT_RESERVOIR_SIZE = 2048
+
+
+class _Accumulator:
+    """Streaming latency summary: exact count/mean/min/max plus a bounded reservoir."""
+
+    __slots__ = ("count", "total_ns", "min_ns", "max_ns", "reservoir", "_capacity", "_rng")
+
+    def __init__(self, capacity: int, rng: random.Random) -> None:
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = 0
+        self.max_ns = 0
+        self.reservoir: list[int] = []
+        self._capacity = capacity
+        self._rng = rng
+
+    def add(self, duration_ns: int) -> None:
+        self.count += 1
+        self.total_ns += duration_ns
+        if self.count == 1 or duration_ns < self.min_ns:
+            self.min_ns = duration_ns
+        if duration_ns > self.max_ns:
+            self.max_ns = duration_ns
+        if len(self.reservoir) < self._capacity:
+            self.reservoir.append(duration_ns)
+        else:
+            j = self._rng.randrange(self.count)
+            if j < self._capacity:
+                self.reservoir[j] = duration_ns
+
+    def summary(self) -> SpanSummary:
+        ordered = sorted(self.reservoir)
+        return SpanSummary(
+            count=self.count,
+            mean_ns=self.total_ns / self.count if self.count else 0.0,
+            min_ns=self.min_ns,
+            max_ns=self.max_ns,
+            p50_ns=_quantile(ordered, 0.50),
+            p90_ns=_quantile(ordered, 0.90),
+            p99_ns=_quantile(ordered, 0.99),
+        )
+
+
+def _quantile(ordered: list[int], q: float) -> float:
+    if not ordered:
+        return 0.0
+    idx = q * (len(ordered) - 1)
+    lo = math.floor(idx)
+    hi = math.ceil(idx)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (idx - lo)
+
+
+@dataclass(frozen=True, slots=True)
+class SpanSummary:
+    count: int
+    mean_ns: float
+    min_ns: int
+    max_ns: int
+    p50_ns: float
+    p90_ns: float
+    p99_ns: float
+
+
+@dataclass(frozen=True, slots=True)
+class SpanComparison:
+    """Baseline vs candidate latency for one (name, normalized scope) key."""
+
+    name: str
+    scope: str
+    baseline: SpanSummary
+    candidate: SpanSummary
+    ratio: float
+    p_value: float
+    regressed: bool
+    improved: bool
+
+    @property
+    def delta_ns(self) -> float:
+        return self.candidate.p50_ns - self.baseline.p50_ns
+
+
+@dataclass(frozen=True, slots=True)
+class TraceDiff:
+    comparisons: list[SpanComparison]
+    only_in_baseline: list[SpanKey] = field(default_factory=list)
+    only_in_candidate: list[SpanKey] = field(default_factory=list)
+
+    @property
+    def regressions(self) -> list[SpanComparison]:
+        return [c for c in self.comparisons if c.regressed]
+
+    @property
+    def improvements(self) -> list[SpanComparison]:
+        return [c for c in self.comparisons if c.improved]
+
+
+def mann_whitney_u(a: list[int], b: list[int]) -> float:
+    """One-sided Mann-Whitney U test that `b` is stochastically larger than `a`.
+
+    Returns the p-value from the tie-corrected normal approximation.
+    """
+    n1 = len(a)
+    n2 = len(b)
+    if n1 == 0 or n2 == 0:
+        return 1.0
+    pooled = sorted([(v, 0) for v in a] + [(v, 1) for v in b])
+    n = n1 + n2
+    rank_sum_b = 0.0
+    tie_term = 0.0
+    i = 0
+    while i < n:
+        j = i
+        while j + 1 < n and pooled[j + 1][0] == pooled[i][0]:
+            j += 1
+        avg_rank = (i + j) / 2 + 1
+        ties = j - i + 1
+        if ties > 1:
+            tie_term += ties**3 - ties
+        for k in range(i, j + 1):
+            if pooled[k][1] == 1:
+                rank_sum_b += avg_rank
+        i = j + 1
+    u_b = rank_sum_b - n2 * (n2 + 1) / 2
+    mean_u = n1 * n2 / 2
+    var_u = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if var_u <= 0:
+        return 1.0
+    # continuity correction towards the null
+    z = (u_b - mean_u - 0.5) / math.sqrt(var_u)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def _span_durations(
+    source: str | Path | IO[str] | Iterable[dict[str, Any]],
+) -> Iterable[tuple[SpanKey, int]]:
+    events: Iterable[dict[str, Any]]
+    # IO has no runtime class to narrow on, so tell a file from parsed events by read()
+    if isinstance(source, (str, Path)) or hasattr(source, "read"):
+        events = iter_chrome_events(cast("str | Path | IO[str]", source))
+    else:
+        events = source
+    for ev in events:
+        if ev.get("ph") != "X":
+            continue
+        args = ev.get("args") or {}
+        scope = normalize_scope(str(args.get("scope", "")))
+        yield (ev.get("name", ""), scope), round(ev.get("dur", 0) * 1_000)
+
+
+def _accumulate_spans(
+    source: str | Path | IO[str] | Iterable[dict[str, Any]],
+    reservoir_size: int = DEFAULT_RESERVOIR_SIZE,
+    seed: int = 0,
+) -> dict[SpanKey, _Accumulator]:
+    """Stream a Chrome trace into per-(name, normalized scope) latency accumulators."""
+    rng = random.Random(seed)
+    accumulators: dict[SpanKey, _Accumulator] = {}
+    for key, dur_ns in _span_durations(source):
+        acc = accumulators.get(key)
+        if acc is None:
+            acc = accumulators[key] = _Accumulator(reservoir_size, rng)
+        acc.add(dur_ns)
+    return accumulators
+
+
+def diff_traces(
+    baseline: str | Path | IO[str] | Iterable[dict[str, Any]],
+    candidate: str | Path | IO[str] | Iterable[dict[str, Any]],
+    threshold: float = 0.05,
+    alpha: float = 0.01,
+    min_count: int = 5,
+    min_delta_ns: int = 1_000,
+    reservoir_size: int = DEFAULT_RESERVOIR_SIZE,
+) -> TraceDiff:
+    """Compare span latency distributions between two Chrome traces.
+
+    A span key regresses when its median slows down by more than `threshold`
+    (relative) and `min_delta_ns` (absolute), and a one-sided Mann-Whitney U
+    test rejects "no slowdown" at level `alpha`. Keys with fewer than
+    `min_count` samples on either side are reported but never flagged.
+    Both traces are streamed; memory is bounded by keys x `reservoir_size`.
+    """
+    base = _accumulate_spans(baseline, reservoir_size)
+    cand = _accumulate_spans(candidate, reservoir_size)
+
+    comparisons: list[SpanComparison] = []
+    for key in sorted(base.keys() & cand.keys()):
+        b_acc = base[key]
+        c_acc = cand[key]
+        b_sum = b_acc.summary()
+        c_sum = c_acc.summary()
+        if b_sum.p50_ns > 0:
+            ratio = c_sum.p50_ns / b_sum.p50_ns
+        else:
+            ratio = 1.0 if c_sum.p50_ns == 0 else math.inf
+        delta = c_sum.p50_ns - b_sum.p50_ns
+        testable = b_acc.count >= min_count and c_acc.count >= min_count
+        p_slower = mann_whitney_u(b_acc.reservoir, c_acc.reservoir) if testable else 1.0
+        p_faster = mann_whitney_u(c_acc.reservoir, b_acc.reservoir) if testable else 1.0
+        regressed = p_slower < alpha and ratio > 1 + threshold and delta > min_delta_ns
+        improved = p_faster < alpha and ratio < 1 - threshold and -delta > min_delta_ns
+        comparisons.append(
+            SpanComparison(
+                name=key[0],
+                scope=key[1],
+                baseline=b_sum,
+                candidate=c_sum,
+                ratio=ratio,
+                p_value=p_faster if improved else p_slower,
+                regressed=regressed,
+                improved=improved,
+            )
+        )
+    return TraceDiff(
+        comparisons=comparisons,
+        only_in_baseline=sorted(base.keys() - cand.keys()),
+        only_in_candidate=sorted(cand.keys() - base.keys()),
+    )
+
+
+def format_diff(diff: TraceDiff, all_spans: bool = False) -> str:
+    rows = diff.comparisons if all_spans else diff.regressions + diff.improvements
+    lines = [
+        f"{'span':<40} {'scope':<32} {'base p50 us':>12} {'cand p50 us':>12} "
+        f"{'ratio':>7} {'p-value':>9}  status"
+    ]
+    for c in rows:
+        status = "REGRESSED" if c.regressed else "improved" if c.improved else "ok"
+        lines.append(
+            f"{c.name:<40} {c.scope:<32} {c.baseline.p50_ns / 1_000:>12.2f} "
+            f"{c.candidate.p50_ns / 1_000:>12.2f} {c.ratio:>7.3f} {c.p_value:>9.2g}  {status}"
+        )
+    for name, scope in diff.only_in_baseline:
+        lines.append(f"{name:<40} {scope:<32} only in baseline")
+    for name, scope in diff.only_in_candidate:
+        lines.append(f"{name:<40} {scope:<32} only in candidate")
+    lines.append(
+        f"{len(diff.regressions)} regression(s), {len(diff.improvements)} improvement(s) "
+        f"across {len(diff.comparisons)} matched span(s)"
+    )
+    return "\n".join(lines)
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import sys
+from dataclasses import asdict
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from argus.analysis.diff import SpanComparison
+
+
+def _comparison_json(comparison: SpanComparison) -> dict[str, Any]:
+    data = asdict(comparison)
+    # a span whose baseline median is 0 has an infinite ratio, which JSON can't hold
+    if not math.isfinite(data["ratio"]):
+        data["ratio"] = None
+    return data
+
+
+def _cmd_diff(args: argparse.Namespace) -> int:
+    from argus.analysis.diff import diff_traces, format_diff
+
+    diff = diff_traces(
+        args.baseline,
+        args.candidate,
+        threshold=args.threshold,
+        alpha=args.alpha,
+        min_count=args.min_count,
+        min_delta_ns=args.min_delta_ns,
+    )
+    if args.json:
+        json.dump(
+            {
+                "comparisons": [_comparison_json(c) for c in diff.comparisons],
+                "only_in_baseline": diff.only_in_baseline,
+                "only_in_candidate": diff.only_in_candidate,
+                "regressions": len(diff.regressions),
+            },
+            sys.stdout,
+            allow_nan=False,
+        )
+        sys.stdout.write("\n")
+    else:
+        print(format_diff(diff, all_spans=args.all))
+    return 1 if diff.regressions else 0
+
+
+def _cmd_merge(args: argparse.Namespace) -> int:
+    from argus.exporters.merge import merge_chrome_traces
+
+    processes = merge_chrome_traces(
+        args.inputs,
+        args.output,
+        process_names=args.name or None,
+        align=args.align,
+    )
+    for p in processes:
+        print(f"pid {p.pid:<4} {p.name:<24} offset {p.offset_ns / 1_000:+.3f} us  {p.source}")
+    return 0
+
+
+def _cmd_split(args: argparse.Namespace) -> int:
+    from argus.exporters.split import split_chrome_trace
+    from argus.importers.chrome import iter_chrome_trace
+
+    chunks = split_chrome_trace(
+        iter_chrome_trace(args.input),
+        args.output,
+        window_ns=round(args.window_ms * 1e6) if args.window_ms is not None else None,
+        max_events=args.max_events,
+        max_workers=args.jobs,
+        compression=args.compress,
+        level=args.level,
+    )
+    for c in chunks:
+        span_ms = (c.end_ns - c.start_ns) / 1e6
+        print(f"{c.file}  {c.num_events:>9} events  {span_ms:10.3f} ms  {','.join(c.phases)}")
+    return 0
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="argus", description="Argus trace tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    diff = sub.add_parser(
+        "diff",
+        help="compare span latencies between two Chrome traces",
+        description="Exit status is 1 when any span regressed, 0 otherwise.",
+    )
+    diff.add_argument("baseline")
+    diff.add_argument("candidate")
+    diff.add_argument("--threshold", type=float, default=0.05, help="relative p50 slowdown")
+    diff.add_argument("--alpha", type=float, default=0.01, help="significance level")
+    diff.add_argument("--min-count", type=int, default=5, help="samples needed per side")
+    diff.add_argument("--min-delta-ns", type=int, default=1_000, help="absolute p50 slowdown")
+    diff.add_argument("--all", action="store_true", help="show unchanged spans too")
+    diff.add_argument("--json", action="store_true", help="machine-readable output")
+    diff.set_defaults(func=_cmd_diff)
+
+    merge = sub.add_parser("merge", help="merge per-process traces into one timeline")
+    merge.add_argument("inputs", nargs="+")
+    merge.add_argument("-o", "--output", required=True)
+    merge.add_argument("--name", action="append", help="process name, once per input in order")
+    merge.add_argument(
+        "--align",
+        choices=("wall", "barrier", "none"),
+        default="wall",
+        help="clock alignment using each trace's clock_handshake event",
+    )
+    merge.set_defaults(func=_cmd_merge)
+
+    split = sub.add_parser("split", help="split a large trace into time-ordered chunks")
+    split.add_argument("input")
+    split.add_argument("-o", "--output", required=True, help="output directory")
+    size = split.add_mutually_exclusive_group(required=True)
+    size.add_argument("--window-ms", type=float, help="chunk width in milliseconds")
+    size.add_argument("--max-events", type=int, help="events per chunk")
+    split.add_argument("-j", "--jobs", type=int, help="writer processes (default: CPU count)")
+    split.add_argument("--compress", choices=("gzip", "xz"), help="compress each chunk")
+    split.add_argument("--level", type=int, help="gzip level or xz preset")
+    split.set_defaults(func=_cmd_split)
+
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = _build_parser().parse_args(argv)
+    return int(args.func(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,3 +9,32 @@ def monotonic_ns() -> int:
     Wraps time.monotonic_ns() so a future C extension can replace it.
     """
     return time.monotonic_ns()
+
+
+def clock_pair(samples: int = 7) -> tuple[int, int]:
+    """Read (monotonic_ns, wall_ns) as close to simultaneously as possible.
+
+    Brackets time.time_ns() between two monotonic reads and keeps the sample
+    with the tightest bracket, returning its midpoint.
+    """
+    best_width = -1
+    best = (0, 0)
+    for _ in range(samples):
+        before = monotonic_ns()
+        wall = time.time_ns()
+        after = monotonic_ns()
+        width = after - before
+        if best_width < 0 or width < best_width:
+            best_width = width
+            best = (before + width // 2, wall)
+    return best
+
+
+def thread_cpu_ns() -> int:
+    """CPU time consumed by the calling thread, for CPU/wall ratios of spans."""
+    return time.thread_time_ns()
+
+
+def process_cpu_ns() -> int:
+    """CPU time consumed by all threads of the process."""
+    return time.process_time_ns()
@@ -0,0 +1,356 @@
+from __future__ import annotations
+
+import math
+from array import array
+from collections import deque
+from typing import TYPE_CHECKING, Any
+
+from argus.core.events import TraceEvent, normalize_scope
+from argus.core.tracer import Tracer
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+# (name, category, normalized scope, parent key); the token span's parent key is None
+_Key = tuple[str, str, str, Any]
+
+
+class _SpanStats:
+    __slots__ = ("first", "start_ns", "end_ns", "durations")
+
+    def __init__(self, first: TraceEvent) -> None:
+        self.first = first
+        self.start_ns = first.start_ns
+        self.end_ns = first.end_ns
+        self.durations: array[int] = array("q")
+
+    def add(self, event: TraceEvent) -> None:
+        self.start_ns = min(self.start_ns, event.start_ns)
+        self.end_ns = max(self.end_ns, event.end_ns)
+        self.durations.append(event.end_ns - event.start_ns)
+
+
+class _Run:
+    """Aggregates of consecutive folded tokens sharing one parent span."""
+
+    __slots__ = ("parent_id", "token_start", "token_end", "spans")
+
+    def __init__(self, parent_id: str | None) -> None:
+        self.parent_id = parent_id
+        self.token_start: int | None = None
+        self.token_end: int | None = None
+        self.spans: dict[_Key, _SpanStats] = {}
+
+    def __len__(self) -> int:
+        root = next(iter(self.spans.values()), None)
+        return len(root.durations) if root is not None else 0
+
+    def add(self, token: TraceEvent, group: list[TraceEvent]) -> None:
+        if self.token_start is None:
+            self.token_start = token.token_index
+        self.token_end = token.token_index
+        keys: dict[str, _Key] = {}
+        token_key: _Key = (token.name, token.category, normalize_scope(token.full_scope), None)
+        keys[token.event_id] = token_key
+        self._add_span(token_key, token)
+        # children close before their parents, so resolve keys parent-first
+        for event in sorted(group, key=lambda e: (e.start_ns, -e.end_ns)):
+            parent_key = keys.get(event.parent_id or "", token_key)
+            key = (event.name, event.category, normalize_scope(event.full_scope), parent_key)
+            keys[event.event_id] = key
+            self._add_span(key, event)
+
+    def _add_span(self, key: _Key, event: TraceEvent) -> None:
+        stats = self.spans.get(key)
+        if stats is None:
+            stats = self.spans[key] = _SpanStats(event)
+        stats.add(event)
+
+    def summaries(self) -> list[TraceEvent]:
+        ids = {key: f"{stats.first.event_id}.summary" for key, stats in self.spans.items()}
+        out = []
+        for key, stats in self.spans.items():
+            durations = sorted(stats.durations)
+            count = len(durations)
+            parent_key = key[3]
+            out.append(
+                TraceEvent(
+                    event_id=ids[key],
+                    name=key[0],
+                    start_ns=stats.start_ns,
+                    end_ns=stats.end_ns,
+                    category=key[1],
+                    scope=key[2],
+                    parent_id=self.parent_id if parent_key is None else ids.get(parent_key),
+                    token_index=self.token_start,
+                    metadata={
+                        "compacted": True,
+                        "count": count,
+                        "token_start": self.token_start,
+                        "token_end": self.token_end,
+                        "min_ns": durations[0],
+                        "mean_ns": sum(durations) / count,
+                        "max_ns": durations[-1],
+                        "p99_ns": durations[max(0, math.ceil(0.99 * count) - 1)],
+                    },
+                )
+            )
+        return out
+
+
+class _Compactor:
+    """Decides per token whether to keep it in full or fold it into the current run."""
+
+    __slots__ = ("keep_first", "max_run", "threshold_ns", "_seen", "run")
+
+    def __init__(self, keep_first: int, max_run: int | None) -> None:
+        self.keep_first = keep_first
+        self.max_run = max_run
+        self.threshold_ns: float = math.inf
+        self._seen: dict[str | None, int] = {}
+        self.run: _Run | None = None
+
+    def fork(self) -> _Compactor:
+        """A compactor with no open run that shares this one's per-parent token counts."""
+        forked = _Compactor(self.keep_first, self.max_run)
+        forked.threshold_ns = self.threshold_ns
+        forked._seen = self._seen
+        return forked
+
+    def close_run(self) -> list[TraceEvent]:
+        run, self.run = self.run, None
+        return run.summaries() if run is not None else []
+
+    def add(self, token: TraceEvent, group: list[TraceEvent]) -> list[TraceEvent]:
+        """Events to emit now: the token's own group if kept, plus any closed run."""
+        seen = self._seen.get(token.parent_id, 0)
+        self._seen[token.parent_id] = seen + 1
+        out: list[TraceEvent] = []
+        run = self.run
+        if run is not None and (
+            run.parent_id != token.parent_id
+            or (self.max_run is not None and len(run) >= self.max_run)
+        ):
+            out += self.close_run()
+            run = None
+        if seen < self.keep_first or token.duration_ns > self.threshold_ns:
+            out += self.close_run()
+            out += group
+            out.append(token)
+            return out
+        if run is None:
+            run = self.run = _Run(token.parent_id)
+        run.add(token, group)
+        return out
+
+
+def _token_groups(
+    events: list[TraceEvent],
+) -> tuple[list[TraceEvent], dict[str, list[TraceEvent]], list[TraceEvent]]:
+    """Split events into token spans, each token's descendants, and everything else."""
+    by_id = {e.event_id: e for e in events}
+    owner: dict[str, str | None] = {}
+
+    def token_of(event: TraceEvent) -> str | None:
+        chain = []
+        current: TraceEvent | None = event
+        found: str | None = None
+        while current is not None:
+            if current.event_id in owner:
+                found = owner[current.event_id]
+                break
+            if current.category == "token":
+                found = current.event_id
+                break
+            chain.append(current.event_id)
+            current = by_id.get(current.parent_id) if current.parent_id is not None else None
+        for eid in chain:
+            owner[eid] = found
+        return found
+
+    tokens = []
+    groups: dict[str, list[TraceEvent]] = {}
+    rest = []
+    for e in events:
+        if e.category == "token":
+            tokens.append(e)
+            continue
+        token_id = token_of(e)
+        if token_id is None:
+            rest.append(e)
+        else:
+            groups.setdefault(token_id, []).append(e)
+    return tokens, groups, rest
+
+
+def compact_events(
+    events: Iterable[TraceEvent],
+    keep_first: int = 16,
+    outlier_factor: float = 2.0,
+    outlier_ns: int | None = None,
+    max_run: int | None = None,
+) -> list[TraceEvent]:
+    """Fold repetitive per-token spans into summary spans over token ranges.
+
+    Token spans (category "token") and their descendants are kept in full for
+    the first `keep_first` tokens under each parent, and for any token slower
+    than `outlier_ns` (default: `outlier_factor` x the median token duration).
+    Runs of the remaining tokens become one summary span per distinct span in
+    the token's subtree (same name, category and scope with indices replaced by
+    '*'), nested like the originals. Summaries carry "compacted": True plus
+    count, token_start/token_end, and min/mean/max/p99 durations in ns;
+    instants fold the same way. Counter tracks (Tracer.counter) are not
+    events and are left as they are. A run ends at a kept token, a change
+    of parent span, or after `max_run` tokens.
+    """
+    events = list(events)
+    tokens, groups, rest = _token_groups(events)
+    tokens.sort(key=lambda e: e.start_ns)
+    compactor = _Compactor(keep_first, max_run)
+    if outlier_ns is not None:
+        compactor.threshold_ns = outlier_ns
+    elif tokens:
+        durations = sorted(t.duration_ns for t in tokens)
+        compactor.threshold_ns = outlier_factor * durations[len(durations) // 2]
+    out = rest
+    for token in tokens:
+        out += compactor.add(token, groups.get(token.event_id, []))
+    out += compactor.close_run()
+    return out
+
+
+class _CompactingBuffer(list[TraceEvent]):
+    """Event list that routes appends through its CompactingTracer.
+
+    The compactor and the events held for the open token span belong to the
+    buffer, so swapping buffers swaps them too.
+    """
+
+    __slots__ = ("_tracer", "compactor", "pending")
+
+    def __init__(self, tracer: CompactingTracer, compactor: _Compactor) -> None:
+        super().__init__()
+        self._tracer = tracer
+        self.compactor = compactor
+        self.pending: list[TraceEvent] = []
+
+    def append(self, event: TraceEvent) -> None:
+        self._tracer._on_event(self, event)
+
+    def extend(self, events: Iterable[TraceEvent]) -> None:
+        for event in events:
+            self._tracer._on_event(self, event)
+
+    def finish(self) -> None:
+        list.extend(self, self.pending)
+        self.pending = []
+        list.extend(self, self.compactor.close_run())
+
+
+class CompactingTracer(Tracer):
+    """Tracer that compacts per-token spans as they are recorded (see compact_events).
+
+    Events recorded while a span is open are held until the enclosing token
+    span closes; the token's group is then either stored in full or folded into
+    the current run. The outlier threshold is `outlier_factor` x the median of
+    the last `window` token durations unless `outlier_ns` is given. Listeners
+    still see every event. `events` includes a provisional summary of the open
+    run; `finish()` closes it.
+    """
+
+    __slots__ = ("_recent", "_outlier_factor", "_outlier_ns")
+
+    _events: _CompactingBuffer
+
+    def __init__(
+        self,
+        keep_first: int = 16,
+        outlier_factor: float = 2.0,
+        outlier_ns: int | None = None,
+        max_run: int | None = None,
+        window: int = 256,
+    ) -> None:
+        super().__init__()
+        compactor = _Compactor(keep_first, max_run)
+        if outlier_ns is not None:
+            compactor.threshold_ns = outlier_ns
+        self._events = _CompactingBuffer(self, compactor)
+        self._recent: deque[int] = deque(maxlen=window)
+        self._outlier_factor = outlier_factor
+        self._outlier_ns = outlier_ns
+
+    def _on_event(self, buffer: _CompactingBuffer, event: TraceEvent) -> None:
+        if event.category == "token":
+            pending = buffer.pending
+            group = [
+                e for e in pending if e.start_ns >= event.start_ns and e.end_ns <= event.end_ns
+            ]
+            if len(group) != len(pending):
+                grouped = {id(e) for e in group}
+                list.extend(buffer, (e for e in pending if id(e) not in grouped))
+            buffer.pending = []
+            compactor = buffer.compactor
+            if self._outlier_ns is None and self._recent:
+                recent = sorted(self._recent)
+                compactor.threshold_ns = self._outlier_factor * recent[len(recent) // 2]
+            self._recent.append(event.duration_ns)
+            list.extend(buffer, compactor.add(event, group))
+        elif self._parent_stack:
+            buffer.pending.append(event)
+        else:
+            if buffer.pending:
+                list.extend(buffer, buffer.pending)
+                buffer.pending = []
+            list.append(buffer, event)
+
+    def finish(self) -> None:
+        """Close the open run and store any held events."""
+        self._events.finish()
+
+    def iter_events(self) -> Iterator[TraceEvent]:
+        buffer = self._events
+        yield from list(buffer)
+        yield from list(buffer.pending)
+        run = buffer.compactor.run
+        if run is not None:
+            yield from run.summaries()
+
+    @property
+    def events(self) -> list[TraceEvent]:
+        return list(self.iter_events())
+
+    def get_events(
+        self,
+        category: str | None = None,
+        token_index: int | None = None,
+    ) -> list[TraceEvent]:
+        return [
+            e
+            for e in self.iter_events()
+            if (category is None or e.category == category)
+            and (token_index is None or e.token_index == token_index)
+        ]
+
+    def swap_events(self) -> list[TraceEvent]:
+        """Detach the recorded events and start a fresh buffer.
+
+        The new buffer (with its own compactor and held events) replaces the
+        old one in a single assignment, as in Tracer.swap_events. The old
+        buffer's open run and held events are then closed into it, so a run is
+        cut at every swap and events held for a token span still open at the
+        swap are returned without it. Tokens already seen keep counting
+        towards `keep_first`.
+        """
+        old = self._events
+        self._events = _CompactingBuffer(self, old.compactor.fork())
+        old.finish()
+        return old
+
+    def reset(self) -> None:
+        compactor = self._events.compactor
+        super().reset()
+        fresh = _Compactor(compactor.keep_first, compactor.max_run)
+        if self._outlier_ns is not None:
+            fresh.threshold_ns = self._outlier_ns
+        self._events = _CompactingBuffer(self, fresh)
+        self._recent.clear()
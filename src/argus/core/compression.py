@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import gzip
+import io
+import lzma
+import queue
+import threading
+from contextlib import ExitStack
+from pathlib import Path
+from typing import IO, cast
+
+COMPRESSIONS = frozenset({"gzip", "xz"})
+_SUFFIXES = {".gz": "gzip", ".xz": "xz"}
+SUFFIX_FOR = {"gzip": ".gz", "xz": ".xz"}
+_GZIP_MAGIC = b"\x1f\x8b"
+_XZ_MAGIC = b"\xfd7zXZ\x00"
+# zlib's usual speed/size trade-off; xz's own default preset
+_DEFAULT_LEVELS = {"gzip": 6, "xz": 6}
+
+
+def compression_for(path: str | Path) -> str | None:
+    """The compression implied by a path's suffix: "gzip" for .gz, "xz" for .xz, else None."""
+    return _SUFFIXES.get(Path(path).suffix.lower())
+
+
+def open_trace(path: str | Path) -> IO[str]:
+    """Open a trace file for reading as text, decompressing gzip or xz if needed.
+
+    The format is detected from the file's magic bytes, not its name.
+    """
+    with open(path, "rb") as f:
+        magic = f.read(len(_XZ_MAGIC))
+    if magic.startswith(_GZIP_MAGIC):
+        return gzip.open(path, "rt", encoding="utf-8")
+    if magic.startswith(_XZ_MAGIC):
+        return lzma.open(path, "rt", encoding="utf-8")
+    return open(path)
+
+
+class CompressedWriter(io.TextIOBase):
+    """Write-only text stream that compresses into `path` on a background thread.
+
+    write() only buffers; every `buffer_size` characters the buffer is encoded
+    and queued, and a worker thread feeds it to gzip or xz (both release the
+    GIL while compressing). At most `max_pending` buffers are queued, beyond
+    that write() waits for the worker. gzip output has mtime 0, so identical
+    traces compress to identical files.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        compression: str,
+        level: int | None = None,
+        buffer_size: int = 1 << 20,
+        max_pending: int = 4,
+    ) -> None:
+        if compression not in COMPRESSIONS:
+            raise ValueError(
+                f"Unknown compression '{compression}', expected one of {sorted(COMPRESSIONS)}"
+            )
+        if level is None:
+            level = _DEFAULT_LEVELS[compression]
+        with ExitStack() as stack:
+            raw = stack.enter_context(open(path, "wb"))
+            self._stream: gzip.GzipFile | lzma.LZMAFile
+            if compression == "gzip":
+                self._stream = stack.enter_context(
+                    gzip.GzipFile(filename="", mode="wb", fileobj=raw, compresslevel=level, mtime=0)
+                )
+            else:
+                self._stream = stack.enter_context(lzma.LZMAFile(raw, "wb", preset=level))
+            # closes the compressor, then the file; kept open past this block
+            self._files = stack.pop_all()
+        self._buffer: list[str] = []
+        self._buffered = 0
+        self._buffer_size = buffer_size
+        self._queue: queue.Queue[bytes | None] = queue.Queue(max_pending)
+        self._error: BaseException | None = None
+        self._thread = threading.Thread(target=self._run, name="argus-compress", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while (data := self._queue.get()) is not None:
+            if self._error is None:
+                try:
+                    self._stream.write(data)
+                except BaseException as exc:  # re-raised on the writing thread
+                    self._error = exc
+
+    def _submit(self) -> None:
+        if self._error is not None:
+            raise self._error
+        self._queue.put("".join(self._buffer).encode())
+        self._buffer = []
+        self._buffered = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, s: str) -> int:
+        self._buffer.append(s)
+        self._buffered += len(s)
+        if self._buffered >= self._buffer_size:
+            self._submit()
+        return len(s)
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        try:
+            if self._buffer:
+                self._submit()
+        finally:
+            self._queue.put(None)
+            self._thread.join()
+            try:
+                self._files.close()
+            finally:
+                super().close()
+        if self._error is not None:
+            raise self._error
+
+
+def open_trace_for_write(
+    path: str | Path,
+    compression: str | None = "auto",
+    level: int | None = None,
+) -> IO[str]:
+    """Open `path` for writing a trace, compressed on a background thread if requested.
+
+    compression="auto" picks gzip or xz from the suffix (.gz, .xz) and plain
+    text otherwise; None always writes plain text.
+    """
+    if compression == "auto":
+        compression = compression_for(path)
+    if compression is None:
+        return open(path, "w")
+    return cast("IO[str]", CompressedWriter(path, compression, level))
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+
+class CounterTrack:
+    """Samples of one named counter, stored as parallel arrays.
+
+    timestamps is an int64 array; each series has its own array of values,
+    int64 while every sample is an int and float64 from the first float on.
+    The series names are fixed by the first sample.
+    """
+
+    __slots__ = ("name", "timestamps", "series")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.timestamps: array[int] = array("q")
+        # array("q") or array("d"); int samples may land in either
+        self.series: dict[str, array[Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def append(self, ts_ns: int, values: dict[str, float]) -> None:
+        series = self.series
+        if not series:
+            if not values:
+                raise ValueError(f"Counter '{self.name}' needs at least one value")
+            for key, value in values.items():
+                series[key] = array("q" if isinstance(value, int) else "d")
+        elif values.keys() != series.keys():
+            raise ValueError(
+                f"Counter '{self.name}' expects series {sorted(series)}, got {sorted(values)}"
+            )
+        for key, value in values.items():
+            column = series[key]
+            if column.typecode == "q" and not isinstance(value, int):
+                column = series[key] = array("d", column)
+            column.append(value)
+        self.timestamps.append(ts_ns)
+
+    def last(self) -> dict[str, float] | None:
+        """The most recent sample, or None if there is none."""
+        if not self.timestamps:
+            return None
+        return {key: column[-1] for key, column in self.series.items()}
+
+    def since(self, start: int) -> CounterTrack:
+        """A copy holding the samples from index `start` on."""
+        end = len(self.timestamps)  # appended last, so every series has `end` values
+        track = CounterTrack(self.name)
+        track.timestamps = self.timestamps[start:end]
+        track.series = {key: column[start:end] for key, column in self.series.items()}
+        return track
+
+    def window(self, start_ns: int, end_ns: int) -> CounterTrack:
+        """A copy holding the samples in [start_ns, end_ns), timestamps being in order.
+
+        Like a span clipped to a window, the counter's value at start_ns (its
+        last earlier sample) is kept as a first sample stamped start_ns, so the
+        window shows the counter from its start.
+        """
+        ts = self.timestamps
+        lo = bisect_left(ts, start_ns)
+        hi = max(lo, bisect_left(ts, end_ns))
+        track = CounterTrack(self.name)
+        track.timestamps = ts[lo:hi]
+        track.series = {key: column[lo:hi] for key, column in self.series.items()}
+        if lo > 0 and (lo == hi or ts[lo] != start_ns):
+            track.timestamps.insert(0, start_ns)
+            for key, column in track.series.items():
+                column.insert(0, self.series[key][lo - 1])
+        return track
+
+    def samples(self, max_samples: int | None = None) -> Iterator[tuple[int, dict[str, float]]]:
+        """Yield (ts_ns, {series: value}) in order, downsampled to at most `max_samples`.
+
+        Downsampling cuts the samples into equal runs of consecutive samples
+        and yields one per run, stamped with the run's last timestamp and
+        holding each series' maximum over the run, so peaks survive.
+        """
+        n = len(self.timestamps)
+        names = list(self.series)
+        columns = [self.series[k] for k in names]
+        if max_samples is None or n <= max_samples:
+            for i in range(n):
+                yield self.timestamps[i], {k: c[i] for k, c in zip(names, columns, strict=True)}
+            return
+        if max_samples <= 0:
+            raise ValueError("max_samples must be positive")
+        step = -(-n // max_samples)
+        for lo in range(0, n, step):
+            hi = min(lo + step, n)
+            peaks = {k: max(c[lo:hi]) for k, c in zip(names, columns, strict=True)}
+            yield self.timestamps[hi - 1], peaks
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import os
+from typing import Any
+
+from argus.core.clock import monotonic_ns, process_cpu_ns, thread_cpu_ns
+from argus.core.tracer import SpanContext, Tracer
+
+THREAD_CPU_NS = "thread_cpu_ns"
+THREAD_CPU_RATIO = "thread_cpu_ratio"
+PROCESS_CPU_NS = "process_cpu_ns"
+PROCESS_CPU_RATIO = "process_cpu_ratio"
+
+# the process ratio can exceed 1 by at most one per CPU
+_CPUS = float(os.cpu_count() or 1)
+
+
+class _CpuTimeSpan(SpanContext):
+    """SpanContext that reads the CPU clocks alongside the wall clock."""
+
+    __slots__ = ("_thread_cpu", "_process_cpu")
+
+    def __enter__(self) -> _CpuTimeSpan:
+        tracer: CpuTimeTracer = self._tracer  # type: ignore[assignment]
+        self._process_cpu = process_cpu_ns() if tracer._process else 0
+        self._thread_cpu = thread_cpu_ns()
+        super().__enter__()
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        tracer: CpuTimeTracer = self._tracer  # type: ignore[assignment]
+        thread = thread_cpu_ns() - self._thread_cpu
+        process = process_cpu_ns() - self._process_cpu if tracer._process else 0
+        end_ns = max(monotonic_ns(), self._start_ns)
+        # the span's own duration; CPU clocks tick coarser than the wall clock
+        wall = max(end_ns - self._start_ns, 1)
+        # a copy: the caller's dict must not gain the CPU fields
+        metadata: dict[str, Any] = dict(self._metadata)
+        metadata[THREAD_CPU_NS] = thread
+        metadata[THREAD_CPU_RATIO] = min(thread / wall, 1.0)
+        if tracer._process:
+            metadata[PROCESS_CPU_NS] = process
+            metadata[PROCESS_CPU_RATIO] = min(process / wall, _CPUS)
+        self._metadata = metadata
+        self._finish(end_ns)
+
+
+class CpuTimeTracer(Tracer):
+    """Tracer whose spans record CPU time next to wall time.
+
+    Every span gets "thread_cpu_ns" (CPU time of the thread that ran it) and
+    "thread_cpu_ratio" (that over the span's duration, at most 1); with
+    `process`, also "process_cpu_ns" and "process_cpu_ratio" across all
+    threads (at most the CPU count). A thread ratio well below 1 means the
+    span waited: on locks or the GIL, page faults, I/O or a thread pool. A
+    process ratio above the thread ratio means other threads (e.g. torch's
+    intra-op pool) did the work. See analysis.cputime.wait_bound_spans.
+    """
+
+    __slots__ = ("_process",)
+
+    _span_type = _CpuTimeSpan
+
+    def __init__(self, process: bool = False) -> None:
+        super().__init__()
+        self._process = process
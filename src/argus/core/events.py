@@ -1,7 +1,13 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
-from typing import Any
+import gc
+from collections import deque
+from dataclasses import dataclass, field, fields
+from itertools import repeat
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
 
 VALID_CATEGORIES = frozenset({"compute", "memory", "phase", "token", "kernel", "system"})
 
@@ -12,6 +18,9 @@ class TraceEvent:
 
     All timestamps are nanoseconds from a monotonic clock.
     Duration is computed, never stored.
+
+    When scope_arg is set, scope is a template such as "decode.token.{}" and
+    full_scope substitutes the argument; it is only formatted on export.
     """
 
     event_id: str
@@ -23,6 +32,13 @@ class TraceEvent:
     parent_id: str | None = None
     token_index: int | None = None
     metadata: dict[str, Any] = field(default_factory=dict)
+    scope_arg: int | None = None
+
+    @property
+    def full_scope(self) -> str:
+        if self.scope_arg is None:
+            return self.scope
+        return self.scope.replace("{}", str(self.scope_arg), 1)
 
     @property
     def duration_ns(self) -> int:
@@ -35,3 +51,40 @@ class TraceEvent:
     @property
     def duration_ms(self) -> float:
         return self.duration_ns / 1_000_000
+
+
+def normalize_scope(scope: str) -> str:
+    """Replace numeric scope components with '*' so per-token spans share a key.
+
+    "decode.token.17.forward" -> "decode.token.*.forward"
+    """
+    if not any(c.isdigit() for c in scope):
+        return scope
+    return ".".join("*" if part.isdigit() else part for part in scope.split("."))
+
+
+_FIELD_NAMES = tuple(f.name for f in fields(TraceEvent))
+
+
+def events_from_columns(n: int, *columns: Iterable[Any]) -> list[TraceEvent]:
+    """Build `n` TraceEvents from one iterable of `n` values per field, in field order.
+
+    Equivalent to map(TraceEvent, *columns) but fills each field for all
+    events with one C-level map over its slot descriptor, and pauses the
+    cyclic GC, which would otherwise rescan the young objects many times over
+    during a large batch. Every column must be given, metadata included (one
+    dict per event).
+    """
+    if len(columns) != len(_FIELD_NAMES):
+        raise TypeError(f"Expected {len(_FIELD_NAMES)} columns, got {len(columns)}")
+    consume: deque[Any] = deque(maxlen=0)
+    paused = gc.isenabled()
+    gc.disable()
+    try:
+        events = list(map(object.__new__, repeat(TraceEvent, n)))
+        for name, column in zip(_FIELD_NAMES, columns, strict=True):
+            consume.extend(map(getattr(TraceEvent, name).__set__, events, column))
+    finally:
+        if paused:
+            gc.enable()
+    return events
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import sys
+import tracemalloc
+from typing import TYPE_CHECKING, Any
+
+from argus.core.tracer import SpanContext, Tracer
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+MEMORY_COUNTER = "memory"
+
+
+class _HeapSource:
+    """Python heap as traced by tracemalloc."""
+
+    __slots__ = ()
+    name = "heap"
+
+    def read(self) -> tuple[int, int]:
+        return tracemalloc.get_traced_memory()
+
+    def reset_peak(self) -> None:
+        tracemalloc.reset_peak()
+
+
+class _CudaSource:
+    """torch's CUDA caching allocator; its CPU allocator keeps no statistics."""
+
+    __slots__ = ("_cuda",)
+    name = "cuda"
+
+    def __init__(self, torch: Any) -> None:
+        self._cuda = torch.cuda
+
+    def read(self) -> tuple[int, int]:
+        return self._cuda.memory_allocated(), self._cuda.max_memory_allocated()
+
+    def reset_peak(self) -> None:
+        self._cuda.reset_peak_memory_stats()
+
+
+class _MemorySpan(SpanContext):
+    """SpanContext that measures allocations; only created at a selected depth."""
+
+    __slots__ = ("_frame",)
+
+    def __enter__(self) -> _MemorySpan:
+        tracer: MemoryTracer = self._tracer  # type: ignore[assignment]
+        self._frame = tracer._open_frame()
+        super().__enter__()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        # the caller's dict stays untouched
+        self._metadata = dict(self._metadata)
+        self._tracer._close_frame(self._frame, self._metadata)  # type: ignore[attr-defined]
+        super().__exit__(*exc)
+
+
+class MemoryTracer(Tracer):
+    """Tracer whose spans record how much memory they allocated.
+
+    Spans opened at one of `depths` (0 = top level; None = every depth) read
+    each memory source on enter and exit and get metadata
+    "<source>_delta_bytes" (net change) and "<source>_peak_bytes" (peak above
+    the value at entry, including nested spans), and add a sample to the
+    "memory" counter track. Sources are "heap" (tracemalloc, started here if
+    it is not already tracing) and, when `torch_stats` and CUDA is
+    initialized, "cuda". Depth is taken when span() is called; spans at
+    other depths are plain SpanContexts. Every allocation is slower while
+    tracemalloc traces, measured span or not.
+    """
+
+    __slots__ = ("_depths", "_sources", "_frames", "_owns_tracemalloc")
+
+    def __init__(self, depths: Iterable[int] | None = (0, 1), torch_stats: bool = True) -> None:
+        super().__init__()
+        self._depths = frozenset(depths) if depths is not None else None
+        self._owns_tracemalloc = not tracemalloc.is_tracing()
+        if self._owns_tracemalloc:
+            tracemalloc.start()
+        sources: list[_HeapSource | _CudaSource] = [_HeapSource()]
+        torch = sys.modules.get("torch")  # never imported just for this
+        if torch_stats and torch is not None and torch.cuda.is_initialized():
+            sources.append(_CudaSource(torch))
+        self._sources = sources
+        # per open measured span, per source: [value at entry, peak seen so far]
+        self._frames: list[list[list[int]]] = []
+
+    @property
+    def _span_type(self) -> type[SpanContext]:  # type: ignore[override]
+        # read by Tracer.span just before the span is created
+        depths = self._depths
+        if depths is None or len(self._parent_stack) in depths:
+            return _MemorySpan
+        return SpanContext
+
+    def _open_frame(self) -> list[list[int]]:
+        readings = [source.read() for source in self._sources]
+        if self._frames:
+            # the enclosing span's peak so far, before the reset below hides it
+            for slot, (_, peak) in zip(self._frames[-1], readings, strict=True):
+                slot[1] = max(slot[1], peak)
+        for source in self._sources:
+            source.reset_peak()
+        frame = [[current, current] for current, _ in readings]
+        self._frames.append(frame)
+        return frame
+
+    def _close_frame(self, frame: list[list[int]], metadata: dict[str, Any]) -> None:
+        if self._frames and self._frames[-1] is frame:
+            self._frames.pop()
+        outer = self._frames[-1] if self._frames else None
+        sample: dict[str, float] = {}
+        for k, (source, slot) in enumerate(zip(self._sources, frame, strict=True)):
+            current, peak = source.read()
+            peak = max(slot[1], peak)
+            metadata[f"{source.name}_delta_bytes"] = current - slot[0]
+            metadata[f"{source.name}_peak_bytes"] = peak - slot[0]
+            sample[f"{source.name}_bytes"] = current
+            if outer is not None:
+                outer[k][1] = max(outer[k][1], peak)
+        self.counter(MEMORY_COUNTER, **sample)
+
+    def reset(self) -> None:
+        super().reset()
+        self._frames.clear()
+
+    def close(self) -> None:
+        """Stop tracemalloc if this tracer started it."""
+        if self._owns_tracemalloc and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._owns_tracemalloc = False
+
+    def __enter__(self) -> MemoryTracer:
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
@@ -0,0 +1,348 @@
+from __future__ import annotations
+
+import struct
+import sys
+from multiprocessing import shared_memory
+from typing import TYPE_CHECKING, Any
+
+from argus.core.clock import monotonic_ns
+from argus.core.events import VALID_CATEGORIES
+
+if TYPE_CHECKING:
+    from argus.core.tracer import Tracer
+
+# start_ns, end_ns, local id, parent local id, token index, generation, category code,
+# name, scope
+_RECORD = struct.Struct("<qqiiiIB48p64p3x")
+RECORD_SIZE = _RECORD.size
+_NAME_BYTES = 47
+_SCOPE_BYTES = 63
+# write index, read index, dropped count, handles connected so far
+_HEADER = struct.Struct("<QQQQ")
+_HEADER_SIZE = 64
+_NONE = -(2**31)
+_CATEGORIES = tuple(sorted(VALID_CATEGORIES))
+_CATEGORY_CODES = {c: i for i, c in enumerate(_CATEGORIES)}
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attach to the collector's block without taking ownership of it.
+
+    Before 3.13 attaching always registers the block with the resource tracker;
+    multiprocessing children share the parent's tracker, so that is a no-op.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)  # type: ignore[call-arg]
+    return shared_memory.SharedMemory(name=name)
+
+
+def _buffer(shm: shared_memory.SharedMemory) -> memoryview:
+    buf = shm.buf
+    if buf is None:
+        raise ValueError(f"shared memory block {shm.name} is closed")
+    return buf
+
+
+def _encode(text: str, limit: int) -> bytes:
+    """UTF-8 encode, truncated to `limit` bytes without splitting a character."""
+    encoded = text.encode()
+    if len(encoded) > limit:
+        encoded = encoded[:limit].decode(errors="ignore").encode()
+    return encoded
+
+
+class SharedMemoryCollector:
+    """Parent-side owner of shared-memory rings that worker processes trace into.
+
+    Each ring is single-producer: give every worker its own `handle(i)`.
+    Records are fixed-size binary structs, so `drain()` never unpickles.
+    Names longer than 47 bytes and scopes longer than 63 bytes are truncated
+    (on a character boundary).
+    A full ring drops new records and counts them rather than blocking the worker.
+    """
+
+    __slots__ = ("_shm", "_buf", "_num_rings", "_capacity", "_ring_bytes")
+
+    def __init__(self, num_rings: int = 1, capacity: int = 65_536) -> None:
+        if num_rings < 1 or capacity < 1:
+            raise ValueError("num_rings and capacity must be positive")
+        self._num_rings = num_rings
+        self._capacity = capacity
+        self._ring_bytes = _HEADER_SIZE + capacity * RECORD_SIZE
+        self._shm = shared_memory.SharedMemory(create=True, size=num_rings * self._ring_bytes)
+        self._buf = _buffer(self._shm)
+        for ring in range(num_rings):
+            _HEADER.pack_into(self._buf, ring * self._ring_bytes, 0, 0, 0, 0)
+
+    @property
+    def num_rings(self) -> int:
+        return self._num_rings
+
+    def handle(self, ring: int) -> RingTracer:
+        """Picklable tracer handle for one worker process."""
+        if not 0 <= ring < self._num_rings:
+            raise IndexError(f"ring {ring} out of range for {self._num_rings} rings")
+        return RingTracer(self._shm.name, ring, self._capacity, ring * self._ring_bytes)
+
+    def drain(self, tracer: Tracer) -> int:
+        """Move every pending record into `tracer`. Returns the number of events moved.
+
+        Worker events get ids "w<ring>.<generation>.<n>", where the generation
+        counts the processes that have attached to the ring, so handles
+        unpickled again (e.g. by DataLoader workers each epoch) never reuse an
+        id. Events carry the ring in metadata["worker"].
+        """
+        buf = self._buf
+        unpack = _RECORD.unpack_from
+        capacity = self._capacity
+        moved = 0
+        for ring in range(self._num_rings):
+            base = ring * self._ring_bytes
+            write_idx, read_idx, _, _ = _HEADER.unpack_from(buf, base)
+            if write_idx == read_idx:
+                continue
+            prefix = f"w{ring}."
+            records = base + _HEADER_SIZE
+            rows = [
+                unpack(buf, records + (idx % capacity) * RECORD_SIZE)
+                for idx in range(read_idx, write_idx)
+            ]
+            starts, ends, local_ids, parents, tokens, gens, cats, names, scopes = zip(
+                *rows, strict=True
+            )
+            tracer.record_events(
+                [name.decode(errors="replace") for name in names],
+                starts,
+                ends,
+                [_CATEGORIES[cat] for cat in cats],
+                [scope.decode(errors="replace") for scope in scopes],
+                parents=[
+                    None if p == _NONE else f"{prefix}{g}.{p}"
+                    for p, g in zip(parents, gens, strict=True)
+                ],
+                token_indices=[None if tok == _NONE else tok for tok in tokens],
+                metadata=[{"worker": ring} for _ in rows],
+                event_ids=[f"{prefix}{g}.{i}" for i, g in zip(local_ids, gens, strict=True)],
+            )
+            struct.pack_into("<Q", buf, base + 8, write_idx)
+            moved += write_idx - read_idx
+        return moved
+
+    def dropped(self) -> int:
+        """Records lost to full rings since creation."""
+        buf = self._buf
+        return sum(
+            _HEADER.unpack_from(buf, ring * self._ring_bytes)[2] for ring in range(self._num_rings)
+        )
+
+    def close(self) -> None:
+        """Release and unlink the shared block. Handles must no longer be used."""
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self) -> SharedMemoryCollector:
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+
+class _RingSpan:
+    __slots__ = (
+        "_ring",
+        "_id",
+        "_name",
+        "_category",
+        "_scope",
+        "_token_index",
+        "_parent",
+        "_start",
+    )
+
+    def __init__(
+        self,
+        ring: RingTracer,
+        local_id: int,
+        name: bytes,
+        category: int,
+        scope: bytes,
+        token_index: int,
+    ) -> None:
+        self._ring = ring
+        self._id = local_id
+        self._name = name
+        self._category = category
+        self._scope = scope
+        self._token_index = token_index
+        self._parent = _NONE
+        self._start = 0
+
+    def __enter__(self) -> _RingSpan:
+        stack = self._ring._parent_stack
+        self._parent = stack[-1] if stack else _NONE
+        stack.append(self._id)
+        self._start = monotonic_ns()
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        end = monotonic_ns()
+        ring = self._ring
+        ring._write(
+            self._start,
+            end if end >= self._start else self._start,
+            self._id,
+            self._parent,
+            self._token_index,
+            self._category,
+            self._name,
+            self._scope,
+        )
+        stack = ring._parent_stack
+        if stack and stack[-1] == self._id:
+            stack.pop()
+
+
+class RingTracer:
+    """Worker-side tracer that writes fixed-size records into one shared ring.
+
+    Attaches to the shared block lazily, so it can be pickled to spawned workers
+    or inherited across fork.
+    """
+
+    __slots__ = (
+        "_shm_name",
+        "_ring",
+        "_capacity",
+        "_base",
+        "_shm",
+        "_buf",
+        "_write_idx",
+        "_generation",
+        "_next_id",
+        "_parent_stack",
+        "_names",
+    )
+
+    def __init__(self, shm_name: str, ring: int, capacity: int, base: int) -> None:
+        self._shm_name = shm_name
+        self._ring = ring
+        self._capacity = capacity
+        self._base = base
+        self._shm: shared_memory.SharedMemory | None = None
+        self._buf: Any = None
+        self._write_idx = 0
+        self._generation = 0
+        self._next_id = 0
+        self._parent_stack: list[int] = []
+        self._names: dict[str, bytes] = {}
+
+    def __getstate__(self) -> tuple[str, int, int, int]:
+        return (self._shm_name, self._ring, self._capacity, self._base)
+
+    def __setstate__(self, state: tuple[str, int, int, int]) -> None:
+        self.__init__(*state)  # type: ignore[misc]
+
+    @property
+    def ring(self) -> int:
+        return self._ring
+
+    def _connect(self) -> Any:
+        self._shm = _attach(self._shm_name)
+        buf = self._buf = _buffer(self._shm)
+        base = self._base
+        self._write_idx, _, _, self._generation = _HEADER.unpack_from(buf, base)
+        # the ring has a single producer, so claiming a generation needs no lock
+        struct.pack_into("<Q", buf, base + 24, self._generation + 1)
+        return buf
+
+    def _write(
+        self,
+        start: int,
+        end: int,
+        local_id: int,
+        parent: int,
+        token_index: int,
+        category: int,
+        name: bytes,
+        scope: bytes,
+    ) -> None:
+        buf = self._buf
+        if buf is None:
+            buf = self._connect()
+        base = self._base
+        idx = self._write_idx
+        read_idx = _HEADER.unpack_from(buf, base)[1]
+        if idx - read_idx >= self._capacity:
+            dropped = _HEADER.unpack_from(buf, base)[2]
+            struct.pack_into("<Q", buf, base + 16, dropped + 1)
+            return
+        _RECORD.pack_into(
+            buf,
+            base + _HEADER_SIZE + (idx % self._capacity) * RECORD_SIZE,
+            start,
+            end,
+            local_id,
+            parent,
+            token_index,
+            self._generation,
+            category,
+            name,
+            scope,
+        )
+        # publish only after the record is fully written
+        self._write_idx = idx + 1
+        struct.pack_into("<Q", buf, base, idx + 1)
+
+    def _encode_name(self, name: str) -> bytes:
+        encoded = self._names.get(name)
+        if encoded is None:
+            encoded = self._names[name] = _encode(name, _NAME_BYTES)
+        return encoded
+
+    def span(
+        self,
+        name: str,
+        category: str = "compute",
+        scope: str = "",
+        token_index: int | None = None,
+    ) -> _RingSpan:
+        """Open a traced span in the worker. Use as a context manager."""
+        local_id = self._next_id
+        self._next_id += 1
+        return _RingSpan(
+            self,
+            local_id,
+            self._encode_name(name),
+            _CATEGORY_CODES[category],
+            _encode(scope, _SCOPE_BYTES),
+            _NONE if token_index is None else token_index,
+        )
+
+    def instant(
+        self,
+        name: str,
+        category: str = "compute",
+        scope: str = "",
+        token_index: int | None = None,
+    ) -> None:
+        """Record a zero-duration event in the worker."""
+        now = monotonic_ns()
+        local_id = self._next_id
+        self._next_id += 1
+        stack = self._parent_stack
+        self._write(
+            now,
+            now,
+            local_id,
+            stack[-1] if stack else _NONE,
+            _NONE if token_index is None else token_index,
+            _CATEGORY_CODES[category],
+            self._encode_name(name),
+            _encode(scope, _SCOPE_BYTES),
+        )
+
+    def close(self) -> None:
+        if self._shm is not None:
+            self._buf = None
+            self._shm.close()
+            self._shm = None
@@ -0,0 +1,319 @@
+from __future__ import annotations
+
+import marshal
+import queue
+import shutil
+import sys
+import tempfile
+import threading
+import warnings
+from array import array
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from argus.core.events import TraceEvent
+from argus.core.tracer import Tracer
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+_MAGIC = b"ARGSPL02"
+_SCALARS = (str, int, float, bool, type(None))
+
+
+def _plain_metadata(metadata: dict[str, Any]) -> dict[str, Any]:
+    return {k: v if isinstance(v, _SCALARS) else repr(v) for k, v in metadata.items()}
+
+
+def _unlink(segments: Iterable[Path | list[TraceEvent]]) -> None:
+    for segment in segments:
+        if isinstance(segment, Path):
+            segment.unlink(missing_ok=True)
+
+
+def encode_segment(events: list[TraceEvent]) -> bytes:
+    """Columnar binary encoding of `events` (marshal, so only valid for this Python).
+
+    Timestamps are packed int64 arrays; repeated name/category/scope objects are
+    stored once by marshal's reference table. Metadata values that marshal cannot
+    represent are stored as their repr().
+    """
+    columns: tuple[Any, ...] = (
+        [e.event_id for e in events],
+        [e.name for e in events],
+        [e.category for e in events],
+        [e.scope for e in events],
+        [e.parent_id for e in events],
+        [e.token_index for e in events],
+        [e.metadata for e in events],
+        array("q", [e.start_ns for e in events]).tobytes(),
+        array("q", [e.end_ns for e in events]).tobytes(),
+        [e.scope_arg for e in events],
+    )
+    try:
+        payload = marshal.dumps(columns, 4)
+    except ValueError:
+        metadata = [_plain_metadata(e.metadata) for e in events]
+        columns = columns[:6] + (metadata,) + columns[7:]
+        payload = marshal.dumps(columns, 4)
+    return _MAGIC + payload
+
+
+def decode_segment(data: bytes) -> list[TraceEvent]:
+    if not data.startswith(_MAGIC):
+        raise ValueError("Not an argus spill segment")
+    ids, names, categories, scopes, parents, tokens, metadata, start_b, end_b, scope_args = (
+        marshal.loads(data[len(_MAGIC) :])
+    )
+    starts = array("q")
+    starts.frombytes(start_b)
+    ends = array("q")
+    ends.frombytes(end_b)
+    return list(
+        map(
+            TraceEvent,
+            ids,
+            names,
+            starts,
+            ends,
+            categories,
+            scopes,
+            parents,
+            tokens,
+            metadata,
+            scope_args,
+        )
+    )
+
+
+class _Segments(list["Path | list[TraceEvent]"]):
+    """Sealed buffers of one swap generation, in order: a Path once written."""
+
+    __slots__ = ("detached",)
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.detached = False
+
+
+class _SpillBuffer(list[TraceEvent]):
+    """Live event list that asks its tracer to seal it once it reaches the budget."""
+
+    __slots__ = ("_tracer", "_limit", "_segments")
+
+    def __init__(self, tracer: SpillingTracer, limit: int, segments: _Segments) -> None:
+        super().__init__()
+        self._tracer = tracer
+        self._limit = limit
+        # sealed buffers that precede this one
+        self._segments = segments
+
+    def append(self, event: TraceEvent) -> None:
+        list.append(self, event)
+        if len(self) >= self._limit:
+            self._tracer._seal(self)
+
+    def extend(self, events: Iterable[TraceEvent]) -> None:
+        # fill up to the budget, seal, and continue in the tracer's new buffer
+        events = list(events)
+        buffer, i = self, 0
+        while i < len(events):
+            room = buffer._limit - len(buffer)
+            list.extend(buffer, events[i : i + room])
+            i += room
+            if len(buffer) >= buffer._limit:
+                buffer = buffer._tracer._seal(buffer)
+
+
+class SpillingTracer(Tracer):
+    """Tracer with a memory budget: full buffers are sealed into segment files on disk.
+
+    Once `max_buffered_events` events are held, the buffer is swapped for an
+    empty one and handed to a background writer thread, which encodes it with
+    encode_segment() into its own append-only file. At most `max_pending`
+    sealed buffers wait for the writer; beyond that recording blocks until one
+    is written, so memory stays bounded. iter_events(), events and get_events()
+    read the segments back in order followed by the live buffer, so exporters
+    see every event. If a segment cannot be written it is kept in memory.
+
+    Segments go to `spill_dir`, or to a temporary directory that close() removes.
+    """
+
+    __slots__ = (
+        "_max_buffered",
+        "_spill_dir",
+        "_owns_dir",
+        "_spilled",
+        "_next_segment",
+        "_queue",
+        "_writer",
+        "_closed",
+        "_seal_lock",
+    )
+
+    _events: _SpillBuffer
+
+    def __init__(
+        self,
+        max_buffered_events: int = 100_000,
+        spill_dir: str | Path | None = None,
+        max_pending: int = 2,
+    ) -> None:
+        if max_buffered_events < 1:
+            raise ValueError("max_buffered_events must be positive")
+        super().__init__()
+        self._max_buffered = max_buffered_events
+        self._owns_dir = spill_dir is None
+        if spill_dir is None:
+            self._spill_dir = Path(tempfile.mkdtemp(prefix="argus-spill-"))
+        else:
+            self._spill_dir = Path(spill_dir)
+            self._spill_dir.mkdir(parents=True, exist_ok=True)
+        self._events = _SpillBuffer(self, max_buffered_events, _Segments())
+        self._spilled = 0
+        self._next_segment = 0
+        # sealing and swapping are rare; the lock keeps them from interleaving
+        self._seal_lock = threading.Lock()
+        self._queue: queue.Queue[tuple[Path, list[TraceEvent], _Segments] | None] = queue.Queue(
+            max(1, max_pending)
+        )
+        self._writer = threading.Thread(target=self._write_loop, name="argus-spill", daemon=True)
+        self._writer.start()
+        self._closed = False
+
+    @property
+    def spill_dir(self) -> Path:
+        return self._spill_dir
+
+    @property
+    def spilled_events(self) -> int:
+        """Events written to segment files so far."""
+        return self._spilled
+
+    def _seal(self, batch: _SpillBuffer) -> _SpillBuffer:
+        """Hand a full buffer to the writer; returns the buffer now recording."""
+        with self._seal_lock:
+            if self._events is not batch:
+                # swapped out meanwhile; late events stay with the swapped buffer
+                return self._events
+            segments = batch._segments
+            self._events = _SpillBuffer(self, self._max_buffered, segments)
+            path = self._spill_dir / f"segment-{self._next_segment:06d}.bin"
+            self._next_segment += 1
+            # readers see the batch in memory until the writer replaces it by its path
+            segments.append(batch)
+        self._queue.put((path, batch, segments))
+        return self._events
+
+    def _write_loop(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                path, batch, segments = item
+                try:
+                    path.write_bytes(encode_segment(batch))
+                except (OSError, ValueError) as exc:
+                    warnings.warn(
+                        f"Could not spill {len(batch)} events to {path}: {exc}; keeping in memory",
+                        stacklevel=1,
+                    )
+                    continue
+                with self._seal_lock:
+                    if segments.detached:
+                        # swapped out or reset while being written
+                        path.unlink(missing_ok=True)
+                        continue
+                    for i, segment in enumerate(segments):
+                        if segment is batch:
+                            segments[i] = path
+                            break
+                    self._spilled += len(batch)
+            finally:
+                self._queue.task_done()
+
+    def flush(self) -> None:
+        """Wait until every sealed buffer has been written."""
+        self._queue.join()
+
+    @staticmethod
+    def _read(segments: Iterable[Path | list[TraceEvent]]) -> Iterator[TraceEvent]:
+        for segment in segments:
+            if isinstance(segment, Path):
+                yield from decode_segment(segment.read_bytes())
+            else:
+                yield from segment
+
+    def iter_events(self) -> Iterator[TraceEvent]:
+        """Stream spilled segments then the live buffer, one segment in memory at a time."""
+        live = self._events
+        yield from self._read(list(live._segments))
+        yield from list(live)
+
+    @property
+    def events(self) -> list[TraceEvent]:
+        return list(self.iter_events())
+
+    def get_events(
+        self,
+        category: str | None = None,
+        token_index: int | None = None,
+    ) -> list[TraceEvent]:
+        return [
+            e
+            for e in self.iter_events()
+            if (category is None or e.category == category)
+            and (token_index is None or e.token_index == token_index)
+        ]
+
+    def _detach(self) -> tuple[_SpillBuffer, list[Path | list[TraceEvent]]]:
+        """Start a new empty buffer and segment list in one step; return the old ones."""
+        with self._seal_lock:
+            live = self._events
+            self._events = _SpillBuffer(self, self._max_buffered, _Segments())
+            segments = live._segments
+            segments.detached = True
+            # a span closing late may still append here; never seal it again
+            live._limit = sys.maxsize
+            self._spilled = 0
+            return live, list(segments)
+
+    def swap_events(self) -> list[TraceEvent]:
+        """Detach every event, spilled ones included, and start empty.
+
+        The swap itself is O(1): the live buffer and its segment list are
+        replaced together. The old segments are then read back and deleted,
+        which is O(events) but happens on the calling (flusher) thread. The
+        returned list is the old live buffer with the spilled events put in
+        front, so late appends still land in it (see PeriodicFlusher).
+        """
+        live, segments = self._detach()
+        spilled = list(self._read(segments))
+        _unlink(segments)
+        live[:0] = spilled
+        return live
+
+    def reset(self) -> None:
+        _, segments = self._detach()
+        _unlink(segments)
+        super().reset()
+
+    def close(self) -> None:
+        """Stop the writer and delete the segments. The tracer is empty afterwards."""
+        if self._closed:
+            return
+        self._closed = True
+        _, segments = self._detach()
+        self.flush()
+        self._queue.put(None)
+        self._writer.join()
+        _unlink(segments)
+        if self._owns_dir:
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
+
+    def __enter__(self) -> SpillingTracer:
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+
+class SymbolTable:
+    """Tracer-level string interning for bulk-recorded names, categories and scopes.
+
+    intern() returns one canonical object per distinct string, so events built
+    from columns of equal but separate strings (e.g. parsed from a file) share
+    one object each. span() does not intern: its arguments are usually
+    literals, which Python already shares, and a lookup per span costs more
+    than it saves.
+    """
+
+    __slots__ = ("_canonical",)
+
+    def __init__(self) -> None:
+        self._canonical: dict[str, str] = {}
+
+    def intern(self, s: str) -> str:
+        return self._canonical.setdefault(s, s)
+
+    def intern_many(self, strings: Iterable[str]) -> list[str]:
+        canonical = self._canonical.setdefault
+        strings = list(strings)
+        return list(map(canonical, strings, strings))
+
+    def __len__(self) -> int:
+        return len(self._canonical)
+
+    def __contains__(self, s: object) -> bool:
+        return s in self._canonical
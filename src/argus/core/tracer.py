@@ -1,9 +1,23 @@
 from __future__ import annotations
 
-from typing import Any
+from collections.abc import Callable
+from itertools import repeat
+from typing import TYPE_CHECKING, Any
 
 from argus.core.clock import monotonic_ns
-from argus.core.events import TraceEvent
+from argus.core.counters import CounterTrack
+from argus.core.events import TraceEvent, events_from_columns
+from argus.core.symbols import SymbolTable
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Sequence
+
+EventListener = Callable[[TraceEvent], None]
+
+
+def _as_list(values: Any) -> Any:
+    # NumPy and array.array elements become plain ints
+    return values.tolist() if hasattr(values, "tolist") else values
 
 
 class SpanContext:
@@ -17,6 +31,7 @@ class SpanContext:
         "_scope",
         "_metadata",
         "_token_index",
+        "_scope_arg",
         "_parent_id",
         "_start_ns",
     )
@@ -30,6 +45,7 @@ class SpanContext:
         scope: str,
         metadata: dict[str, Any],
         token_index: int | None,
+        scope_arg: int | None = None,
     ) -> None:
         self._tracer = tracer
         self._event_id = event_id
@@ -38,6 +54,7 @@ class SpanContext:
         self._scope = scope
         self._metadata = metadata
         self._token_index = token_index
+        self._scope_arg = scope_arg
         self._parent_id: str | None = None
         self._start_ns: int = 0
 
@@ -56,8 +73,10 @@ class SpanContext:
 
     def __exit__(self, *_: object) -> None:
         end_ns = monotonic_ns()
-        if end_ns < self._start_ns:
-            end_ns = self._start_ns
+        self._finish(end_ns if end_ns > self._start_ns else self._start_ns)
+
+    def _finish(self, end_ns: int) -> None:
+        """Record the span as ending at `end_ns`; subclasses call it from __exit__."""
         event = TraceEvent(
             event_id=self._event_id,
             name=self._name,
@@ -68,10 +87,15 @@ class SpanContext:
             parent_id=self._parent_id,
             token_index=self._token_index,
             metadata=dict(self._metadata),
+            scope_arg=self._scope_arg,
         )
-        self._tracer._events.append(event)
-        if self._tracer._parent_stack and self._tracer._parent_stack[-1] == self._event_id:
-            self._tracer._parent_stack.pop()
+        tracer = self._tracer
+        tracer._events.append(event)
+        if tracer._listeners:
+            for listener in tracer._listeners:
+                listener(event)
+        if tracer._parent_stack and tracer._parent_stack[-1] == self._event_id:
+            tracer._parent_stack.pop()
 
 
 class Tracer:
@@ -80,12 +104,37 @@ class Tracer:
     Not thread-safe. Single-threaded tracing only in v0.1.
     """
 
-    __slots__ = ("_events", "_next_id", "_parent_stack")
+    __slots__ = (
+        "_events",
+        "_next_id",
+        "_generation",
+        "_parent_stack",
+        "_listeners",
+        "_symbols",
+        "_counters",
+    )
+
+    # span() builds this; subclasses hook span entry/exit by overriding it
+    _span_type: type[SpanContext] = SpanContext
 
     def __init__(self) -> None:
         self._events: list[TraceEvent] = []
         self._next_id: int = 0
+        self._generation = 0
         self._parent_stack: list[str] = []
+        self._listeners: list[EventListener] = []
+        self._symbols = SymbolTable()
+        self._counters: dict[str, CounterTrack] = {}
+
+    @property
+    def generation(self) -> int:
+        """Number of reset() calls. Event ids are only unique within one generation."""
+        return self._generation
+
+    @property
+    def symbols(self) -> SymbolTable:
+        """Strings interned by record_events() and counter names. Kept across reset()."""
+        return self._symbols
 
     def _generate_id(self) -> str:
         eid = str(self._next_id)
@@ -99,22 +148,156 @@ class Tracer:
         scope: str = "",
         metadata: dict[str, Any] | None = None,
         token_index: int | None = None,
+        scope_arg: int | None = None,
     ) -> SpanContext:
-        """Open a traced span. Use as a context manager."""
-        event_id = self._generate_id()
-        return SpanContext(
+        """Open a traced span. Use as a context manager.
+
+        For per-token scopes pass a template and its argument, e.g.
+        scope="decode.token.{}", scope_arg=i, instead of formatting a new string.
+        """
+        return self._span_type(
             tracer=self,
-            event_id=event_id,
+            event_id=self._generate_id(),
             name=name,
             category=category,
             scope=scope,
             metadata=metadata if metadata is not None else {},
             token_index=token_index,
+            scope_arg=scope_arg,
         )
 
     def record_event(self, event: TraceEvent) -> None:
         """Append a pre-built TraceEvent. Public API for hooks."""
         self._events.append(event)
+        if self._listeners:
+            for listener in self._listeners:
+                listener(event)
+
+    def record_span(
+        self,
+        name: str,
+        start_ns: int,
+        end_ns: int,
+        category: str = "compute",
+        scope: str = "",
+        metadata: dict[str, Any] | None = None,
+        token_index: int | None = None,
+        scope_arg: int | None = None,
+    ) -> TraceEvent:
+        """Record an already-finished span timed by the caller.
+
+        It is parented under the innermost open span, like span(). For
+        intervals measured outside a `with` block, e.g. a wait between calls.
+        """
+        event = TraceEvent(
+            event_id=self._generate_id(),
+            name=name,
+            start_ns=start_ns,
+            end_ns=end_ns,
+            category=category,
+            scope=scope,
+            parent_id=self._parent_stack[-1] if self._parent_stack else None,
+            token_index=token_index,
+            metadata=metadata if metadata is not None else {},
+            scope_arg=scope_arg,
+        )
+        self.record_event(event)
+        return event
+
+    @property
+    def current_span_id(self) -> str | None:
+        """Event id of the innermost open span, or None outside every span."""
+        return self._parent_stack[-1] if self._parent_stack else None
+
+    def record_events(
+        self,
+        names: Sequence[str],
+        starts_ns: Sequence[int],
+        ends_ns: Sequence[int],
+        categories: Sequence[str] | str = "compute",
+        scopes: Sequence[str] | str = "",
+        parents: Sequence[int | str | None] | None = None,
+        token_indices: Sequence[int | None] | None = None,
+        metadata: Sequence[dict[str, Any]] | None = None,
+        event_ids: Sequence[str] | None = None,
+        scope_args: Sequence[int | None] | None = None,
+    ) -> list[TraceEvent]:
+        """Append a batch of events given as parallel sequences, in one pass.
+
+        Sequences may be lists, array.array or NumPy arrays; a single string
+        for `categories` or `scopes` applies to every event. Unless
+        `event_ids` is given, the batch takes a block of consecutive ids;
+        given numeric ids move later ids past them. A parent is an event id,
+        or an int indexing into this batch (negative for none). Names,
+        categories and scopes are interned. Listeners see each event after
+        the whole batch is stored. Returns the new events.
+        """
+        n = len(names)
+        columns = {
+            "starts_ns": starts_ns,
+            "ends_ns": ends_ns,
+            "categories": categories,
+            "scopes": scopes,
+            "parents": parents,
+            "token_indices": token_indices,
+            "metadata": metadata,
+            "event_ids": event_ids,
+            "scope_args": scope_args,
+        }
+        for key, column in columns.items():
+            if column is not None and not isinstance(column, str) and len(column) != n:
+                raise ValueError(f"{key} has {len(column)} values, expected {n} like names")
+        if event_ids is None:
+            first = self._next_id
+            self._next_id += n
+            event_ids = list(map(str, range(first, first + n)))
+        else:
+            event_ids = _as_list(event_ids)
+            # ids handed out later must not repeat the numeric ones given here
+            numeric = [int(eid) for eid in event_ids if eid.isdigit()]
+            if numeric:
+                self._next_id = max(self._next_id, max(numeric) + 1)
+        parent_ids: Iterable[str | None] = repeat(None, n)
+        if parents is not None:
+            parent_ids = [
+                p if p is None or isinstance(p, str) else event_ids[p] if p >= 0 else None
+                for p in _as_list(parents)
+            ]
+        symbols = self._symbols
+        events = events_from_columns(
+            n,
+            event_ids,
+            symbols.intern_many(_as_list(names)),
+            _as_list(starts_ns),
+            _as_list(ends_ns),
+            repeat(symbols.intern(categories), n)
+            if isinstance(categories, str)
+            else symbols.intern_many(_as_list(categories)),
+            repeat(symbols.intern(scopes), n)
+            if isinstance(scopes, str)
+            else symbols.intern_many(_as_list(scopes)),
+            parent_ids,
+            repeat(None, n) if token_indices is None else _as_list(token_indices),
+            [{} for _ in range(n)] if metadata is None else metadata,
+            repeat(None, n) if scope_args is None else _as_list(scope_args),
+        )
+        self._events.extend(events)
+        if self._listeners:
+            for event in events:
+                for listener in self._listeners:
+                    listener(event)
+        return events
+
+    def add_listener(self, listener: EventListener) -> None:
+        """Call `listener(event)` for every event as it is recorded.
+
+        Listeners run inline on the recording thread, so they must be cheap.
+        They are kept across reset().
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: EventListener) -> None:
+        self._listeners.remove(listener)
 
     def instant(
         self,
@@ -123,6 +306,7 @@ class Tracer:
         scope: str = "",
         metadata: dict[str, Any] | None = None,
         token_index: int | None = None,
+        scope_arg: int | None = None,
     ) -> TraceEvent:
         """Record a zero-duration point-in-time event."""
         now = monotonic_ns()
@@ -136,17 +320,61 @@ class Tracer:
             parent_id=self._parent_stack[-1] if self._parent_stack else None,
             token_index=token_index,
             metadata=metadata if metadata is not None else {},
+            scope_arg=scope_arg,
         )
         self._events.append(event)
+        if self._listeners:
+            for listener in self._listeners:
+                listener(event)
         return event
 
+    def counter(self, name: str, value: float | None = None, /, **series: float) -> None:
+        """Record a counter sample, e.g. counter("kv_cache", bytes=n, layers=k).
+
+        A single `value` is stored as the series "value". Samples go into the
+        counter's CounterTrack rather than the event list, so they allocate no
+        TraceEvent and are not seen by listeners; exporters read `counters`.
+        """
+        track = self._counters.get(name)
+        if track is None:
+            track = self._counters[name] = CounterTrack(self._symbols.intern(name))
+        if value is not None:
+            series["value"] = value
+        track.append(monotonic_ns(), series)
+
+    @property
+    def counters(self) -> dict[str, CounterTrack]:
+        """Counter tracks by name, in first-recorded order."""
+        return self._counters
+
     @property
     def events(self) -> list[TraceEvent]:
         return list(self._events)
 
+    def iter_events(self) -> Iterator[TraceEvent]:
+        """Iterate recorded events in order without copying them.
+
+        Exporters should prefer this to `events`; tracers that keep events
+        outside memory (SpillingTracer) stream them from here.
+        """
+        return iter(self._events)
+
+    def swap_events(self) -> list[TraceEvent]:
+        """Detach the recorded events and start a fresh buffer, in O(1).
+
+        The swap is a single attribute assignment, so another thread may call it
+        while this one records. A span closing at that instant may still append
+        to the returned list just after it is handed over; see PeriodicFlusher.
+        """
+        events = self._events
+        self._events = []
+        return events
+
     def reset(self) -> None:
         self._events.clear()
+        self._counters.clear()
         self._next_id = 0
+        self._generation += 1
         self._parent_stack.clear()
 
     def get_events(
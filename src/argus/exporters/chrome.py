@@ -1,11 +1,18 @@
 from __future__ import annotations
 
+import heapq
 import json
 import warnings
+from operator import itemgetter
 from pathlib import Path
 from typing import IO, TYPE_CHECKING, Any
 
+from argus.core.compression import open_trace_for_write
+
 if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from argus.core.counters import CounterTrack
     from argus.core.events import TraceEvent
 
 CATEGORY_TO_TID: dict[str, int] = {
@@ -21,61 +28,166 @@ _VALID_CATEGORIES = frozenset(CATEGORY_TO_TID)
 _RESERVED_ARGS = frozenset({"event_id", "scope", "parent_id", "token_index"})
 
 
-def _event_to_chrome(event: TraceEvent) -> dict[str, Any]:
+def _event_to_chrome(event: TraceEvent, pid: int = 1) -> dict[str, Any]:
     if event.category not in _VALID_CATEGORIES:
         warnings.warn(
             f"Unknown category '{event.category}' in event '{event.name}'",
             stacklevel=2,
         )
+    return _fields_to_chrome(
+        event.event_id,
+        event.name,
+        event.start_ns,
+        event.end_ns,
+        event.category,
+        event.scope,
+        event.parent_id,
+        event.token_index,
+        event.metadata,
+        event.scope_arg,
+        pid,
+    )
+
 
+def _fields_to_chrome(
+    event_id: str,
+    name: str,
+    start_ns: int,
+    end_ns: int,
+    category: str,
+    scope: str,
+    parent_id: str | None,
+    token_index: int | None,
+    metadata: dict[str, Any],
+    scope_arg: int | None,
+    pid: int,
+) -> dict[str, Any]:
+    """The Chrome event for one TraceEvent given as its fields (see exporters.parallel)."""
     args: dict[str, Any] = {}
-    for k, v in event.metadata.items():
+    for k, v in metadata.items():
         if k in _RESERVED_ARGS:
             continue
         if not isinstance(v, (dict, list, set, tuple)):
             args[k] = v
-    args["event_id"] = event.event_id
-    args["scope"] = event.scope
-    if event.parent_id is not None:
-        args["parent_id"] = event.parent_id
-    if event.token_index is not None:
-        args["token_index"] = event.token_index
+    args["event_id"] = event_id
+    args["scope"] = scope if scope_arg is None else scope.replace("{}", str(scope_arg), 1)
+    if parent_id is not None:
+        args["parent_id"] = parent_id
+    if token_index is not None:
+        args["token_index"] = token_index
 
-    is_counter = event.category == "memory" and event.duration_ns == 0
+    duration_ns = end_ns - start_ns
+    is_counter = category == "memory" and duration_ns == 0
 
     result: dict[str, Any] = {
         "ph": "C" if is_counter else "X",
-        "name": event.name,
-        "cat": event.category,
-        "ts": event.start_ns / 1_000.0,
-        "pid": 1,
-        "tid": CATEGORY_TO_TID.get(event.category, 0),
+        "name": name,
+        "cat": category,
+        "ts": start_ns / 1_000.0,
+        "pid": pid,
+        "tid": CATEGORY_TO_TID.get(category, 0),
         "args": args,
     }
     if not is_counter:
-        result["dur"] = max(0, event.duration_ns) / 1_000.0
+        result["dur"] = max(0, duration_ns) / 1_000.0
     return result
 
 
-def events_to_chrome(events: list[TraceEvent]) -> list[dict[str, Any]]:
-    return [_event_to_chrome(e) for e in events]
+def events_to_chrome(events: Iterable[TraceEvent], pid: int = 1) -> list[dict[str, Any]]:
+    return [_event_to_chrome(e, pid) for e in events]
+
+
+def _counter_to_chrome(name: str, ts_ns: int, values: dict[str, float], pid: int) -> dict[str, Any]:
+    return {
+        "ph": "C",
+        "name": name,
+        "cat": "memory",
+        "ts": ts_ns / 1_000.0,
+        "pid": pid,
+        "tid": CATEGORY_TO_TID["memory"],
+        "args": values,
+    }
+
+
+def counters_to_chrome(
+    counters: Iterable[CounterTrack], pid: int = 1, max_samples: int | None = None
+) -> list[dict[str, Any]]:
+    """Chrome "C" events for Tracer.counter tracks, each downsampled to `max_samples`."""
+    return [
+        _counter_to_chrome(track.name, ts, values, pid)
+        for track in counters
+        for ts, values in track.samples(max_samples)
+    ]
+
+
+_METADATA = {"argus_version": "0.1.0", "clock_source": "monotonic_ns"}
+_HEADER = '{"traceEvents": ['
+_FOOTER = '], "displayTimeUnit": "ns", "metadata": ' + json.dumps(_METADATA) + "}"
+
+
+def _counter_samples(
+    counters: Iterable[CounterTrack], max_samples: int | None
+) -> Iterator[tuple[int, str, dict[str, float]]]:
+    """(ts_ns, name, values) of every track, merged into one timestamp-ordered stream."""
+
+    def named(track: CounterTrack) -> Iterator[tuple[int, str, dict[str, float]]]:
+        name = track.name
+        for ts, values in track.samples(max_samples):
+            yield ts, name, values
+
+    return heapq.merge(*(named(track) for track in counters), key=itemgetter(0))
+
+
+def _write_chrome(
+    events: Iterable[TraceEvent],
+    f: IO[str],
+    pid: int,
+    counters: Iterable[CounterTrack] = (),
+    max_counter_samples: int | None = None,
+) -> None:
+    # same bytes as json.dump of the whole payload, one event in memory at a time
+    f.write(_HEADER)
+    sep = ""
+    samples = _counter_samples(counters, max_counter_samples)
+    sample = next(samples, None)
+    for e in events:
+        # events are recorded as they end; slot in the counter samples taken by then
+        # so the file stays in end-timestamp order (merge_chrome_traces relies on it)
+        while sample is not None and sample[0] <= e.end_ns:
+            f.write(sep)
+            f.write(json.dumps(_counter_to_chrome(sample[1], sample[0], sample[2], pid)))
+            sep = ", "
+            sample = next(samples, None)
+        f.write(sep)
+        f.write(json.dumps(_event_to_chrome(e, pid)))
+        sep = ", "
+    while sample is not None:
+        f.write(sep)
+        f.write(json.dumps(_counter_to_chrome(sample[1], sample[0], sample[2], pid)))
+        sep = ", "
+        sample = next(samples, None)
+    f.write(_FOOTER)
 
 
 def export_chrome_trace(
-    events: list[TraceEvent],
+    events: Iterable[TraceEvent],
     dest: str | Path | IO[str],
+    pid: int = 1,
+    compression: str | None = "auto",
+    level: int | None = None,
+    counters: Iterable[CounterTrack] = (),
+    max_counter_samples: int | None = None,
 ) -> None:
-    chrome_events = events_to_chrome(events)
-    payload = {
-        "traceEvents": chrome_events,
-        "displayTimeUnit": "ns",
-        "metadata": {
-            "argus_version": "0.1.0",
-            "clock_source": "monotonic_ns",
-        },
-    }
+    """Write `events` as Chrome trace JSON, streaming so `events` may be any iterable.
+
+    A path ending in .gz or .xz is compressed on a background thread (see
+    argus.core.compression); pass `compression` to choose explicitly and
+    `level` for the gzip level or xz preset. `counters` (Tracer.counters
+    values) are written as "C" events among the spans in timestamp order,
+    at most `max_counter_samples` per track (see CounterTrack.samples).
+    """
     if isinstance(dest, (str, Path)):
-        with open(dest, "w") as f:
-            json.dump(payload, f)
+        with open_trace_for_write(dest, compression, level) as f:
+            _write_chrome(events, f, pid, counters, max_counter_samples)
     else:
-        json.dump(payload, dest)
+        _write_chrome(events, dest, pid, counters, max_counter_samples)
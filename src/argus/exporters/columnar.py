@@ -0,0 +1,299 @@
+from __future__ import annotations
+
+import ast
+import sys
+import zipfile
+from array import array
+from dataclasses import dataclass, field
+from typing import IO, TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from pathlib import Path
+
+    from argus.core.counters import CounterTrack
+    from argus.core.events import TraceEvent
+
+META_PREFIX = "meta."
+COUNTER_PREFIX = "counter."
+DICT_SUFFIX = ".dict"
+_NPY_MAGIC = b"\x93NUMPY\x01\x00"
+_DESCR = {"q": "<i8", "d": "<f8", "i": "<i4"}
+_TYPECODES = {v: k for k, v in _DESCR.items()}
+
+
+@dataclass(slots=True)
+class _MetaColumn:
+    kind: str  # "int", "float" or "str"
+    values: list[Any]
+
+
+@dataclass(slots=True)
+class EventTable:
+    """Events as columns, ready for .npz or Arrow.
+
+    name/category/scope are int32 codes into the matching *_dict lists; a
+    templated scope (TraceEvent.scope_arg) keeps its template as the scope
+    string and its argument in scope_arg. parent_index is the row of the
+    parent event; parent_index, token_index and scope_arg are -1 where absent.
+    Scalar metadata becomes one column per key (see events_to_table), with
+    None where an event lacks the key.
+    """
+
+    start_ns: array[int] = field(default_factory=lambda: array("q"))
+    end_ns: array[int] = field(default_factory=lambda: array("q"))
+    duration_ns: array[int] = field(default_factory=lambda: array("q"))
+    name: array[int] = field(default_factory=lambda: array("i"))
+    category: array[int] = field(default_factory=lambda: array("i"))
+    scope: array[int] = field(default_factory=lambda: array("i"))
+    parent_index: array[int] = field(default_factory=lambda: array("q"))
+    token_index: array[int] = field(default_factory=lambda: array("q"))
+    scope_arg: array[int] = field(default_factory=lambda: array("q"))
+    name_dict: list[str] = field(default_factory=list)
+    category_dict: list[str] = field(default_factory=list)
+    scope_dict: list[str] = field(default_factory=list)
+    metadata: dict[str, _MetaColumn] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.start_ns)
+
+
+def _intern(table: dict[str, int], values: list[str], key: str) -> int:
+    code = table.get(key)
+    if code is None:
+        code = table[key] = len(values)
+        values.append(key)
+    return code
+
+
+def _meta_kind(values: list[Any]) -> str:
+    present = [v for v in values if v is not None]
+    if all(isinstance(v, str) for v in present):
+        return "str"
+    if all(isinstance(v, (int, float)) for v in present):
+        if len(present) == len(values) and not any(isinstance(v, float) for v in present):
+            return "int"
+        return "float"
+    return "str"
+
+
+def events_to_table(events: Iterable[TraceEvent]) -> EventTable:
+    """Build an EventTable in two passes (parents are recorded after their children).
+
+    A metadata key becomes an int64 column when every event has an int or bool
+    for it, float64 (NaN where absent) for other numeric keys, and a dictionary
+    coded string column otherwise. Nested values are dropped.
+    """
+    events = list(events)
+    t = EventTable()
+    rows = {e.event_id: i for i, e in enumerate(events)}
+    names: dict[str, int] = {}
+    categories: dict[str, int] = {}
+    scopes: dict[str, int] = {}
+    sparse: dict[str, list[tuple[int, Any]]] = {}
+    for i, e in enumerate(events):
+        t.start_ns.append(e.start_ns)
+        t.end_ns.append(e.end_ns)
+        t.duration_ns.append(e.end_ns - e.start_ns)
+        t.name.append(_intern(names, t.name_dict, e.name))
+        t.category.append(_intern(categories, t.category_dict, e.category))
+        t.scope.append(_intern(scopes, t.scope_dict, e.scope))
+        t.parent_index.append(rows.get(e.parent_id, -1) if e.parent_id is not None else -1)
+        t.token_index.append(-1 if e.token_index is None else e.token_index)
+        t.scope_arg.append(-1 if e.scope_arg is None else e.scope_arg)
+        for key, value in e.metadata.items():
+            if value is None or isinstance(value, (str, int, float)):
+                sparse.setdefault(key, []).append((i, value))
+    for key, pairs in sparse.items():
+        values: list[Any] = [None] * len(events)
+        for i, value in pairs:
+            values[i] = value
+        kind = _meta_kind(values)
+        if kind == "str":
+            values = [v if v is None or isinstance(v, str) else str(v) for v in values]
+        t.metadata[key] = _MetaColumn(kind, values)
+    return t
+
+
+def _npy(data: array[Any] | list[str]) -> bytes:
+    if isinstance(data, array):
+        descr = _DESCR[data.typecode]
+        if sys.byteorder == "big":
+            data = array(data.typecode, data)
+            data.byteswap()
+        body = data.tobytes()
+    else:
+        width = max((len(s) for s in data), default=0) or 1
+        descr = f"<U{width}"
+        body = "".join(s.ljust(width, "\0") for s in data).encode("utf-32-le")
+    header = f"{{'descr': '{descr}', 'fortran_order': False, 'shape': ({len(data)},), }}"
+    # magic(8) + length(2) + header, padded with spaces so the data is 64-byte aligned
+    pad = -(len(_NPY_MAGIC) + 2 + len(header) + 1) % 64
+    header += " " * pad + "\n"
+    return _NPY_MAGIC + len(header).to_bytes(2, "little") + header.encode("latin1") + body
+
+
+def _npz_arrays(t: EventTable) -> dict[str, array[Any] | list[str]]:
+    arrays: dict[str, array[Any] | list[str]] = {
+        "start_ns": t.start_ns,
+        "end_ns": t.end_ns,
+        "duration_ns": t.duration_ns,
+        "name": t.name,
+        "category": t.category,
+        "scope": t.scope,
+        "parent_index": t.parent_index,
+        "token_index": t.token_index,
+        "scope_arg": t.scope_arg,
+        "name" + DICT_SUFFIX: t.name_dict,
+        "category" + DICT_SUFFIX: t.category_dict,
+        "scope" + DICT_SUFFIX: t.scope_dict,
+    }
+    for key, col in t.metadata.items():
+        column = META_PREFIX + key
+        if col.kind == "int":
+            arrays[column] = array("q", col.values)
+        elif col.kind == "float":
+            nan = float("nan")
+            arrays[column] = array("d", (nan if v is None else float(v) for v in col.values))
+        else:
+            table: dict[str, int] = {}
+            dictionary: list[str] = []
+            arrays[column] = array(
+                "i", (-1 if v is None else _intern(table, dictionary, v) for v in col.values)
+            )
+            arrays[column + DICT_SUFFIX] = dictionary
+    return arrays
+
+
+def _counter_arrays(counters: Iterable[CounterTrack]) -> dict[str, array[Any]]:
+    arrays: dict[str, array[Any]] = {}
+    for track in counters:
+        prefix = COUNTER_PREFIX + track.name + "."
+        arrays[prefix + "ts_ns"] = track.timestamps
+        for key, column in track.series.items():
+            arrays[prefix + key] = column
+    return arrays
+
+
+def export_npz(
+    events: Iterable[TraceEvent] | EventTable,
+    dest: str | Path | IO[bytes],
+    compress: bool = False,
+    counters: Iterable[CounterTrack] = (),
+) -> None:
+    """Write events as a NumPy .npz archive, without needing NumPy.
+
+    Each column is one .npy member: int64 start_ns, end_ns, duration_ns,
+    parent_index, token_index and scope_arg (-1 = none); int32 codes name,
+    category and scope with unicode dictionaries name.dict etc. Metadata
+    columns are named "meta.<key>": int64, float64 (NaN = absent) or int32
+    codes (-1 = absent) with a "meta.<key>.dict". Each counter track (e.g.
+    Tracer.counters.values()) adds "counter.<name>.ts_ns" and one
+    "counter.<name>.<series>" per series, with their own length.
+    np.load(dest) reads it directly.
+    """
+    table = events if isinstance(events, EventTable) else events_to_table(events)
+    mode = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+    with zipfile.ZipFile(dest, "w", compression=mode, allowZip64=True) as zf:
+        for column, data in _npz_arrays(table).items():
+            zf.writestr(column + ".npy", _npy(data))
+        for column, samples in _counter_arrays(counters).items():
+            zf.writestr(column + ".npy", _npy(samples))
+
+
+def read_npz(source: str | Path | IO[bytes]) -> dict[str, array[Any] | list[str]]:
+    """Read an archive written by export_npz with the stdlib only."""
+    out: dict[str, array[Any] | list[str]] = {}
+    with zipfile.ZipFile(source) as zf:
+        for member in zf.namelist():
+            raw = zf.read(member)
+            if not raw.startswith(_NPY_MAGIC):
+                raise ValueError(f"{member} is not a version 1.0 .npy file")
+            header_len = int.from_bytes(raw[8:10], "little")
+            header = ast.literal_eval(raw[10 : 10 + header_len].decode("latin1"))
+            body = raw[10 + header_len :]
+            descr = header["descr"]
+            if descr.startswith("<U"):
+                width = int(descr[2:])
+                text = body.decode("utf-32-le")
+                out[member[:-4]] = [
+                    text[i : i + width].rstrip("\0") for i in range(0, len(text), width)
+                ]
+            else:
+                data = array(_TYPECODES[descr])
+                data.frombytes(body)
+                if sys.byteorder == "big":
+                    data.byteswap()
+                out[member[:-4]] = data
+    return out
+
+
+def export_arrow(
+    events: Iterable[TraceEvent] | EventTable,
+    dest: str | Path,
+) -> None:
+    """Write events as an Arrow IPC file (requires pyarrow).
+
+    Same columns as export_npz, except name/category/scope and string
+    metadata are dictionary-typed and absent values are nulls. An Arrow
+    table has one length, so counter tracks are not written; use export_npz
+    for them.
+    """
+    try:
+        import pyarrow as pa
+    except ImportError as exc:
+        raise ImportError("export_arrow requires pyarrow: pip install argus[arrow]") from exc
+
+    t = events if isinstance(events, EventTable) else events_to_table(events)
+
+    def dictionary(codes: array[int], values: list[str]) -> Any:
+        return pa.DictionaryArray.from_arrays(
+            pa.array(codes, pa.int32()), pa.array(values, pa.string())
+        )
+
+    columns: dict[str, Any] = {
+        "start_ns": pa.array(t.start_ns, pa.int64()),
+        "end_ns": pa.array(t.end_ns, pa.int64()),
+        "duration_ns": pa.array(t.duration_ns, pa.int64()),
+        "name": dictionary(t.name, t.name_dict),
+        "category": dictionary(t.category, t.category_dict),
+        "scope": dictionary(t.scope, t.scope_dict),
+        "parent_index": pa.array([None if p < 0 else p for p in t.parent_index], pa.int64()),
+        "token_index": pa.array([None if k < 0 else k for k in t.token_index], pa.int64()),
+        "scope_arg": pa.array([None if k < 0 else k for k in t.scope_arg], pa.int64()),
+    }
+    for key, col in t.metadata.items():
+        if col.kind == "str":
+            columns[META_PREFIX + key] = pa.array(col.values, pa.string()).dictionary_encode()
+        elif col.kind == "int":
+            columns[META_PREFIX + key] = pa.array([int(v) for v in col.values], pa.int64())
+        else:
+            values = [None if v is None else float(v) for v in col.values]
+            columns[META_PREFIX + key] = pa.array(values, pa.float64())
+    table = pa.table(columns)
+    with pa.OSFile(str(dest), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def load_npz_dataframe(source: str | Path) -> Any:
+    """Load an export_npz archive into a pandas DataFrame with categorical columns.
+
+    Requires numpy and pandas; dictionary-coded columns become pd.Categorical
+    without decoding strings per row. Counter tracks are left out, as their
+    lengths differ from the events'.
+    """
+    import numpy as np
+    import pandas as pd
+
+    with np.load(source) as npz:
+        arrays = {name: npz[name] for name in npz.files}
+    data: dict[str, Any] = {}
+    for name, values in arrays.items():
+        if name.endswith(DICT_SUFFIX) or name.startswith(COUNTER_PREFIX):
+            continue
+        dictionary = arrays.get(name + DICT_SUFFIX)
+        if dictionary is not None:
+            data[name] = pd.Categorical.from_codes(values, categories=pd.Index(dictionary))
+        else:
+            data[name] = values
+    return pd.DataFrame(data)
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import os
+import threading
+from itertools import chain, islice
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from argus.core.compression import SUFFIX_FOR
+from argus.exporters.chrome import export_chrome_trace
+
+if TYPE_CHECKING:
+    from argus.core.counters import CounterTrack
+    from argus.core.events import TraceEvent
+    from argus.core.tracer import Tracer
+
+
+class PeriodicFlusher:
+    """Write a tracer's events to rolling Chrome trace chunks from a background thread.
+
+    Every `interval_s` the worker swaps the tracer's buffer for an empty one
+    (Tracer.swap_events, O(1)) and serializes the old buffer as the next chunk,
+    `<prefix>-<n>.json`, each a complete trace file. The recording thread never
+    serializes; events that were flushed are no longer in `tracer.events`.
+
+    A span closing on the recording thread during a swap can append to the old
+    buffer after it was taken. The flusher remembers how much of each buffer it
+    wrote and carries any such late events into the next chunk.
+    Chunks are written to a temporary name and renamed, so readers never see a
+    partial file. With `compression` ("gzip" or "xz") they are .json.gz/.json.xz.
+    Counter samples (Tracer.counter) recorded since the previous chunk are
+    written with it.
+    """
+
+    __slots__ = (
+        "_tracer",
+        "_directory",
+        "_interval_s",
+        "_prefix",
+        "_pid",
+        "_compression",
+        "_level",
+        "_chunks",
+        "_last",
+        "_counter_pos",
+        "_stop",
+        "_lock",
+        "_thread",
+    )
+
+    def __init__(
+        self,
+        tracer: Tracer,
+        directory: str | Path,
+        interval_s: float = 1.0,
+        prefix: str = "trace",
+        pid: int = 1,
+        compression: str | None = None,
+        level: int | None = None,
+    ) -> None:
+        self._tracer = tracer
+        self._directory = Path(directory)
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._interval_s = interval_s
+        self._prefix = prefix
+        self._pid = pid
+        self._compression = compression
+        self._level = level
+        self._chunks: list[Path] = []
+        # the previously swapped buffer and how many of its events were written
+        self._last: tuple[list[TraceEvent], int] | None = None
+        # samples written per counter, keyed by (tracer generation, name) as
+        # reset() replaces every track
+        self._counter_pos: dict[tuple[int, str], int] = {}
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def chunks(self) -> list[Path]:
+        """Chunk files written so far, oldest first."""
+        return list(self._chunks)
+
+    def start(self) -> PeriodicFlusher:
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="argus-flusher", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval_s):
+            self.flush()
+
+    def flush(self) -> Path | None:
+        """Swap and write one chunk now. Returns its path, or None if nothing was pending."""
+        with self._lock:
+            events = self._tracer.swap_events()
+            n = len(events)
+            late: list[TraceEvent] = []
+            if self._last is not None:
+                previous, written = self._last
+                late = previous[written:]
+            self._last = (events, n)
+            counters = self._new_counter_samples()
+            if not n and not late and not counters:
+                return None
+            suffix = SUFFIX_FOR.get(self._compression or "", "")
+            path = self._directory / f"{self._prefix}-{len(self._chunks):06d}.json{suffix}"
+            tmp = path.with_name(path.name + ".tmp")
+            export_chrome_trace(
+                chain(late, islice(events, n)),
+                tmp,
+                self._pid,
+                self._compression,
+                self._level,
+                counters=counters,
+            )
+            os.replace(tmp, path)
+            self._chunks.append(path)
+            return path
+
+    def _new_counter_samples(self) -> list[CounterTrack]:
+        out = []
+        generation = self._tracer.generation
+        for track in list(self._tracer.counters.values()):
+            key = (generation, track.name)
+            start = self._counter_pos.get(key, 0)
+            part = track.since(start)
+            if len(part):
+                self._counter_pos[key] = start + len(part)
+                out.append(part)
+        for key in [k for k in self._counter_pos if k[0] != generation]:
+            del self._counter_pos[key]
+        return out
+
+    def stop(self) -> list[Path]:
+        """Stop the worker and write whatever is left. Returns every chunk path.
+
+        Call from the recording thread once it has stopped recording.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+        self._last = None
+        return self.chunks
+
+    def __enter__(self) -> PeriodicFlusher:
+        return self.start()
+
+    def __exit__(self, *_: object) -> None:
+        self.stop()
@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import heapq
+import json
+import warnings
+from dataclasses import dataclass
+from itertools import chain
+from operator import itemgetter
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any
+
+from argus.core.clock import clock_pair
+from argus.core.compression import open_trace_for_write
+from argus.importers.chrome import iter_chrome_events
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator, Sequence
+
+    from argus.core.events import TraceEvent
+    from argus.core.tracer import Tracer
+
+HANDSHAKE_NAME = "clock_handshake"
+ALIGN_MODES = frozenset({"wall", "barrier", "none"})
+_DROPPED_METADATA = frozenset({"process_name", "process_sort_index"})
+_merge_key = itemgetter(0)
+
+
+def record_clock_handshake(
+    tracer: Tracer,
+    process_name: str | None = None,
+    rank: int | None = None,
+    barrier: Callable[[], object] | None = None,
+) -> TraceEvent:
+    """Record the clock reference that merge_chrome_traces uses to align processes.
+
+    Call once per process at startup. The event pairs a monotonic timestamp with
+    wall-clock time ("wall" alignment). When every process passes the same
+    `barrier` (e.g. torch.distributed.barrier), the handshakes are taken at the
+    same instant and "barrier" alignment can be used instead.
+    """
+    if barrier is not None:
+        barrier()
+    mono_ns, wall_ns = clock_pair()
+    metadata: dict[str, Any] = {"wall_ns": wall_ns}
+    if process_name is not None:
+        metadata["process_name"] = process_name
+    if rank is not None:
+        metadata["rank"] = rank
+    return tracer.record_span(HANDSHAKE_NAME, mono_ns, mono_ns, "system", "clock", metadata)
+
+
+@dataclass(frozen=True, slots=True)
+class MergedProcess:
+    pid: int
+    name: str
+    offset_ns: int
+    source: str
+
+
+def _find_handshake(
+    source: str | Path, scan_limit: int
+) -> tuple[dict[str, Any] | None, Iterator[dict[str, Any]]]:
+    """Scan the start of `source` for its handshake, in the same pass as the merge.
+
+    Returns the handshake and an iterator over all of the source's events,
+    which replays the scanned ones before resuming the stream.
+    """
+    events = iter_chrome_events(source)
+    scanned: list[dict[str, Any]] = []
+    handshake = None
+    for ev in events:
+        scanned.append(ev)
+        if ev.get("name") == HANDSHAKE_NAME and ev.get("cat") == "system":
+            handshake = ev
+            break
+        if len(scanned) >= scan_limit:
+            break
+    return handshake, chain(scanned, events)
+
+
+def _clock_offsets(handshakes: list[dict[str, Any] | None], align: str) -> list[int]:
+    """Per-source shift in ns onto the timeline of the first source with a handshake."""
+    if align == "none":
+        return [0] * len(handshakes)
+    refs: list[int | None] = []
+    for hs in handshakes:
+        if hs is None:
+            refs.append(None)
+            continue
+        mono_ns = round(hs.get("ts", 0) * 1_000)
+        if align == "barrier":
+            refs.append(-mono_ns)
+        else:
+            wall_ns = (hs.get("args") or {}).get("wall_ns")
+            refs.append(None if wall_ns is None else int(wall_ns) - mono_ns)
+    base = next((r for r in refs if r is not None), 0)
+    return [0 if r is None else r - base for r in refs]
+
+
+def _shifted_events(
+    events: Iterator[dict[str, Any]],
+    pid: int,
+    shift_ns: int,
+    reorder_window: int,
+) -> Iterator[tuple[float, int, dict[str, Any]]]:
+    """Yield (end_ts, seq, event) from one trace, rewritten onto the merged timeline.
+
+    Argus appends events as they close, so end timestamps are already in order;
+    a small heap absorbs local disorder from other producers.
+    """
+    heap: list[tuple[float, int, dict[str, Any]]] = []
+    for seq, ev in enumerate(events):
+        if ev.get("ph") == "M" and ev.get("name") in _DROPPED_METADATA:
+            continue
+        ev["pid"] = pid
+        ts = ev.get("ts")
+        if ts is not None:
+            ts = (round(ts * 1_000) + shift_ns) / 1_000.0
+            ev["ts"] = ts
+        key = (ts or 0.0) + ev.get("dur", 0.0)
+        if len(heap) < reorder_window:
+            heapq.heappush(heap, (key, seq, ev))
+        else:
+            yield heapq.heappushpop(heap, (key, seq, ev))
+    while heap:
+        yield heapq.heappop(heap)
+
+
+def _process_name(
+    index: int,
+    source: str | Path,
+    handshake: dict[str, Any] | None,
+    explicit: Sequence[str] | None,
+) -> str:
+    if explicit is not None and index < len(explicit):
+        return explicit[index]
+    args = (handshake or {}).get("args") or {}
+    if "process_name" in args:
+        return str(args["process_name"])
+    if "rank" in args:
+        return f"rank {args['rank']}"
+    return Path(source).stem
+
+
+def merge_chrome_traces(
+    sources: Sequence[str | Path],
+    dest: str | Path | IO[str],
+    process_names: Sequence[str] | None = None,
+    align: str = "wall",
+    reorder_window: int = 4096,
+    handshake_scan_limit: int = 100_000,
+) -> list[MergedProcess]:
+    """Merge per-process Chrome traces into one timeline with one pid per process.
+
+    Clock offsets come from each trace's clock_handshake event (see
+    record_clock_handshake): "wall" maps every process onto the first one's
+    monotonic clock through its wall-clock pairing, "barrier" lines up the
+    handshake timestamps themselves, and "none" leaves timestamps as written.
+    Inputs are read once, streamed and k-way merged by end timestamp, so
+    memory grows with the number of inputs rather than their size; the events
+    before each handshake (at most `handshake_scan_limit`) are held until then.
+    """
+    if align not in ALIGN_MODES:
+        raise ValueError(f"Unknown align mode '{align}', expected one of {sorted(ALIGN_MODES)}")
+
+    scans = [_find_handshake(src, handshake_scan_limit) for src in sources]
+    handshakes = [hs for hs, _ in scans]
+    if align != "none":
+        for src, hs in zip(sources, handshakes, strict=True):
+            if hs is None:
+                warnings.warn(
+                    f"No {HANDSHAKE_NAME} event in '{src}', its clock is left unaligned",
+                    stacklevel=2,
+                )
+    offsets = _clock_offsets(handshakes, align)
+
+    ranks = [((hs or {}).get("args") or {}).get("rank") for hs in handshakes]
+    use_ranks = all(isinstance(r, int) for r in ranks) and len(set(ranks)) == len(ranks)
+    processes = [
+        MergedProcess(
+            pid=int(ranks[i]) + 1 if use_ranks else i + 1,  # type: ignore[arg-type]
+            name=_process_name(i, src, handshakes[i], process_names),
+            offset_ns=offsets[i],
+            source=str(src),
+        )
+        for i, src in enumerate(sources)
+    ]
+
+    streams = [
+        _shifted_events(events, proc.pid, proc.offset_ns, reorder_window)
+        for (_, events), proc in zip(scans, processes, strict=True)
+    ]
+    if isinstance(dest, (str, Path)):
+        with open_trace_for_write(dest) as f:
+            _write_merged(processes, streams, align, f)
+    else:
+        _write_merged(processes, streams, align, dest)
+    return processes
+
+
+def _write_merged(
+    processes: list[MergedProcess],
+    streams: list[Iterator[tuple[float, int, dict[str, Any]]]],
+    align: str,
+    f: IO[str],
+) -> None:
+    dumps = json.dumps
+    f.write('{"traceEvents": [')
+    first = True
+    for proc in processes:
+        for name, args in (
+            ("process_name", {"name": proc.name}),
+            ("process_sort_index", {"sort_index": proc.pid}),
+        ):
+            meta = {"ph": "M", "name": name, "pid": proc.pid, "args": args}
+            f.write(dumps(meta) if first else ", " + dumps(meta))
+            first = False
+    for _, _, ev in heapq.merge(*streams, key=_merge_key):
+        f.write(dumps(ev) if first else ", " + dumps(ev))
+        first = False
+    metadata = {
+        "argus_version": "0.1.0",
+        "clock_source": "monotonic_ns",
+        "clock_alignment": align,
+        "merged_processes": [
+            {"pid": p.pid, "name": p.name, "offset_ns": p.offset_ns, "source": p.source}
+            for p in processes
+        ],
+    }
+    f.write('], "displayTimeUnit": "ns", "metadata": ' + dumps(metadata) + "}")
@@ -0,0 +1,304 @@
+from __future__ import annotations
+
+import hashlib
+import http.client
+import json
+import os
+import threading
+import time
+from collections import deque
+from functools import partial
+from typing import TYPE_CHECKING, Any
+from urllib.parse import urlsplit
+
+from argus.core.clock import clock_pair
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from argus.core.events import TraceEvent
+    from argus.core.tracer import EventListener, Tracer
+
+DEFAULT_ENDPOINT = "http://127.0.0.1:4318/v1/traces"
+_SPAN_KIND_INTERNAL = 1
+
+
+def _span_id(event_id: str, generation: int) -> str:
+    # event ids restart at 0 after Tracer.reset(), the generation keeps spans apart
+    key = f"{generation}:{event_id}" if generation else event_id
+    return hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+
+
+def _attr_value(value: Any) -> dict[str, Any] | None:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, str):
+        return {"stringValue": value}
+    return None
+
+
+def _attributes(event: TraceEvent) -> list[dict[str, Any]]:
+    attrs = [
+        {"key": "argus.event_id", "value": {"stringValue": event.event_id}},
+        {"key": "argus.category", "value": {"stringValue": event.category}},
+        {"key": "argus.scope", "value": {"stringValue": event.full_scope}},
+    ]
+    if event.token_index is not None:
+        attrs.append({"key": "argus.token_index", "value": {"intValue": str(event.token_index)}})
+    for k, v in event.metadata.items():
+        value = _attr_value(v)
+        if value is not None:
+            attrs.append({"key": k, "value": value})
+    return attrs
+
+
+def _otlp_spans(
+    entries: Iterable[tuple[int, TraceEvent]], trace_id: str, epoch_offset_ns: int
+) -> list[dict[str, Any]]:
+    spans = []
+    for generation, e in entries:
+        if e.category == "memory" and e.end_ns == e.start_ns:
+            continue
+        span: dict[str, Any] = {
+            "traceId": trace_id,
+            "spanId": _span_id(e.event_id, generation),
+            "name": e.name,
+            "kind": _SPAN_KIND_INTERNAL,
+            "startTimeUnixNano": str(e.start_ns + epoch_offset_ns),
+            "endTimeUnixNano": str(max(e.end_ns, e.start_ns) + epoch_offset_ns),
+            "attributes": _attributes(e),
+        }
+        if e.parent_id is not None:
+            span["parentSpanId"] = _span_id(e.parent_id, generation)
+        spans.append(span)
+    return spans
+
+
+def _request(spans: list[dict[str, Any]], service_name: str) -> dict[str, Any]:
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]
+                },
+                "scopeSpans": [{"scope": {"name": "argus", "version": "0.1.0"}, "spans": spans}],
+            }
+        ]
+    }
+
+
+def events_to_otlp(
+    events: Iterable[TraceEvent],
+    trace_id: str,
+    epoch_offset_ns: int,
+    service_name: str = "argus",
+    generation: int = 0,
+) -> dict[str, Any]:
+    """Build an OTLP/JSON ExportTraceServiceRequest for `events`.
+
+    event_id/parent_id become span ids (8-byte hashes) within `trace_id`,
+    salted with the tracer's reset `generation` (Tracer.generation) so ids
+    reused after a reset get new spans; monotonic timestamps are shifted by
+    `epoch_offset_ns` onto Unix time. Zero-duration memory events are counter
+    samples, not spans, and are skipped.
+    """
+    entries = ((generation, e) for e in events)
+    return _request(_otlp_spans(entries, trace_id, epoch_offset_ns), service_name)
+
+
+class OTLPExporter:
+    """Tracer listener that ships spans to an OTLP/HTTP JSON collector in batches.
+
+    The recording thread only appends to a bounded deque. A background thread
+    sends a batch once `max_batch_size` events are waiting or `max_delay_s` has
+    passed, over one persistent HTTP connection that is reopened after errors.
+    When the queue is full, new events are dropped and counted, or with
+    block=True the recording thread waits for space (backpressure).
+    Only spans are shipped: counter tracks (Tracer.counter) never reach
+    listeners, so export them with export_chrome or the Prometheus endpoint.
+    """
+
+    __slots__ = (
+        "_endpoint",
+        "_service_name",
+        "_max_batch_size",
+        "_max_delay_s",
+        "_max_queue_size",
+        "_block",
+        "_timeout_s",
+        "_max_retries",
+        "_headers",
+        "_queue",
+        "_listeners",
+        "_wake",
+        "_space",
+        "_done",
+        "_stop",
+        "_enqueued",
+        "_processed",
+        "_dropped",
+        "_failed",
+        "_conn",
+        "_thread",
+        "trace_id",
+        "epoch_offset_ns",
+    )
+
+    def __init__(
+        self,
+        endpoint: str = DEFAULT_ENDPOINT,
+        service_name: str = "argus",
+        max_batch_size: int = 512,
+        max_delay_s: float = 1.0,
+        max_queue_size: int = 8_192,
+        block: bool = False,
+        timeout_s: float = 10.0,
+        max_retries: int = 2,
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        self._endpoint = urlsplit(endpoint)
+        if self._endpoint.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported OTLP endpoint scheme '{self._endpoint.scheme}'")
+        self._service_name = service_name
+        self._max_batch_size = max_batch_size
+        self._max_delay_s = max_delay_s
+        self._max_queue_size = max_queue_size
+        self._block = block
+        self._timeout_s = timeout_s
+        self._max_retries = max_retries
+        self._headers = {"Content-Type": "application/json", **(headers or {})}
+        # (tracer generation, event): span ids are salted with the generation
+        self._queue: deque[tuple[int, TraceEvent]] = deque()
+        self._listeners: dict[Tracer, EventListener] = {}
+        self._wake = threading.Event()
+        self._space = threading.Event()
+        self._done = threading.Condition()
+        self._stop = False
+        self._enqueued = 0
+        self._processed = 0
+        self._dropped = 0
+        self._failed = 0
+        self._conn: http.client.HTTPConnection | None = None
+        mono_ns, wall_ns = clock_pair()
+        self.epoch_offset_ns = wall_ns - mono_ns
+        self.trace_id = os.urandom(16).hex()
+        self._thread = threading.Thread(target=self._run, name="argus-otlp", daemon=True)
+        self._thread.start()
+
+    @property
+    def dropped(self) -> int:
+        """Events rejected because the queue was full."""
+        return self._dropped
+
+    @property
+    def failed(self) -> int:
+        """Events in batches the collector never accepted."""
+        return self._failed
+
+    def attach(self, tracer: Tracer) -> OTLPExporter:
+        """Export `tracer`'s spans, keeping them distinct across its reset() calls."""
+        listener = self._listeners[tracer] = partial(self._record, tracer)
+        tracer.add_listener(listener)
+        return self
+
+    def detach(self, tracer: Tracer) -> None:
+        tracer.remove_listener(self._listeners.pop(tracer))
+
+    def __call__(self, event: TraceEvent, generation: int = 0) -> None:
+        queue = self._queue
+        if len(queue) >= self._max_queue_size:
+            if not self._block:
+                self._dropped += 1
+                return
+            while len(queue) >= self._max_queue_size and not self._stop:
+                self._space.clear()
+                self._wake.set()
+                self._space.wait(0.05)
+        queue.append((generation, event))
+        self._enqueued += 1
+        if len(queue) >= self._max_batch_size:
+            self._wake.set()
+
+    def _record(self, tracer: Tracer, event: TraceEvent) -> None:
+        self(event, tracer.generation)
+
+    def flush(self, timeout_s: float | None = None) -> bool:
+        """Block until everything enqueued so far has been sent (or failed)."""
+        target = self._enqueued
+        self._wake.set()
+        with self._done:
+            return self._done.wait_for(lambda: self._processed >= target, timeout_s)
+
+    def shutdown(self, timeout_s: float | None = None) -> None:
+        self.flush(timeout_s)
+        self._stop = True
+        self._wake.set()
+        self._space.set()
+        self._thread.join(timeout_s)
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self) -> OTLPExporter:
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.shutdown()
+
+    def _run(self) -> None:
+        queue = self._queue
+        while True:
+            self._wake.wait(self._max_delay_s)
+            self._wake.clear()
+            while queue:
+                batch: list[tuple[int, TraceEvent]] = []
+                while queue and len(batch) < self._max_batch_size:
+                    batch.append(queue.popleft())
+                self._space.set()
+                if not self._send(batch):
+                    self._failed += len(batch)
+                with self._done:
+                    self._processed += len(batch)
+                    self._done.notify_all()
+            if self._stop:
+                return
+
+    def _connect(self) -> http.client.HTTPConnection:
+        if self._conn is None:
+            cls = (
+                http.client.HTTPSConnection
+                if self._endpoint.scheme == "https"
+                else http.client.HTTPConnection
+            )
+            self._conn = cls(
+                self._endpoint.hostname or "127.0.0.1",
+                self._endpoint.port,
+                timeout=self._timeout_s,
+            )
+        return self._conn
+
+    def _send(self, batch: list[tuple[int, TraceEvent]]) -> bool:
+        spans = _otlp_spans(batch, self.trace_id, self.epoch_offset_ns)
+        body = json.dumps(_request(spans, self._service_name)).encode()
+        path = self._endpoint.path or "/v1/traces"
+        for attempt in range(self._max_retries + 1):
+            try:
+                conn = self._connect()
+                conn.request("POST", path, body=body, headers=self._headers)
+                resp = conn.getresponse()
+                resp.read()
+                if 200 <= resp.status < 300:
+                    return True
+                if resp.status < 500 and resp.status != 429:
+                    return False
+            except (OSError, http.client.HTTPException):
+                if self._conn is not None:
+                    self._conn.close()
+                    self._conn = None
+            if attempt < self._max_retries:
+                time.sleep(min(0.1 * 2**attempt, 1.0))
+        return False
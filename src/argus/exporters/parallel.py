@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import json
+import os
+import warnings
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any
+
+from argus.core.compression import open_trace_for_write
+from argus.exporters.chrome import (
+    _FOOTER,
+    _HEADER,
+    _VALID_CATEGORIES,
+    _counter_samples,
+    _counter_to_chrome,
+    _fields_to_chrome,
+    export_chrome_trace,
+)
+from argus.importers.chrome import TraceColumns
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from argus.core.counters import CounterTrack
+    from argus.core.events import TraceEvent
+
+DEFAULT_SHARD_SIZE = 50_000
+
+# TraceEvent field order, as taken by _fields_to_chrome
+_Shard = tuple[
+    list[str],
+    list[str],
+    list[int],
+    list[int],
+    list[str],
+    list[str],
+    "list[str | None]",
+    "list[int | None]",
+    "list[dict[str, Any]]",
+    "list[int | None]",
+]
+
+
+def _shard_to_json(shard: _Shard, pid: int, samples: list[tuple[int, str]]) -> str:
+    """The shard's events as JSON, with its due counter samples (ts_ns, json) interleaved.
+
+    Each sample goes before the first event ending at or after it, as in
+    export_chrome_trace.
+    """
+    dumps = json.dumps
+    rows = zip(*shard, [pid] * len(shard[0]), strict=True)
+    if not samples:
+        return ", ".join(dumps(_fields_to_chrome(*row)) for row in rows)
+    parts = []
+    k = 0
+    for row in rows:
+        end_ns = row[3]
+        while k < len(samples) and samples[k][0] <= end_ns:
+            parts.append(samples[k][1])
+            k += 1
+        parts.append(dumps(_fields_to_chrome(*row)))
+    return ", ".join(parts)
+
+
+def _shards_from_events(events: Iterable[TraceEvent], size: int) -> Iterator[_Shard]:
+    it = iter(events)
+    while batch := list(islice(it, size)):
+        yield (
+            [e.event_id for e in batch],
+            [e.name for e in batch],
+            [e.start_ns for e in batch],
+            [e.end_ns for e in batch],
+            [e.category for e in batch],
+            [e.scope for e in batch],
+            [e.parent_id for e in batch],
+            [e.token_index for e in batch],
+            [e.metadata for e in batch],
+            [e.scope_arg for e in batch],
+        )
+
+
+def _shards_from_columns(cols: TraceColumns, size: int) -> Iterator[_Shard]:
+    for lo in range(0, len(cols), size):
+        hi = lo + size
+        yield (
+            cols.event_id[lo:hi],
+            cols.name[lo:hi],
+            cols.start_ns[lo:hi].tolist(),
+            cols.end_ns[lo:hi].tolist(),
+            cols.category[lo:hi],
+            cols.scope[lo:hi],
+            cols.parent_id[lo:hi],
+            cols.token_index[lo:hi],
+            cols.metadata[lo:hi],
+            [None] * len(cols.metadata[lo:hi]),
+        )
+
+
+def _warn_unknown_categories(shard: _Shard) -> None:
+    for category in set(shard[4]) - _VALID_CATEGORIES:
+        name = shard[1][shard[4].index(category)]
+        warnings.warn(f"Unknown category '{category}' in event '{name}'", stacklevel=4)
+
+
+def _write_parallel(
+    shards: Iterator[_Shard],
+    f: IO[str],
+    pid: int,
+    workers: int,
+    counters: Iterable[CounterTrack],
+    max_counter_samples: int | None,
+) -> None:
+    f.write(_HEADER)
+    sep = ""
+    # counter samples are cheap to format, so the parent does it and hands each
+    # shard those taken by its latest end; shards only see samples after earlier ones
+    samples = _counter_samples(counters, max_counter_samples)
+    sample = next(samples, None)
+    with ProcessPoolExecutor(workers) as pool:
+        # bounded in flight, fragments written in submission order
+        pending: deque[Future[str]] = deque()
+        for shard in shards:
+            _warn_unknown_categories(shard)
+            reach = max(shard[3])
+            due: list[tuple[int, str]] = []
+            while sample is not None and sample[0] <= reach:
+                ts, name, values = sample
+                due.append((ts, json.dumps(_counter_to_chrome(name, ts, values, pid))))
+                sample = next(samples, None)
+            pending.append(pool.submit(_shard_to_json, shard, pid, due))
+            if len(pending) >= 2 * workers:
+                f.write(sep + pending.popleft().result())
+                sep = ", "
+        while pending:
+            f.write(sep + pending.popleft().result())
+            sep = ", "
+    while sample is not None:
+        ts, name, values = sample
+        f.write(sep + json.dumps(_counter_to_chrome(name, ts, values, pid)))
+        sep = ", "
+        sample = next(samples, None)
+    f.write(_FOOTER)
+
+
+def export_chrome_trace_parallel(
+    events: Iterable[TraceEvent] | TraceColumns,
+    dest: str | Path | IO[str],
+    pid: int = 1,
+    max_workers: int | None = None,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    compression: str | None = "auto",
+    level: int | None = None,
+    counters: Iterable[CounterTrack] = (),
+    max_counter_samples: int | None = None,
+) -> None:
+    """export_chrome_trace across a process pool, with byte-identical output.
+
+    Events are cut into shards of `shard_size` and shipped to workers as
+    columns (one list per field), which pickle far more cheaply than
+    TraceEvents; a TraceColumns from load_chrome_columns is sharded without
+    building events at all. Each worker returns its shard's JSON fragment and
+    the fragments are written in order. Inputs of one shard or less, or
+    max_workers=1, use the serial exporter. Compression and `counters` are
+    as for export_chrome_trace; the parent formats counter samples and hands
+    each to the shard it falls in, so the output matches the serial one.
+    """
+    workers = max_workers or os.cpu_count() or 1
+    small = isinstance(events, (list, TraceColumns)) and len(events) <= shard_size
+    if workers == 1 or small:
+        if isinstance(events, TraceColumns):
+            events = events.to_events()
+        export_chrome_trace(events, dest, pid, compression, level, counters, max_counter_samples)
+        return
+    if isinstance(events, TraceColumns):
+        shards = _shards_from_columns(events, shard_size)
+    else:
+        shards = _shards_from_events(events, shard_size)
+    if isinstance(dest, (str, Path)):
+        with open_trace_for_write(dest, compression, level) as f:
+            _write_parallel(shards, f, pid, workers, counters, max_counter_samples)
+    else:
+        _write_parallel(shards, dest, pid, workers, counters, max_counter_samples)
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from argus.core.events import TraceEvent
+    from argus.core.tracer import Tracer
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# upper bounds in seconds, from 10 us (fast kernels) to 10 s (long prefills)
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.00001,
+    0.00005,
+    0.0001,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    10.0,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum_ns")
+
+    def __init__(self, num_buckets: int) -> None:
+        # one slot per finite bucket plus +Inf; not cumulative until rendered
+        self.counts = [0] * (num_buckets + 1)
+        self.sum_ns = 0
+
+
+class MetricsAggregator:
+    """Tracer listener that keeps Prometheus series up to date as events arrive.
+
+    Spans feed a duration histogram per (name, category); token spans increment
+    argus_tokens_generated_total; zero-duration memory events (counter samples
+    loaded from older traces) set one argus_counter_value gauge per numeric
+    metadata key. Updates are O(1) per event and take no locks: render() copies
+    each series, so a scrape never walks the event list or blocks recording.
+    Tracer.counter tracks of attached tracers are read at render time, one
+    gauge per series from the latest sample.
+    """
+
+    __slots__ = ("_bounds_ns", "_buckets", "_histograms", "_tokens", "_gauges", "_tracers")
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self._buckets = tuple(sorted(buckets))
+        self._bounds_ns = [round(b * 1e9) for b in self._buckets]
+        self._histograms: dict[tuple[str, str], _Histogram] = {}
+        self._tokens = 0
+        self._gauges: dict[tuple[str, str], float] = {}
+        self._tracers: list[Tracer] = []
+
+    def attach(self, tracer: Tracer) -> MetricsAggregator:
+        tracer.add_listener(self)
+        self._tracers.append(tracer)
+        return self
+
+    def detach(self, tracer: Tracer) -> None:
+        tracer.remove_listener(self)
+        self._tracers.remove(tracer)
+
+    def _counter_gauges(self) -> dict[tuple[str, str], float]:
+        gauges = dict(self._gauges)
+        for tracer in list(self._tracers):
+            for track in list(tracer.counters.values()):
+                sample = track.last()
+                for key, value in (sample or {}).items():
+                    if key != "token_index":
+                        gauges[(track.name, key)] = value
+        return gauges
+
+    def __call__(self, event: TraceEvent) -> None:
+        duration = event.end_ns - event.start_ns
+        if event.category == "memory" and duration == 0:
+            for series, value in event.metadata.items():
+                if series != "token_index" and isinstance(value, (int, float)):
+                    self._gauges[(event.name, series)] = value
+            return
+        if event.category == "token":
+            self._tokens += 1
+        key = (event.name, event.category)
+        hist = self._histograms.get(key)
+        if hist is None:
+            hist = self._histograms[key] = _Histogram(len(self._bounds_ns))
+        hist.counts[bisect_left(self._bounds_ns, duration)] += 1
+        hist.sum_ns += duration
+
+    def render(self) -> str:
+        """Prometheus text exposition of the current state, O(number of series)."""
+        lines = [
+            "# HELP argus_span_duration_seconds Duration of traced spans.",
+            "# TYPE argus_span_duration_seconds histogram",
+        ]
+        for (name, category), hist in sorted(list(self._histograms.items())):
+            counts = hist.counts[:]
+            labels = f'name="{_escape(name)}",category="{_escape(category)}"'
+            cumulative = 0
+            # the last count is the overflow bucket, written as +Inf below
+            for bound, n in zip(self._buckets, counts[:-1], strict=True):
+                cumulative += n
+                lines.append(
+                    f'argus_span_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}'
+                )
+            cumulative += counts[-1]
+            lines.append(f'argus_span_duration_seconds_bucket{{{labels},le="+Inf"}} {cumulative}')
+            lines.append(f"argus_span_duration_seconds_sum{{{labels}}} {hist.sum_ns / 1e9}")
+            lines.append(f"argus_span_duration_seconds_count{{{labels}}} {cumulative}")
+        lines += [
+            "# HELP argus_tokens_generated_total Token spans recorded.",
+            "# TYPE argus_tokens_generated_total counter",
+            f"argus_tokens_generated_total {self._tokens}",
+            "# HELP argus_counter_value Latest value of each counter series.",
+            "# TYPE argus_counter_value gauge",
+        ]
+        for (name, series), value in sorted(self._counter_gauges().items()):
+            lines.append(
+                f'argus_counter_value{{name="{_escape(name)}",series="{_escape(series)}"}} {value}'
+            )
+        return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    aggregator: MetricsAggregator
+
+    def do_GET(self) -> None:  # noqa: N802
+        if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = self.aggregator.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+        pass
+
+
+class MetricsServer:
+    """Serves an aggregator's /metrics from a daemon thread."""
+
+    __slots__ = ("_server", "_thread", "aggregator")
+
+    def __init__(
+        self,
+        aggregator: MetricsAggregator,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        self.aggregator = aggregator
+        handler = type("Handler", (_MetricsHandler,), {"aggregator": aggregator})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="argus-metrics", daemon=True
+        )
+
+    @property
+    def port(self) -> int:
+        return int(self._server.server_address[1])
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        if isinstance(host, bytes):
+            host = host.decode()
+        return f"http://{host}:{port}/metrics"
+
+    def start(self) -> MetricsServer:
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def __enter__(self) -> MetricsServer:
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.stop()
+
+
+def start_metrics_server(
+    tracer: Tracer,
+    port: int = 9464,
+    host: str = "127.0.0.1",
+    buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+) -> MetricsServer:
+    """Attach a MetricsAggregator to `tracer` and serve it on host:port."""
+    aggregator = MetricsAggregator(buckets).attach(tracer)
+    return MetricsServer(aggregator, host, port).start()
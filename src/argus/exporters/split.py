@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import json
+import os
+from bisect import bisect_left, bisect_right
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from argus.core.compression import SUFFIX_FOR
+from argus.core.events import TraceEvent
+from argus.exporters.chrome import export_chrome_trace
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from argus.core.counters import CounterTrack
+
+INDEX_NAME = "index.json"
+
+# plain tuples in TraceEvent field order; they pickle far faster than TraceEvents
+_Row = tuple[
+    str, str, int, int, str, str, "str | None", "int | None", "dict[str, Any]", "int | None"
+]
+
+
+@dataclass(frozen=True, slots=True)
+class ChunkInfo:
+    """One chunk file of a split trace, as recorded in index.json."""
+
+    file: str
+    start_ns: int
+    end_ns: int
+    num_events: int
+    num_clipped: int
+    phases: list[str] = field(default_factory=list)
+    num_counter_samples: int = 0
+
+
+def _time_boundaries(t0: int, t_end: int, window_ns: int) -> list[int]:
+    count = (t_end - t0) // window_ns + 1
+    return [t0 + k * window_ns for k in range(count + 1)]
+
+
+def _count_boundaries(starts: list[int], t0: int, t_end: int, max_events: int) -> list[int]:
+    starts = sorted(starts)
+    bounds = sorted({t0, *(starts[k] for k in range(max_events, len(starts), max_events))})
+    bounds.append(max(t_end, bounds[-1]) + 1)
+    return bounds
+
+
+def _partition(
+    events: list[TraceEvent], bounds: list[int]
+) -> tuple[list[list[_Row]], list[int], list[list[str]]]:
+    """Assign each event to every window [bounds[k], bounds[k+1]) it overlaps.
+
+    A span crossing a boundary is clipped to each window it touches and tagged
+    with its true extent, so every chunk keeps the ancestors of its own spans
+    and nesting stays valid when chunks are opened on their own.
+    """
+    n = len(bounds) - 1
+    rows: list[list[_Row]] = [[] for _ in range(n)]
+    clipped = [0] * n
+    phases: list[list[str]] = [[] for _ in range(n)]
+    for e in events:
+        first = bisect_right(bounds, e.start_ns) - 1
+        last = max(first, bisect_left(bounds, e.end_ns) - 1)
+        top_phase = e.category == "phase" and e.parent_id is None
+        row: _Row = (
+            e.event_id,
+            e.name,
+            e.start_ns,
+            e.end_ns,
+            e.category,
+            e.scope,
+            e.parent_id,
+            e.token_index,
+            e.metadata,
+            e.scope_arg,
+        )
+        if first == last:
+            rows[first].append(row)
+            if top_phase:
+                phases[first].append(e.name)
+            continue
+        meta = {**e.metadata, "split_start_ns": e.start_ns, "split_end_ns": e.end_ns}
+        for k in range(first, last + 1):
+            start = max(e.start_ns, bounds[k])
+            end = min(e.end_ns, bounds[k + 1])
+            rows[k].append(row[:2] + (start, end) + row[4:8] + (meta, e.scope_arg))
+            clipped[k] += 1
+            if top_phase:
+                phases[k].append(e.name)
+    return rows, clipped, phases
+
+
+def _write_chunk(
+    path: str,
+    rows: list[_Row],
+    counters: list[CounterTrack],
+    pid: int,
+    compression: str | None,
+    level: int | None,
+) -> None:
+    tmp = path + ".tmp"
+    events = (TraceEvent(*row) for row in rows)
+    export_chrome_trace(events, tmp, pid, compression, level, counters=counters)
+    os.replace(tmp, path)
+
+
+def split_chrome_trace(
+    events: Iterable[TraceEvent],
+    directory: str | Path,
+    window_ns: int | None = None,
+    max_events: int | None = None,
+    pid: int = 1,
+    prefix: str = "chunk",
+    max_workers: int | None = None,
+    compression: str | None = None,
+    level: int | None = None,
+    counters: Iterable[CounterTrack] = (),
+) -> list[ChunkInfo]:
+    """Export `events` as a directory of Chrome trace chunks plus an index.json.
+
+    Chunks cover consecutive time windows: fixed `window_ns` wide, or cut every
+    `max_events` events by start time. Spans crossing a window edge appear in
+    each window they overlap, clipped to it, with metadata split_start_ns and
+    split_end_ns giving the real extent. `counters` (Tracer.counters values)
+    are clipped the same way: each chunk holds a track's samples in its window,
+    led by the value in effect at the window's start (CounterTrack.window).
+    Empty windows produce no file. The index lists each chunk's time range and
+    the top-level phases it touches.
+
+    Chunks are serialized by a process pool of `max_workers` (default: CPU
+    count); max_workers=1 writes them in this process. With `compression`
+    ("gzip" or "xz") chunks are written as .json.gz / .json.xz.
+    """
+    if (window_ns is None) == (max_events is None):
+        raise ValueError("Pass exactly one of window_ns or max_events")
+    if (window_ns is not None and window_ns <= 0) or (max_events is not None and max_events <= 0):
+        raise ValueError("window_ns and max_events must be positive")
+    out = Path(directory)
+    out.mkdir(parents=True, exist_ok=True)
+    events = list(events)
+    tracks = [track for track in counters if len(track)]
+    chunks: list[ChunkInfo] = []
+    if events or tracks:
+        sample_ts = [ts for track in tracks for ts in (track.timestamps[0], track.timestamps[-1])]
+        t0 = min([e.start_ns for e in events] + sample_ts)
+        t_end = max([max(e.end_ns, e.start_ns) for e in events] + sample_ts)
+        if window_ns is not None:
+            bounds = _time_boundaries(t0, t_end, window_ns)
+        else:
+            starts = [e.start_ns for e in events]
+            bounds = _count_boundaries(starts, t0, t_end, max_events or 1)
+        rows, clipped, phases = _partition(events, bounds)
+        del events
+        suffix = SUFFIX_FOR.get(compression or "", "")
+        jobs: list[tuple[str, list[_Row], list[CounterTrack]]] = []
+        for k, chunk_rows in enumerate(rows):
+            start, stop = bounds[k], bounds[k + 1]
+            # samples taken inside the window; a value carried in from before is not one
+            sampled = sum(
+                bisect_left(t.timestamps, stop) - bisect_left(t.timestamps, start) for t in tracks
+            )
+            if not chunk_rows and not sampled:
+                continue
+            name = f"{prefix}-{len(chunks):06d}.json{suffix}"
+            chunks.append(
+                ChunkInfo(
+                    file=name,
+                    start_ns=start,
+                    end_ns=min(stop, t_end),
+                    num_events=len(chunk_rows),
+                    num_clipped=clipped[k],
+                    phases=list(dict.fromkeys(phases[k])),
+                    num_counter_samples=sampled,
+                )
+            )
+            windows = [track.window(start, stop) for track in tracks]
+            jobs.append((str(out / name), chunk_rows, [w for w in windows if len(w)]))
+        _write_chunks(jobs, pid, max_workers, compression, level)
+
+    index = {
+        "version": 1,
+        "pid": pid,
+        "window_ns": window_ns,
+        "max_events": max_events,
+        "chunks": [asdict(c) for c in chunks],
+    }
+    with open(out / INDEX_NAME, "w") as f:
+        json.dump(index, f, indent=1)
+    return chunks
+
+
+def _write_chunks(
+    jobs: list[tuple[str, list[_Row], list[CounterTrack]]],
+    pid: int,
+    max_workers: int | None,
+    compression: str | None,
+    level: int | None,
+) -> None:
+    workers = max_workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) == 1:
+        for path, rows, tracks in jobs:
+            _write_chunk(path, rows, tracks, pid, compression, level)
+        return
+    with ProcessPoolExecutor(min(workers, len(jobs))) as pool:
+        # a bounded number in flight, so pickled chunks don't pile up in the call queue
+        pending: deque[Future[None]] = deque()
+        for path, rows, tracks in jobs:
+            if len(pending) >= 2 * workers:
+                pending.popleft().result()
+            pending.append(pool.submit(_write_chunk, path, rows, tracks, pid, compression, level))
+        for fut in pending:
+            fut.result()
+
+
+def load_split_index(directory: str | Path) -> list[ChunkInfo]:
+    """Read the index.json written by split_chrome_trace."""
+    with open(Path(directory) / INDEX_NAME) as f:
+        index = json.load(f)
+    return [ChunkInfo(**c) for c in index["chunks"]]
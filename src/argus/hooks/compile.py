@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import sys
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from argus.core.clock import monotonic_ns
+from argus.hooks.profiler import token_indices
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from argus.core.events import TraceEvent
+    from argus.core.tracer import Tracer
+
+COMPILE_SPAN = "torch_compile"
+RECOMPILE_SPAN = "recompile"
+
+
+def _dynamo_utils() -> Any:
+    # only look at torch if the caller already imported it
+    return sys.modules.get("torch._dynamo.utils")
+
+
+def _guard_failure_count() -> int:
+    utils = _dynamo_utils()
+    failures = getattr(utils, "guard_failures", None) or {}
+    return sum(len(reasons) for reasons in failures.values())
+
+
+def _new_guard_failures(since: int) -> list[str]:
+    utils = _dynamo_utils()
+    failures = getattr(utils, "guard_failures", None) or {}
+    reasons = [str(r) for rs in failures.values() for r in rs]
+    return reasons[since:]
+
+
+def _phase_totals() -> dict[str, float]:
+    """Seconds spent so far in each Dynamo/Inductor phase (compilation_time_metrics)."""
+    utils = _dynamo_utils()
+    metrics = getattr(utils, "compilation_time_metrics", None) or {}
+    return {name: sum(times) for name, times in metrics.items()}
+
+
+class _OpenCompile:
+    __slots__ = ("start_ns", "parent_id", "guard_failures", "phases", "compile_id")
+
+    def __init__(self, parent_id: str | None, compile_id: Any) -> None:
+        self.parent_id = parent_id
+        self.compile_id = compile_id
+        self.guard_failures = _guard_failure_count()
+        self.phases = _phase_totals()
+        self.start_ns = monotonic_ns()
+
+
+class CompileTracer:
+    """Records torch.compile (Dynamo/Inductor) compilations as "system" spans.
+
+    Hooks Dynamo's compile start/end callbacks while started. Each
+    compilation becomes a "torch_compile" span, or "recompile" when Dynamo
+    reports a non-zero frame_compile_id or guards failed since the last
+    compile, parented under whatever tracer span was open when it began.
+    Metadata holds the guard failure reasons ("guard_failures") and the time
+    per Dynamo/Inductor phase ("<phase>_ns") from compilation_time_metrics.
+    Phases are not child spans: Dynamo only reports their total durations,
+    not when they ran.
+    Spans are added when the tracer stops, once the enclosing token spans
+    have closed, and take the token_index of the token that triggered them.
+    """
+
+    __slots__ = ("_tracer", "_open", "_records", "_started")
+
+    def __init__(self, tracer: Tracer) -> None:
+        self._tracer = tracer
+        self._open: list[_OpenCompile] = []
+        self._records: list[tuple[_OpenCompile, int, str, dict[str, Any]]] = []
+        self._started = False
+
+    def _on_start(self, *args: Any) -> None:
+        compile_id = getattr(args[0], "compile_id", None) if args else None
+        self._open.append(_OpenCompile(self._tracer.current_span_id, compile_id))
+
+    def _on_end(self, *_: Any) -> None:
+        if not self._open:
+            return
+        end_ns = monotonic_ns()
+        record = self._open.pop()
+        failures = _new_guard_failures(record.guard_failures)
+        metadata: dict[str, Any] = {}
+        frame_compile_id = getattr(record.compile_id, "frame_compile_id", None)
+        if frame_compile_id is not None:
+            metadata["frame_id"] = getattr(record.compile_id, "frame_id", None)
+            metadata["frame_compile_id"] = frame_compile_id
+        recompile = bool(frame_compile_id) or bool(failures)
+        if failures:
+            metadata["guard_failures"] = "; ".join(failures)
+        for phase, seconds in _phase_totals().items():
+            spent = seconds - record.phases.get(phase, 0.0)
+            if spent > 0:
+                metadata[f"{phase}_ns"] = round(spent * 1e9)
+        name = RECOMPILE_SPAN if recompile else COMPILE_SPAN
+        self._records.append((record, end_ns, name, metadata))
+
+    def start(self) -> CompileTracer:
+        from torch._dynamo.callback import callback_handler
+
+        if not self._started:
+            callback_handler.register_start_callback(self._on_start)
+            callback_handler.register_end_callback(self._on_end)
+            self._started = True
+        return self
+
+    def stop(self) -> list[TraceEvent]:
+        """Unhook from Dynamo and add the recorded compile spans to the tracer."""
+        if self._started:
+            from torch._dynamo.callback import callback_handler
+
+            callback_handler.remove_start_callback(self._on_start)
+            callback_handler.remove_end_callback(self._on_end)
+            self._started = False
+        return self.flush()
+
+    def flush(self) -> list[TraceEvent]:
+        """Add the compile spans recorded so far to the tracer."""
+        records, self._records = self._records, []
+        if not records:
+            return []
+        tokens = token_indices(list(self._tracer.iter_events()))
+        return self._tracer.record_events(
+            [name for _, _, name, _ in records],
+            [r.start_ns for r, _, _, _ in records],
+            [end for _, end, _, _ in records],
+            "system",
+            "compile",
+            parents=[r.parent_id for r, _, _, _ in records],
+            token_indices=[tokens.get(r.parent_id or "") for r, _, _, _ in records],
+            metadata=[meta for _, _, _, meta in records],
+        )
+
+    def __enter__(self) -> CompileTracer:
+        return self.start()
+
+    def __exit__(self, *_: object) -> None:
+        self.stop()
+
+
+@dataclass(frozen=True, slots=True)
+class CompileSummary:
+    """Compile cost, and token latency with and without compilation in the token."""
+
+    compiles: int
+    recompiles: int
+    compile_ns: int
+    # tokens during which a compile or recompile ran
+    warmup_tokens: list[int] = field(default_factory=list)
+    warmup_mean_ns: float = 0.0
+    steady_mean_ns: float = 0.0
+
+
+def compile_summary(events: Iterable[TraceEvent]) -> CompileSummary:
+    """Separate warm-up (tokens that compiled) from steady-state decode latency."""
+    compiles = recompiles = compile_ns = 0
+    warmup: set[int] = set()
+    token_ns: dict[int, int] = {}
+    for e in events:
+        if e.category == "token" and e.token_index is not None:
+            token_ns[e.token_index] = e.duration_ns
+        elif e.category == "system" and e.name in (COMPILE_SPAN, RECOMPILE_SPAN):
+            compiles += 1
+            recompiles += e.name == RECOMPILE_SPAN
+            compile_ns += e.duration_ns
+            if e.token_index is not None:
+                warmup.add(e.token_index)
+    warm = [ns for i, ns in token_ns.items() if i in warmup]
+    steady = [ns for i, ns in token_ns.items() if i not in warmup]
+    return CompileSummary(
+        compiles=compiles,
+        recompiles=recompiles,
+        compile_ns=compile_ns,
+        warmup_tokens=sorted(warmup),
+        warmup_mean_ns=sum(warm) / len(warm) if warm else 0.0,
+        steady_mean_ns=sum(steady) / len(steady) if steady else 0.0,
+    )
@@ -0,0 +1,294 @@
+from __future__ import annotations
+
+import warnings
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from argus.core.clock import monotonic_ns
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+
+    from argus.core.events import TraceEvent
+    from argus.core.shm import RingTracer, SharedMemoryCollector
+    from argus.core.tracer import Tracer
+
+WAIT_SPAN = "dataloader_wait"
+FETCH_SPAN = "dataloader_fetch"
+COLLATE_SPAN = "dataloader_collate"
+PIN_SPAN = "pin_memory"
+
+# set in each DataLoader worker process by _WorkerInit
+_worker_ring: RingTracer | None = None
+
+
+class _TracedCollate:
+    """collate_fn wrapper: records into the worker's ring, or the tracer when in-process."""
+
+    __slots__ = ("_collate_fn", "_tracer")
+
+    def __init__(self, collate_fn: Callable[[Any], Any], tracer: Tracer | None) -> None:
+        self._collate_fn = collate_fn
+        self._tracer = tracer
+
+    def __getstate__(self) -> tuple[Callable[[Any], Any]]:
+        # only the worker-side (tracer-less) wrapper is ever pickled
+        return (self._collate_fn,)
+
+    def __setstate__(self, state: tuple[Callable[[Any], Any]]) -> None:
+        self._collate_fn = state[0]
+        self._tracer = None
+
+    def __call__(self, batch: Any) -> Any:
+        ring = _worker_ring
+        if ring is not None:
+            scope = f"dataloader.worker.{ring.ring}"
+            with ring.span(COLLATE_SPAN, category="system", scope=scope):
+                return self._collate_fn(batch)
+        if self._tracer is not None:
+            with self._tracer.span(COLLATE_SPAN, category="system", scope="dataloader.main"):
+                return self._collate_fn(batch)
+        return self._collate_fn(batch)
+
+
+class _TimedFetch:
+    __slots__ = ("_fetch", "_tracer")
+
+    def __init__(self, fetch: Callable[[Any], Any], tracer: Tracer) -> None:
+        self._fetch = fetch
+        self._tracer = tracer
+
+    def __call__(self, index: Any) -> Any:
+        with self._tracer.span(FETCH_SPAN, category="system", scope="dataloader.main"):
+            return self._fetch(index)
+
+
+class _RingFetch:
+    __slots__ = ("_fetch", "_ring", "_scope")
+
+    def __init__(self, fetch: Callable[[Any], Any], ring: RingTracer) -> None:
+        self._fetch = fetch
+        self._ring = ring
+        self._scope = f"dataloader.worker.{ring.ring}"
+
+    def __call__(self, index: Any) -> Any:
+        with self._ring.span(FETCH_SPAN, category="system", scope=self._scope):
+            return self._fetch(index)
+
+
+class _WorkerInit:
+    """worker_init_fn wrapper: binds the worker to its ring and times its fetcher.
+
+    Runs in the worker process before torch creates the worker's dataset fetcher,
+    so patching _DatasetKind.create_fetcher here only affects that worker.
+    """
+
+    __slots__ = ("_handles", "_init_fn")
+
+    def __init__(
+        self,
+        handles: list[RingTracer],
+        init_fn: Callable[[int], None] | None,
+    ) -> None:
+        self._handles = handles
+        self._init_fn = init_fn
+
+    def __getstate__(self) -> tuple[list[RingTracer], Callable[[int], None] | None]:
+        return (self._handles, self._init_fn)
+
+    def __setstate__(self, state: tuple[list[RingTracer], Callable[[int], None] | None]) -> None:
+        self._handles, self._init_fn = state
+
+    def __call__(self, worker_id: int) -> None:
+        global _worker_ring
+        ring = self._handles[worker_id % len(self._handles)]
+        _worker_ring = ring
+        try:
+            from torch.utils.data import _DatasetKind
+
+            create_fetcher = _DatasetKind.create_fetcher
+
+            def traced_create_fetcher(*args: Any, **kwargs: Any) -> Any:
+                fetcher = create_fetcher(*args, **kwargs)
+                fetcher.fetch = _RingFetch(fetcher.fetch, ring)
+                return fetcher
+
+            patched = staticmethod(traced_create_fetcher)
+            _DatasetKind.create_fetcher = patched
+        except (ImportError, AttributeError):
+            warnings.warn(
+                "Could not hook the DataLoader worker fetcher; only collate time is traced",
+                stacklevel=2,
+            )
+        if self._init_fn is not None:
+            self._init_fn(worker_id)
+
+
+class TracedDataLoader:
+    """Iterate a torch DataLoader while recording input-pipeline spans.
+
+    In the main process every __next__ is recorded as a dataloader_wait span.
+    Fetch (dataset indexing plus collate) and collate spans are recorded where
+    they run: in-process for num_workers=0, otherwise inside each worker through
+    a shared-memory ring that is drained into the tracer after each batch.
+
+    With trace_pin_memory=True pinning moves from the loader's pin thread onto
+    the iterating thread so it can be timed; this removes its overlap with
+    compute, so leave it off unless pinning is under investigation.
+    """
+
+    __slots__ = ("_loader", "_tracer", "_trace_pin_memory", "_ring_capacity", "_collector")
+
+    def __init__(
+        self,
+        loader: Any,
+        tracer: Tracer,
+        trace_pin_memory: bool = False,
+        ring_capacity: int = 4_096,
+    ) -> None:
+        self._loader = loader
+        self._tracer = tracer
+        self._trace_pin_memory = trace_pin_memory
+        self._ring_capacity = ring_capacity
+        self._collector: SharedMemoryCollector | None = None
+
+    def __len__(self) -> int:
+        return len(self._loader)
+
+    def _instrumented_iter(self) -> Iterator[Any]:
+        loader = self._loader
+        num_workers = getattr(loader, "num_workers", 0)
+        saved_collate = loader.collate_fn
+        saved_init = loader.worker_init_fn
+        saved_pin = getattr(loader, "pin_memory", False)
+        if num_workers > 0:
+            if self._collector is None:
+                from argus.core.shm import SharedMemoryCollector
+
+                self._collector = SharedMemoryCollector(num_workers, self._ring_capacity)
+            handles = [self._collector.handle(i) for i in range(num_workers)]
+            loader.collate_fn = _TracedCollate(saved_collate, None)
+            loader.worker_init_fn = _WorkerInit(handles, saved_init)
+        else:
+            loader.collate_fn = _TracedCollate(saved_collate, self._tracer)
+        if self._trace_pin_memory and saved_pin:
+            loader.pin_memory = False
+        try:
+            it = iter(loader)
+        finally:
+            loader.collate_fn = saved_collate
+            loader.worker_init_fn = saved_init
+            if self._trace_pin_memory and saved_pin:
+                loader.pin_memory = saved_pin
+        fetcher = getattr(it, "_dataset_fetcher", None)
+        if num_workers == 0 and fetcher is not None:
+            fetcher.fetch = _TimedFetch(fetcher.fetch, self._tracer)
+        return it  # type: ignore[no-any-return]
+
+    def __iter__(self) -> Iterator[Any]:
+        tracer = self._tracer
+        it = self._instrumented_iter()
+        pin: Callable[[Any], Any] | None = None
+        if self._trace_pin_memory and getattr(self._loader, "pin_memory", False):
+            from torch.utils.data._utils.pin_memory import pin_memory
+
+            device = getattr(self._loader, "pin_memory_device", "") or None
+
+            def pin(batch: Any) -> Any:
+                return pin_memory(batch, device)
+
+        collector = self._collector
+        batch_index = 0
+        while True:
+            start = monotonic_ns()
+            try:
+                batch = next(it)
+            except StopIteration:
+                break
+            end = monotonic_ns()
+            tracer.record_span(
+                WAIT_SPAN, start, end, "system", "dataloader.main", {"batch": batch_index}
+            )
+            if pin is not None:
+                batch = pin(batch)
+                tracer.record_span(PIN_SPAN, end, monotonic_ns(), "system", "dataloader.main")
+            if collector is not None:
+                collector.drain(tracer)
+            batch_index += 1
+            yield batch
+        if collector is not None:
+            collector.drain(tracer)
+
+    def close(self) -> None:
+        """Release the worker rings. Call once iteration is finished."""
+        if self._collector is not None:
+            self._collector.close()
+            self._collector = None
+
+    def __enter__(self) -> TracedDataLoader:
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+
+def trace_dataloader(
+    loader: Any,
+    tracer: Tracer,
+    trace_pin_memory: bool = False,
+) -> TracedDataLoader:
+    """Wrap a DataLoader so iterating it records input-pipeline spans."""
+    return TracedDataLoader(loader, tracer, trace_pin_memory=trace_pin_memory)
+
+
+@dataclass(frozen=True, slots=True)
+class InputStallSummary:
+    """How much of a loop's wall time went to waiting on input.
+
+    compute_ns is the time between receiving a batch and asking for the next
+    one; the last batch has no following request and is not counted.
+    """
+
+    batches: int
+    wait_ns: int
+    compute_ns: int
+    stall_fraction: float
+    mean_wait_ns: float
+    max_wait_ns: int
+    pin_memory_ns: int
+    collate_ns: int
+    fetch_ns_by_worker: dict[int | None, int] = field(default_factory=dict)
+
+
+def input_stall_summary(events: Iterable[TraceEvent]) -> InputStallSummary:
+    """Summarize dataloader spans recorded by TracedDataLoader."""
+    waits: list[TraceEvent] = []
+    pin_ns = 0
+    collate_ns = 0
+    fetch_ns: dict[int | None, int] = {}
+    for e in events:
+        if e.name == WAIT_SPAN:
+            waits.append(e)
+        elif e.name == PIN_SPAN:
+            pin_ns += e.duration_ns
+        elif e.name == COLLATE_SPAN:
+            collate_ns += e.duration_ns
+        elif e.name == FETCH_SPAN:
+            worker = e.metadata.get("worker")
+            fetch_ns[worker] = fetch_ns.get(worker, 0) + e.duration_ns
+    waits.sort(key=lambda e: e.start_ns)
+    wait_ns = sum(e.duration_ns for e in waits)
+    gaps = zip(waits, waits[1:], strict=False)
+    compute_ns = sum(max(0, nxt.start_ns - prev.end_ns) for prev, nxt in gaps)
+    busy = wait_ns + compute_ns
+    return InputStallSummary(
+        batches=len(waits),
+        wait_ns=wait_ns,
+        compute_ns=compute_ns,
+        stall_fraction=wait_ns / busy if busy else 0.0,
+        mean_wait_ns=wait_ns / len(waits) if waits else 0.0,
+        max_wait_ns=max((e.duration_ns for e in waits), default=0),
+        pin_memory_ns=pin_ns,
+        collate_ns=collate_ns,
+        fetch_ns_by_worker=fetch_ns,
+    )
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, TypeVar, cast
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+    from argus.core.tracer import Tracer
+
+S = TypeVar("S")
+T = TypeVar("T")
+
+
+def trace_decode_loop(
+    prefill_fn: Callable[[], S],
+    step_fn: Callable[[S, T], S],
+    stop_fn: Callable[[T, int], bool] | None = None,
+    *,
+    tracer: Tracer,
+    sample_fn: Callable[[S], T],
+    max_new_tokens: int = 128,
+    kv_fn: Callable[[S, int], None] | None = None,
+    prompt_len: int | None = None,
+    batch_size: int = 1,
+    breakdown: bool = False,
+) -> Iterator[T]:
+    """Run a traced decode loop over arbitrary model functions, yielding each token.
+
+    prefill_fn() returns the model state after the prompt; step_fn(state,
+    token) runs one forward pass over `token` and returns the new state;
+    sample_fn(state) picks the next token; stop_fn(token, i) ends the loop
+    after yielding token i. kv_fn(state, token_index) is called after every
+    forward pass to report the KV cache (e.g. KVCacheTracker.record).
+
+    Spans: a "prefill" phase with its forward_pass, then a "decode" phase
+    with one token_generate span per token. Token span i holds the forward
+    pass that produced token i, not the one that consumes it: token 0 has no
+    forward pass (its logits come from prefill), and kv_fn(state, i) reports
+    the cache right after the forward pass in span i. A token is yielded as soon as
+    its span closes, so callers can stream it on; the caller's own work runs
+    inside the decode phase but outside token spans. The decode phase closes
+    when the loop ends or the generator is closed, e.g. when a caller breaks
+    out of a for loop over it. With `prompt_len`, forward_pass spans carry
+    "new_tokens"/"past_tokens" per sequence and "batch_size", the number of
+    sequences decoded together.
+
+    With `breakdown`, sample_fn, stop_fn and kv_fn also run in child spans
+    "sample", "stop_check" and "kv_report" of the token span, so the harness
+    time around the forward pass is attributed (see analysis.breakdown).
+    """
+    span = tracer.span
+    metadata = None
+    if prompt_len is not None:
+        metadata = {"new_tokens": prompt_len, "past_tokens": 0, "batch_size": batch_size}
+    with span("prefill", category="phase", scope="prefill"):
+        with span("forward_pass", category="compute", scope="prefill.forward", metadata=metadata):
+            state = prefill_fn()
+        if kv_fn is not None:
+            kv_fn(state, 0)
+
+    decode = span("decode", category="phase", scope="decode")
+    decode.__enter__()
+    # token 0 is sampled from the prefill state before step_fn first reads `token`
+    token = cast("T", None)
+    try:
+        for i in range(max_new_tokens):
+            with span(
+                "token_generate",
+                category="token",
+                scope="decode.token.{}",
+                scope_arg=i,
+                token_index=i,
+            ):
+                if i:
+                    if prompt_len is not None:
+                        past = prompt_len + i - 1
+                        metadata = {"new_tokens": 1, "past_tokens": past, "batch_size": batch_size}
+                    with span(
+                        "forward_pass",
+                        category="compute",
+                        scope="decode.token.{}.forward",
+                        scope_arg=i,
+                        metadata=metadata,
+                    ):
+                        state = step_fn(state, token)
+                    if kv_fn is not None:
+                        if breakdown:
+                            with span("kv_report", scope="decode.token.{}.kv", scope_arg=i):
+                                kv_fn(state, i)
+                        else:
+                            kv_fn(state, i)
+                if breakdown:
+                    with span("sample", scope="decode.token.{}.sample", scope_arg=i):
+                        token = sample_fn(state)
+                    stop = False
+                    if stop_fn is not None:
+                        with span("stop_check", scope="decode.token.{}.stop", scope_arg=i):
+                            stop = stop_fn(token, i)
+                else:
+                    token = sample_fn(state)
+                    stop = stop_fn is not None and stop_fn(token, i)
+            yield token
+            if stop:
+                return
+    finally:
+        # also reached when the caller stops iterating and the generator is closed
+        decode.__exit__(None, None, None)
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from argus.core.events import TraceEvent
+
+FORWARD_SPAN = "forward_pass"
+# forward_pass metadata written by trace_generate
+NEW_TOKENS = "new_tokens"
+PAST_TOKENS = "past_tokens"
+BATCH_SIZE = "batch_size"
+
+
+def _config_value(config: object, *names: str, default: Any = None) -> Any:
+    for name in names:
+        value = getattr(config, name, None)
+        if value is not None:
+            return value
+    if default is None:
+        raise ValueError(f"model config has none of {', '.join(names)}")
+    return default
+
+
+@dataclass(frozen=True, slots=True)
+class ModelShape:
+    """The transformer dimensions that determine FLOPs and bytes per token."""
+
+    num_layers: int
+    hidden_size: int
+    num_heads: int
+    vocab_size: int
+    intermediate_size: int
+    num_kv_heads: int
+    gated_mlp: bool = False
+    bytes_per_param: int = 2
+
+    @classmethod
+    def from_config(cls, config: object, bytes_per_param: int = 2) -> ModelShape:
+        """Read a Hugging Face config (GPT-2 or Llama-style attribute names)."""
+        hidden = _config_value(config, "hidden_size", "n_embd", "d_model")
+        heads = _config_value(config, "num_attention_heads", "n_head")
+        return cls(
+            num_layers=_config_value(config, "num_hidden_layers", "n_layer"),
+            hidden_size=hidden,
+            num_heads=heads,
+            vocab_size=_config_value(config, "vocab_size"),
+            intermediate_size=_config_value(
+                config, "intermediate_size", "n_inner", default=4 * hidden
+            ),
+            num_kv_heads=_config_value(config, "num_key_value_heads", default=heads),
+            # Llama-style MLPs have gate, up and down projections
+            gated_mlp=getattr(config, "hidden_act", "") == "silu",
+            bytes_per_param=bytes_per_param,
+        )
+
+
+class FlopsEstimator:
+    """FLOPs and bytes moved per forward pass, from constants computed once per model.
+
+    Counts 2 FLOPs per multiply-add in the attention and MLP projections, the
+    attention score and value products, and the LM head; ignores norms,
+    softmax and embeddings. Bytes moved are every weight read once plus the
+    KV cache read and the new KV entries written.
+    """
+
+    __slots__ = ("shape", "_flops_per_token", "_attn_flops_per_pair", "_weight_bytes", "_kv_bytes")
+
+    def __init__(self, shape: ModelShape) -> None:
+        self.shape = shape
+        h = shape.hidden_size
+        kv_dim = h * shape.num_kv_heads // shape.num_heads
+        mlp_mats = 3 if shape.gated_mlp else 2
+        layer_params = h * (h + 2 * kv_dim) + h * h + mlp_mats * h * shape.intermediate_size
+        params = shape.num_layers * layer_params + h * shape.vocab_size
+        self._flops_per_token = 2 * params
+        # q.k and p.v: 2 * h multiply-adds per (query, key) pair per layer
+        self._attn_flops_per_pair = 4 * h * shape.num_layers
+        self._weight_bytes = params * shape.bytes_per_param
+        self._kv_bytes = 2 * shape.num_layers * kv_dim * shape.bytes_per_param
+
+    @classmethod
+    def from_model(cls, model: object, bytes_per_param: int | None = None) -> FlopsEstimator:
+        """Build from model.config; bytes_per_param defaults to the model's dtype size."""
+        if bytes_per_param is None:
+            dtype = getattr(model, "dtype", None)
+            bytes_per_param = getattr(dtype, "itemsize", 2)
+        config = model.config  # type: ignore[attr-defined]
+        return cls(ModelShape.from_config(config, bytes_per_param))
+
+    def flops(self, new_tokens: int, past_tokens: int = 0, batch_size: int = 1) -> int:
+        """FLOPs for a forward over `new_tokens` with `past_tokens` already cached (causal).
+
+        Token counts are per sequence; `batch_size` sequences run together.
+        """
+        pairs = new_tokens * past_tokens + new_tokens * (new_tokens + 1) // 2
+        per_sequence = new_tokens * self._flops_per_token + pairs * self._attn_flops_per_pair
+        return batch_size * per_sequence
+
+    def bytes_moved(self, new_tokens: int, past_tokens: int = 0, batch_size: int = 1) -> int:
+        """Weights are read once per forward; each sequence has its own KV cache."""
+        return self._weight_bytes + batch_size * (past_tokens + new_tokens) * self._kv_bytes
+
+
+def annotate_forward_passes(
+    events: Iterable[TraceEvent], estimator: FlopsEstimator
+) -> list[TraceEvent]:
+    """Return `events` with FLOPs and throughput added to each forward_pass span.
+
+    Spans need "new_tokens" (and optionally "past_tokens" and "batch_size")
+    metadata, as written by trace_generate; others pass through unchanged.
+    Adds "flops", "bytes_moved", "gflops_per_s", "gbytes_per_s" and
+    "arithmetic_intensity" (FLOPs per byte), all for the whole batch.
+    """
+    out = []
+    for e in events:
+        new = e.metadata.get(NEW_TOKENS) if e.name == FORWARD_SPAN else None
+        if new is None:
+            out.append(e)
+            continue
+        past = e.metadata.get(PAST_TOKENS, 0)
+        batch = e.metadata.get(BATCH_SIZE, 1)
+        flops = estimator.flops(new, past, batch)
+        moved = estimator.bytes_moved(new, past, batch)
+        seconds = max(e.duration_ns, 1) / 1e9
+        metadata = {
+            **e.metadata,
+            "flops": flops,
+            "bytes_moved": moved,
+            "gflops_per_s": flops / seconds / 1e9,
+            "gbytes_per_s": moved / seconds / 1e9,
+            "arithmetic_intensity": flops / moved,
+        }
+        out.append(replace(e, metadata=metadata))
+    return out
+
+
+@dataclass(frozen=True, slots=True)
+class PhaseEfficiency:
+    """Aggregate roofline position of the forward passes of one phase."""
+
+    phase: str
+    forward_passes: int
+    flops: int
+    bytes_moved: int
+    duration_ns: int
+    gflops_per_s: float
+    gbytes_per_s: float
+    arithmetic_intensity: float
+    # "compute" or "memory" against the ridge point, None without peak figures
+    bound: str | None
+    # achieved fraction of the peak for the bounding resource
+    utilization: float | None
+
+
+def roofline_summary(
+    events: Iterable[TraceEvent],
+    peak_gflops: float | None = None,
+    peak_gbytes_per_s: float | None = None,
+) -> list[PhaseEfficiency]:
+    """Summarize annotated forward_pass spans per phase (prefill, decode).
+
+    The phase is the first component of the span's scope. With both peak
+    figures a phase is compute-bound when its arithmetic intensity is above
+    the ridge point peak_gflops / peak_gbytes_per_s, and memory-bound otherwise.
+    """
+    totals: dict[str, list[int]] = {}
+    for e in events:
+        if e.name != FORWARD_SPAN or "flops" not in e.metadata:
+            continue
+        phase = e.scope.split(".", 1)[0]
+        t = totals.setdefault(phase, [0, 0, 0, 0])
+        t[0] += 1
+        t[1] += e.metadata["flops"]
+        t[2] += e.metadata["bytes_moved"]
+        t[3] += e.duration_ns
+    out = []
+    for phase, (count, flops, moved, duration) in totals.items():
+        seconds = max(duration, 1) / 1e9
+        gflops = flops / seconds / 1e9
+        gbytes = moved / seconds / 1e9
+        intensity = flops / moved
+        bound: str | None = None
+        utilization: float | None = None
+        if peak_gflops and peak_gbytes_per_s:
+            if intensity > peak_gflops / peak_gbytes_per_s:
+                bound, utilization = "compute", gflops / peak_gflops
+            else:
+                bound, utilization = "memory", gbytes / peak_gbytes_per_s
+        out.append(
+            PhaseEfficiency(
+                phase, count, flops, moved, duration, gflops, gbytes, intensity, bound, utilization
+            )
+        )
+    return out
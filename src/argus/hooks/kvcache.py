@@ -10,7 +10,7 @@ def _compute_kv_cache_bytes(past_key_values: object) -> tuple[int, int]:
     """Returns (total_bytes, num_layers) from KV cache tensors."""
     total = 0
     num_layers = 0
-    for layer_kv in past_key_values:  # type: ignore[union-attr]
+    for layer_kv in past_key_values:  # type: ignore[attr-defined]
         num_layers += 1
         for tensor in layer_kv:
             if tensor is None:
@@ -20,23 +20,18 @@ def _compute_kv_cache_bytes(past_key_values: object) -> tuple[int, int]:
 
 
 class KVCacheTracker:
-    """Tracks KV cache size per token, emitting memory events to a tracer."""
+    """Tracks KV cache size per token as the tracer's "kv_cache" counter.
+
+    Samples are ordered by their timestamps, which line up with the token
+    spans, so the token index is not stored as a series of its own. record()
+    still accepts it, so it can be passed as trace_decode_loop's kv_fn.
+    """
 
     __slots__ = ("_tracer",)
 
     def __init__(self, tracer: Tracer) -> None:
         self._tracer = tracer
 
-    def record(self, past_key_values: object, token_index: int) -> None:
+    def record(self, past_key_values: object, token_index: int | None = None) -> None:
         cache_bytes, num_layers = _compute_kv_cache_bytes(past_key_values)
-        self._tracer.instant(
-            name="kv_cache_grow",
-            category="memory",
-            scope=f"decode.token.{token_index}",
-            token_index=token_index,
-            metadata={
-                "cache_size_bytes": cache_bytes,
-                "num_layers": num_layers,
-                "token_index": token_index,
-            },
-        )
+        self._tracer.counter("kv_cache", cache_size_bytes=cache_bytes, num_layers=num_layers)
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any
+
+from argus.core.clock import monotonic_ns
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from argus.core.events import TraceEvent
+    from argus.core.tracer import Tracer
+    from argus.hooks.kvcache import KVCacheTracker
+
+SYNC_MARKER = "argus.clock_sync"
+
+
+def _enclosing_spans(
+    spans: list[TraceEvent], starts: list[int], ends: list[int]
+) -> list[TraceEvent | None]:
+    """The innermost span containing each [starts[i], ends[i]], in one sweep."""
+    spans = sorted(spans, key=lambda e: (e.start_ns, -e.end_ns))
+    out: list[TraceEvent | None] = [None] * len(starts)
+    stack: list[TraceEvent] = []
+    j = 0
+    for i in sorted(range(len(starts)), key=starts.__getitem__):
+        t = starts[i]
+        while j < len(spans) and spans[j].start_ns <= t:
+            span = spans[j]
+            j += 1
+            while stack and stack[-1].end_ns < span.start_ns:
+                stack.pop()
+            stack.append(span)
+        while stack and stack[-1].end_ns < t:
+            stack.pop()
+        for span in reversed(stack):
+            if span.end_ns >= ends[i]:
+                out[i] = span
+                break
+    return out
+
+
+def token_indices(spans: list[TraceEvent]) -> dict[str, int | None]:
+    """Each span's token_index, inherited from the nearest ancestor that has one."""
+    by_id = {e.event_id: e for e in spans}
+    tokens: dict[str, int | None] = {}
+
+    def token_of(event: TraceEvent) -> int | None:
+        chain = []
+        current: TraceEvent | None = event
+        found: int | None = None
+        while current is not None:
+            if current.event_id in tokens:
+                found = tokens[current.event_id]
+                break
+            if current.token_index is not None:
+                found = current.token_index
+                break
+            chain.append(current.event_id)
+            current = by_id.get(current.parent_id) if current.parent_id is not None else None
+        for eid in chain:
+            tokens[eid] = found
+        return found
+
+    for span in spans:
+        tokens[span.event_id] = token_of(span)
+    return tokens
+
+
+def ingest_profiler_events(
+    tracer: Tracer,
+    events: Iterable[Any],
+    sync_ns: int,
+) -> list[TraceEvent]:
+    """Convert torch.profiler FunctionEvents into "kernel" events on `tracer`.
+
+    `events` is prof.events(); it must include the SYNC_MARKER range, during
+    which monotonic_ns() read `sync_ns` (see profile_ops). The marker's
+    midpoint gives the offset from profiler time to monotonic_ns. An op nested
+    in another op keeps it as parent; a top-level op is parented under the
+    innermost tracer span containing it (the forward_pass for model ops) and
+    takes that span's scope and token_index. Ops are added with one
+    Tracer.record_events call; their self time is in metadata["self_ns"].
+    """
+    events = list(events)
+    marker = next((e for e in events if e.name == SYNC_MARKER), None)
+    if marker is None:
+        raise ValueError(f"No '{SYNC_MARKER}' range in the profiler events")
+    offset = sync_ns - round((marker.time_range.start + marker.time_range.end) * 500)
+    ops = sorted(
+        (e for e in events if e is not marker and e.cpu_parent is not marker),
+        key=lambda e: (e.time_range.start, -e.time_range.end),
+    )
+    starts = [round(e.time_range.start * 1_000) + offset for e in ops]
+    ends = [round(e.time_range.end * 1_000) + offset for e in ops]
+    spans = [e for e in tracer.iter_events() if e.end_ns > e.start_ns]
+    tokens = token_indices(spans)
+    enclosing = _enclosing_spans(spans, starts, ends)
+    row = {id(e): i for i, e in enumerate(ops)}
+    # nested ops inherit their root's span; parents sort before their children
+    roots: list[TraceEvent | None] = []
+    parents: list[int | str | None] = []
+    for i, op in enumerate(ops):
+        parent_row = row.get(id(op.cpu_parent)) if op.cpu_parent is not None else None
+        if parent_row is not None and parent_row < i:
+            roots.append(roots[parent_row])
+            parents.append(parent_row)
+        else:
+            span = enclosing[i]
+            roots.append(span)
+            parents.append(span.event_id if span is not None else None)
+    return tracer.record_events(
+        [op.name for op in ops],
+        starts,
+        ends,
+        "kernel",
+        [span.scope if span is not None else "ops" for span in roots],
+        parents=parents,
+        token_indices=[tokens[span.event_id] if span is not None else None for span in roots],
+        metadata=[{"self_ns": round(getattr(op, "self_cpu_time_total", 0) * 1_000)} for op in ops],
+        scope_args=[span.scope_arg if span is not None else None for span in roots],
+    )
+
+
+@contextmanager
+def profile_ops(tracer: Tracer, record_shapes: bool = False) -> Iterator[Any]:
+    """Run torch.profiler (CPU activities) over the block, then ingest its ops.
+
+    Yields the torch.profiler.profile object. On exit the operator events are
+    added to `tracer` as "kernel" events by ingest_profiler_events.
+    """
+    from torch.profiler import ProfilerActivity, profile, record_function
+
+    with profile(activities=[ProfilerActivity.CPU], record_shapes=record_shapes) as prof:
+        with record_function(SYNC_MARKER):
+            sync_ns = monotonic_ns()
+        yield prof
+    ingest_profiler_events(tracer, prof.events(), sync_ns)
+
+
+def profile_generate(
+    model: object,
+    input_ids: object,
+    tracer: Tracer,
+    max_new_tokens: int = 128,
+    kv_tracker: KVCacheTracker | None = None,
+    record_shapes: bool = False,
+) -> object:
+    """trace_generate under torch.profiler, so one trace shows phases, tokens and ops."""
+    from argus.hooks.pytorch import trace_generate
+
+    with profile_ops(tracer, record_shapes=record_shapes):
+        return trace_generate(model, input_ids, tracer, max_new_tokens, kv_tracker)
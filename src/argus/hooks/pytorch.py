@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
+
+from argus.hooks.decode import trace_decode_loop
 
 if TYPE_CHECKING:
     from argus.core.tracer import Tracer
@@ -13,56 +15,74 @@ def trace_generate(
     tracer: Tracer,
     max_new_tokens: int = 128,
     kv_tracker: KVCacheTracker | None = None,
+    breakdown: bool = False,
 ) -> object:
     """Trace a model's greedy decode loop with token-level spans.
 
-    Reimplements greedy decode — does not call model.generate().
+    Reimplements greedy decode on trace_decode_loop — does not call
+    model.generate(). As there, token_generate span i holds the forward
+    pass that produced token i and token 0 has none. forward_pass spans
+    carry "new_tokens", "past_tokens" and "batch_size" (see hooks.flops).
+    Every row of `input_ids` is decoded; the loop stops once all rows
+    produce EOS at the same step, as the model is not told about padding.
+
+    With `breakdown`, each token also gets spans for logits post-processing
+    ("logits_process"), selection ("select") and the host synchronization of
+    the EOS check ("host_sync"), and the final output concatenation is traced
+    as "output_concat". Tokens are appended to a Python list between token
+    spans, which costs next to nothing.
     """
     import torch
 
-    generated = input_ids.clone()
-    past_key_values = None
-
-    with tracer.span("prefill", category="phase", scope="prefill"):
-        with tracer.span("forward_pass", category="compute", scope="prefill.forward"):
-            outputs = model(input_ids, use_cache=True)
-            past_key_values = outputs.past_key_values
-            next_token_logits = outputs.logits[:, -1, :]
-        if kv_tracker is not None:
-            kv_tracker.record(past_key_values, token_index=0)
+    eos_token_id = getattr(model.config, "eos_token_id", None)  # type: ignore[attr-defined]
+    span = tracer.span
+    token_index = 0
 
-    with tracer.span("decode", category="phase", scope="decode"):
-        for i in range(max_new_tokens):
-            with tracer.span(
-                "token_generate",
-                category="token",
-                scope=f"decode.token.{i}",
-                token_index=i,
-            ):
-                next_token_id = torch.argmax(next_token_logits, dim=-1, keepdim=True)
-                generated = torch.cat([generated, next_token_id], dim=-1)
+    def prefill() -> Any:
+        return model(input_ids, use_cache=True)  # type: ignore[operator]
 
-                eos_token_id = getattr(model.config, "eos_token_id", None)
-                if eos_token_id is not None and next_token_id.item() == eos_token_id:
-                    break
+    def step(outputs: Any, token: Any) -> Any:
+        return model(  # type: ignore[operator]
+            token, past_key_values=outputs.past_key_values, use_cache=True
+        )
 
-                if i == max_new_tokens - 1:
-                    break
+    def sample(outputs: Any) -> Any:
+        if not breakdown:
+            return torch.argmax(outputs.logits[:, -1, :], dim=-1, keepdim=True)
+        i = token_index
+        with span("logits_process", scope="decode.token.{}.sample.logits", scope_arg=i):
+            logits = outputs.logits[:, -1, :]
+        with span("select", scope="decode.token.{}.sample.select", scope_arg=i):
+            return torch.argmax(logits, dim=-1, keepdim=True)
 
-                with tracer.span(
-                    "forward_pass",
-                    category="compute",
-                    scope=f"decode.token.{i}.forward",
-                ):
-                    outputs = model(
-                        next_token_id,
-                        past_key_values=past_key_values,
-                        use_cache=True,
-                    )
-                    past_key_values = outputs.past_key_values
-                    next_token_logits = outputs.logits[:, -1, :]
+    def stop(token: Any, i: int) -> bool:
+        nonlocal token_index
+        token_index = i + 1
+        if eos_token_id is None:
+            return False
+        if not breakdown:
+            return bool((token == eos_token_id).all())
+        with span("host_sync", scope="decode.token.{}.stop.sync", scope_arg=i):
+            return bool((token == eos_token_id).all())
 
-                if kv_tracker is not None:
-                    kv_tracker.record(past_key_values, token_index=i + 1)
+    def record_kv(outputs: Any, _: int) -> None:
+        kv_tracker.record(outputs.past_key_values)  # type: ignore[union-attr]
 
-    return generated
+    tokens = list(
+        trace_decode_loop(
+            prefill,
+            step,
+            stop,
+            tracer=tracer,
+            sample_fn=sample,
+            max_new_tokens=max_new_tokens,
+            kv_fn=record_kv if kv_tracker is not None else None,
+            prompt_len=int(input_ids.shape[-1]),  # type: ignore[attr-defined]
+            batch_size=int(input_ids.shape[0]),  # type: ignore[attr-defined]
+            breakdown=breakdown,
+        )
+    )
+    if not breakdown:
+        return torch.cat([input_ids, *tokens], dim=-1)
+    with span("output_concat", scope="decode.output"):
+        return torch.cat([input_ids, *tokens], dim=-1)
@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, TypeVar
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator, Sequence
+
+    from argus.core.events import TraceEvent
+    from argus.core.tracer import Tracer
+
+T = TypeVar("T")
+
+STEP_SPAN = "speculative_step"
+DRAFT_SPAN = "draft"
+VERIFY_SPAN = "verify"
+ACCEPT_SPAN = "accept"
+REJECT_SPAN = "reject"
+# step span metadata
+DRAFTED = "drafted"
+ACCEPTED = "accepted"
+
+
+def trace_speculative_loop(
+    prefill_fn: Callable[[], T],
+    draft_fn: Callable[[int], Sequence[T]],
+    verify_fn: Callable[[Sequence[T]], tuple[int, T]],
+    stop_fn: Callable[[T, int], bool] | None = None,
+    *,
+    tracer: Tracer,
+    draft_length: int = 4,
+    max_new_tokens: int = 128,
+    commit_fn: Callable[[Sequence[T], int, T], None] | None = None,
+) -> Iterator[T]:
+    """Run a traced draft-then-verify decode loop, yielding each accepted token.
+
+    prefill_fn() runs both models over the prompt and returns the target's
+    first token. Each step, draft_fn(k) proposes k tokens with the draft
+    model and verify_fn(drafts) runs the target over them, returning how many
+    leading drafts it agrees with and its own next token (the correction, or
+    a bonus token when all were accepted). commit_fn(drafts, accepted, token)
+    then rolls the models' state back to the accepted prefix. stop_fn(token, i)
+    ends the loop after yielding token i.
+
+    Spans: a "prefill" phase, then a "decode" phase with one
+    "speculative_step" span per target forward holding "draft", "verify"
+    and "accept" (every draft accepted) or "reject" children. Step spans
+    carry "drafted"/"accepted" metadata and the token_index of the first
+    token they produce; each step also samples the "speculative" counter.
+    See speculative_summary.
+    """
+    span = tracer.span
+    with (
+        span("prefill", category="phase", scope="prefill"),
+        span("forward_pass", category="compute", scope="prefill.forward"),
+    ):
+        token = prefill_fn()
+    if max_new_tokens <= 0:
+        return
+    yield token
+    if stop_fn is not None and stop_fn(token, 0):
+        return
+
+    i = 1
+    step = 0
+    with span("decode", category="phase", scope="decode"):
+        while i < max_new_tokens:
+            # the target always adds a token, so leave room for it
+            k = min(draft_length, max_new_tokens - i - 1)
+            with span(
+                STEP_SPAN, scope="decode.step.{}", scope_arg=step, token_index=i
+            ) as step_span:
+                with span(DRAFT_SPAN, scope="decode.step.{}.draft", scope_arg=step):
+                    drafts = draft_fn(k) if k else ()
+                with span(VERIFY_SPAN, scope="decode.step.{}.verify", scope_arg=step):
+                    accepted, token = verify_fn(drafts)
+                name = ACCEPT_SPAN if accepted == len(drafts) else REJECT_SPAN
+                with span(name, scope="decode.step.{}.commit", scope_arg=step):
+                    if commit_fn is not None:
+                        commit_fn(drafts, accepted, token)
+                step_span.add_metadata(DRAFTED, len(drafts))
+                step_span.add_metadata(ACCEPTED, accepted)
+            tracer.counter("speculative", drafted=len(drafts), accepted=accepted)
+            step += 1
+            for t in (*drafts[:accepted], token):
+                yield t
+                if stop_fn is not None and stop_fn(t, i):
+                    return
+                i += 1
+
+
+@dataclass(frozen=True, slots=True)
+class SpeculativeSummary:
+    """Acceptance and throughput of a speculative decode, from its step spans."""
+
+    steps: int
+    drafted: int
+    accepted: int
+    # accepted drafts per step, in order
+    acceptance_lengths: list[int] = field(default_factory=list)
+    # tokens produced per target forward (accepted drafts + the target's own)
+    tokens_per_forward: float = 0.0
+    ns_per_token: float = 0.0
+    # greedy ns per token / speculative ns per token
+    speedup: float | None = None
+
+    @property
+    def acceptance_rate(self) -> float:
+        return self.accepted / self.drafted if self.drafted else 0.0
+
+    @property
+    def mean_acceptance_length(self) -> float:
+        return self.accepted / self.steps if self.steps else 0.0
+
+
+def _greedy_ns_per_token(events: Iterable[TraceEvent]) -> float | None:
+    durations = [e.duration_ns for e in events if e.category == "token"]
+    return sum(durations) / len(durations) if durations else None
+
+
+def speculative_summary(
+    events: Iterable[TraceEvent], baseline: Iterable[TraceEvent] | None = None
+) -> SpeculativeSummary:
+    """Summarize speculative_step spans, comparing against a greedy baseline.
+
+    `baseline` is the trace of a greedy run (trace_generate) on the same
+    prompt; its mean token_generate duration is the greedy cost per token.
+    Without it, a target forward over one token is approximated by the mean
+    "verify" span, which overstates the speedup when verifying many drafts
+    costs noticeably more than decoding one token.
+    """
+    lengths: list[int] = []
+    drafted = 0
+    step_ns = 0
+    verify: list[int] = []
+    for e in events:
+        if e.name == STEP_SPAN and ACCEPTED in e.metadata:
+            lengths.append(e.metadata[ACCEPTED])
+            drafted += e.metadata[DRAFTED]
+            step_ns += e.duration_ns
+        elif e.name == VERIFY_SPAN:
+            verify.append(e.duration_ns)
+    steps = len(lengths)
+    accepted = sum(lengths)
+    if not steps:
+        return SpeculativeSummary(0, 0, 0)
+    tokens = accepted + steps
+    ns_per_token = step_ns / tokens
+    if baseline is not None:
+        greedy = _greedy_ns_per_token(baseline)
+    else:
+        greedy = sum(verify) / len(verify) if verify else None
+    return SpeculativeSummary(
+        steps=steps,
+        drafted=drafted,
+        accepted=accepted,
+        acceptance_lengths=lengths,
+        tokens_per_forward=tokens / steps,
+        ns_per_token=ns_per_token,
+        speedup=greedy / ns_per_token if greedy and ns_per_token else None,
+    )
+
+
+def _crop_cache(cache: Any, length: int) -> Any:
+    """Drop cached positions past `length` (DynamicCache or legacy tuples)."""
+    if hasattr(cache, "crop"):
+        cache.crop(length)
+        return cache
+    return tuple(tuple(t[..., :length, :] for t in layer) for layer in cache)
+
+
+def trace_speculative_generate(
+    target: object,
+    draft: object,
+    input_ids: object,
+    tracer: Tracer,
+    max_new_tokens: int = 128,
+    draft_length: int = 4,
+) -> object:
+    """Greedy speculative decoding of `target` with `draft` proposals, traced.
+
+    Output matches greedy decoding of the target alone. Both models keep KV
+    caches, cropped back to the accepted prefix after each verification.
+    Only a batch of one sequence is supported: acceptance differs per row,
+    so rows would need caches of different lengths.
+    """
+    import torch
+
+    batch_size = int(input_ids.shape[0])  # type: ignore[attr-defined]
+    if batch_size != 1:
+        raise ValueError(f"speculative decoding takes one sequence, got a batch of {batch_size}")
+
+    eos_token_id = getattr(target.config, "eos_token_id", None)  # type: ignore[attr-defined]
+    target_cache: Any = None
+    draft_cache: Any = None
+    # tokens the target has produced that each model has not yet seen
+    last: Any = None
+    draft_pending: Any = None
+    length = int(input_ids.shape[-1])  # type: ignore[attr-defined]
+
+    def argmax(logits: Any) -> Any:
+        return torch.argmax(logits, dim=-1)
+
+    def prefill() -> Any:
+        nonlocal target_cache, draft_cache, last, draft_pending
+        out = target(input_ids, use_cache=True)  # type: ignore[operator]
+        target_cache = out.past_key_values
+        draft_cache = draft(input_ids, use_cache=True).past_key_values  # type: ignore[operator]
+        last = draft_pending = argmax(out.logits[:, -1:, :])
+        return last
+
+    def propose(k: int) -> list[Any]:
+        nonlocal draft_cache
+        tokens = []
+        feed = draft_pending
+        for _ in range(k):
+            out = draft(feed, past_key_values=draft_cache, use_cache=True)  # type: ignore[operator]
+            draft_cache = out.past_key_values
+            feed = argmax(out.logits[:, -1:, :])
+            tokens.append(feed)
+        return tokens
+
+    def verify(drafts: Sequence[Any]) -> tuple[int, Any]:
+        nonlocal target_cache
+        feed = torch.cat([last, *drafts], dim=-1)
+        out = target(feed, past_key_values=target_cache, use_cache=True)  # type: ignore[operator]
+        target_cache = out.past_key_values
+        predicted = argmax(out.logits)[0].tolist()
+        proposed = feed[0, 1:].tolist()
+        accepted = 0
+        while accepted < len(proposed) and proposed[accepted] == predicted[accepted]:
+            accepted += 1
+        return accepted, torch.tensor([[predicted[accepted]]], device=feed.device)
+
+    def commit(drafts: Sequence[Any], accepted: int, token: Any) -> None:
+        nonlocal target_cache, draft_cache, last, draft_pending, length
+        # both caches hold `length` positions before `last`; the draft also
+        # ran over `last` and all but its final proposal
+        drafted = length + len(drafts)
+        length += 1 + accepted
+        target_cache = _crop_cache(target_cache, length)
+        if not drafts:
+            draft_pending = torch.cat([draft_pending, token], dim=-1)
+        elif accepted == len(drafts):
+            draft_pending = torch.cat([drafts[-1], token], dim=-1)
+        else:
+            draft_cache = _crop_cache(draft_cache, min(length, drafted))
+            draft_pending = token
+        last = token
+
+    def stop(token: Any, i: int) -> bool:
+        return eos_token_id is not None and int(token) == eos_token_id
+
+    tokens = list(
+        trace_speculative_loop(
+            prefill,
+            propose,
+            verify,
+            stop,
+            tracer=tracer,
+            draft_length=draft_length,
+            max_new_tokens=max_new_tokens,
+            commit_fn=commit,
+        )
+    )
+    return torch.cat([input_ids, *tokens], dim=-1)
@@ -0,0 +1,316 @@
+from __future__ import annotations
+
+import json
+from array import array
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from itertools import repeat
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any
+
+from argus.core.compression import open_trace
+from argus.core.events import TraceEvent, events_from_columns
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+_SEPARATORS = " \t\n\r,"
+DEFAULT_CHUNK_SIZE = 1 << 20
+# give up on batch decoding after this many misaligned batches in one file
+_MAX_BATCH_FAILURES = 4
+
+
+@contextmanager
+def _open_source(source: str | Path | IO[str]) -> Iterator[IO[str]]:
+    if isinstance(source, (str, Path)):
+        with open_trace(source) as f:
+            yield f
+    else:
+        yield source
+
+
+class _Reader:
+    """Chunked text buffer with a cursor, refilled on demand."""
+
+    __slots__ = ("_f", "_chunk_size", "buf", "pos", "eof", "_batch_failures")
+
+    def __init__(self, f: IO[str], chunk_size: int) -> None:
+        self._f = f
+        self._chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self._batch_failures = 0
+
+    def fill(self, min_size: int = 0) -> bool:
+        """Read at least one chunk, discarding consumed input. Returns False at EOF.
+
+        Reads whole chunks until `min_size` characters arrived, then joins them
+        with the unconsumed input once.
+        """
+        if self.eof:
+            return False
+        chunks = [self.buf[self.pos :]]
+        size = 0
+        while True:
+            chunk = self._f.read(self._chunk_size)
+            if not chunk:
+                self.eof = True
+                break
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= min_size:
+                break
+        if size == 0:
+            return False
+        self.buf = "".join(chunks)
+        self.pos = 0
+        return True
+
+    def skip(self, chars: str) -> str:
+        """Skip over `chars` and return the next character ('' at EOF)."""
+        while True:
+            buf = self.buf
+            pos = self.pos
+            n = len(buf)
+            while pos < n and buf[pos] in chars:
+                pos += 1
+            self.pos = pos
+            if pos < n:
+                return buf[pos]
+            if not self.fill():
+                return ""
+
+    def decode(self) -> Any:
+        """Decode one JSON value at the cursor, reading more input as needed."""
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # double the buffered input per retry, so a value spanning many
+                # chunks is copied and re-parsed a linear number of times overall
+                if not self.fill(len(self.buf) - self.pos):
+                    raise
+                continue
+            # a bare number may be cut off at the chunk boundary
+            if end == len(self.buf) and not self.eof and self.fill():
+                continue
+            self.pos = end
+            return value
+
+    def decode_batch(self) -> list[Any] | None:
+        """Decode every complete array element left in the buffer with one json.loads.
+
+        Finds the last '}' followed by ',' or ']' and parses the span up to it as
+        a JSON array, which runs at C speed instead of one raw_decode per element.
+        Returns None when no such boundary exists or it fell inside a nested
+        value; the caller then falls back to decode().
+        """
+        if self._batch_failures >= _MAX_BATCH_FAILURES:
+            return None
+        buf = self.buf
+        start = self.pos
+        cut = len(buf)
+        while True:
+            cut = buf.rfind("}", start, cut)
+            if cut == -1:
+                return None
+            nxt = cut + 1
+            n = len(buf)
+            while nxt < n and buf[nxt] in _WHITESPACE:
+                nxt += 1
+            if nxt < n and buf[nxt] in ",]":
+                break
+        try:
+            values: list[Any] = json.loads("[" + buf[start : cut + 1] + "]")
+        except json.JSONDecodeError:
+            self._batch_failures += 1
+            return None
+        self.pos = cut + 1
+        return values
+
+
+def _seek_event_array(reader: _Reader) -> bool:
+    """Position the reader just inside the event array. False if there is none."""
+    first = reader.skip(_WHITESPACE)
+    if first == "[":
+        reader.pos += 1
+        return True
+    if first != "{":
+        raise ValueError("Not a Chrome trace: expected a JSON object or array")
+    reader.pos += 1
+    while True:
+        ch = reader.skip(_SEPARATORS)
+        if ch == "}" or ch == "":
+            return False
+        key = reader.decode()
+        if reader.skip(_WHITESPACE) != ":":
+            raise ValueError("Malformed Chrome trace: expected ':' after key")
+        reader.pos += 1
+        if key == "traceEvents":
+            if reader.skip(_WHITESPACE) != "[":
+                raise ValueError("Malformed Chrome trace: traceEvents is not an array")
+            reader.pos += 1
+            return True
+        reader.skip(_WHITESPACE)
+        reader.decode()
+
+
+def iter_chrome_events(
+    source: str | Path | IO[str],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[dict[str, Any]]:
+    """Stream raw Chrome trace event dicts without loading the whole file.
+
+    Accepts both the object form ({"traceEvents": [...]}) and the bare array form.
+    Memory use is bounded by `chunk_size` plus about twice the largest single event.
+    """
+    with _open_source(source) as f:
+        reader = _Reader(f, chunk_size)
+        if not _seek_event_array(reader):
+            return
+        while True:
+            ch = reader.skip(_SEPARATORS)
+            if ch == "]":
+                return
+            if ch == "":
+                raise ValueError("Truncated Chrome trace: event array is not closed")
+            batch = reader.decode_batch()
+            if batch is not None:
+                yield from batch
+            else:
+                yield reader.decode()
+
+
+def _chrome_to_event(ev: dict[str, Any], fallback_id: int) -> TraceEvent | None:
+    """Inverse of exporters.chrome._event_to_chrome. Returns None for non X/C phases."""
+    ph = ev.get("ph")
+    if ph != "X" and ph != "C":
+        return None
+    args = ev.get("args")
+    metadata = dict(args) if args else {}
+    event_id = metadata.pop("event_id", None)
+    scope = metadata.pop("scope", "")
+    parent_id = metadata.pop("parent_id", None)
+    token_index = metadata.pop("token_index", None)
+    start_ns = round(ev.get("ts", 0) * 1_000)
+    end_ns = start_ns + round(ev.get("dur", 0) * 1_000) if ph == "X" else start_ns
+    return TraceEvent(
+        event_id=str(event_id) if event_id is not None else str(fallback_id),
+        name=ev.get("name", ""),
+        start_ns=start_ns,
+        end_ns=end_ns,
+        category=ev.get("cat", "memory" if ph == "C" else "compute"),
+        scope=scope,
+        parent_id=str(parent_id) if parent_id is not None else None,
+        token_index=token_index,
+        metadata=metadata,
+    )
+
+
+def _to_events(raw_events: Iterable[dict[str, Any]]) -> Iterator[TraceEvent]:
+    for i, ev in enumerate(raw_events):
+        event = _chrome_to_event(ev, i)
+        if event is not None:
+            yield event
+
+
+def iter_chrome_trace(
+    source: str | Path | IO[str],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[TraceEvent]:
+    """Stream TraceEvents from a Chrome trace in bounded memory."""
+    return _to_events(iter_chrome_events(source, chunk_size))
+
+
+def _load_raw(source: str | Path | IO[str], streaming: bool) -> Iterable[dict[str, Any]]:
+    if streaming:
+        return iter_chrome_events(source)
+    with _open_source(source) as f:
+        data = json.load(f)
+    return data if isinstance(data, list) else data.get("traceEvents", [])
+
+
+def load_chrome_trace(
+    source: str | Path | IO[str],
+    streaming: bool = False,
+) -> list[TraceEvent]:
+    """Load the X and C events of a Chrome trace back into TraceEvents.
+
+    Recovers event_id, scope, parent_id and token_index from args as written by
+    the Chrome exporter; remaining args become metadata. With streaming=True the
+    file is parsed incrementally instead of with a single json.load.
+    """
+    return list(_to_events(_load_raw(source, streaming)))
+
+
+@dataclass(slots=True)
+class TraceColumns:
+    """Column-oriented view of a trace: one sequence per TraceEvent field."""
+
+    event_id: list[str] = field(default_factory=list)
+    name: list[str] = field(default_factory=list)
+    category: list[str] = field(default_factory=list)
+    scope: list[str] = field(default_factory=list)
+    start_ns: array[int] = field(default_factory=lambda: array("q"))
+    end_ns: array[int] = field(default_factory=lambda: array("q"))
+    parent_id: list[str | None] = field(default_factory=list)
+    token_index: list[int | None] = field(default_factory=list)
+    metadata: list[dict[str, Any]] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.event_id)
+
+    def to_events(self) -> list[TraceEvent]:
+        n = len(self)
+        return events_from_columns(
+            n,
+            self.event_id,
+            self.name,
+            self.start_ns,
+            self.end_ns,
+            self.category,
+            self.scope,
+            self.parent_id,
+            self.token_index,
+            self.metadata,
+            repeat(None, n),
+        )
+
+
+def load_chrome_columns(
+    source: str | Path | IO[str],
+    streaming: bool = False,
+) -> TraceColumns:
+    """Load a Chrome trace into columns without building per-event objects."""
+    cols = TraceColumns()
+    append_id = cols.event_id.append
+    append_name = cols.name.append
+    append_cat = cols.category.append
+    append_scope = cols.scope.append
+    append_start = cols.start_ns.append
+    append_end = cols.end_ns.append
+    append_parent = cols.parent_id.append
+    append_token = cols.token_index.append
+    append_meta = cols.metadata.append
+    for i, ev in enumerate(_load_raw(source, streaming)):
+        ph = ev.get("ph")
+        if ph != "X" and ph != "C":
+            continue
+        args = ev.get("args")
+        metadata = dict(args) if args else {}
+        event_id = metadata.pop("event_id", None)
+        parent_id = metadata.pop("parent_id", None)
+        start_ns = round(ev.get("ts", 0) * 1_000)
+        append_id(str(event_id) if event_id is not None else str(i))
+        append_name(ev.get("name", ""))
+        append_cat(ev.get("cat", "memory" if ph == "C" else "compute"))
+        append_scope(metadata.pop("scope", ""))
+        append_start(start_ns)
+        append_end(start_ns + round(ev.get("dur", 0) * 1_000) if ph == "X" else start_ns)
+        append_parent(str(parent_id) if parent_id is not None else None)
+        append_token(metadata.pop("token_index", None))
+        append_meta(metadata)
+    return cols
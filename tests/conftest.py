@@ -42,6 +42,26 @@ def tracer():
     return Tracer()
 
 
+@pytest.fixture
+def make_event():
+    """Factory for TraceEvents with test defaults; keyword arguments override them."""
+    from argus.core.events import TraceEvent
+
+    def make(**overrides) -> TraceEvent:
+        defaults = {
+            "event_id": "0",
+            "name": "op",
+            "start_ns": 1_000,
+            "end_ns": 2_000,
+            "category": "compute",
+            "scope": "test",
+        }
+        defaults.update(overrides)
+        return TraceEvent(**defaults)
+
+    return make
+
+
 @pytest.fixture(scope="session")
 def tiny_model():
     """Session-scoped tiny GPT2 model — downloaded once per test run."""
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from argus.analysis.breakdown import summarize_breakdown, token_breakdown
+from argus.core.events import TraceEvent
+from argus.core.tracer import Tracer
+from argus.hooks.decode import trace_decode_loop
+
+
+def _event(event_id, name, start, end, category="compute", parent_id=None, token_index=None):
+    return TraceEvent(event_id, name, start, end, category, "s", parent_id, token_index)
+
+
+def test_gap_is_token_time_outside_children():
+    events = [
+        _event("t0", "token_generate", 0, 100, "token", token_index=0),
+        _event("f0", "forward_pass", 10, 70, parent_id="t0"),
+        _event("s0", "sample", 75, 85, parent_id="t0"),
+        _event("x", "op", 20, 30, parent_id="f0"),  # grandchild: already inside forward
+    ]
+    (row,) = token_breakdown(events)
+    assert row.children_ns == {"forward_pass": 60, "sample": 10}
+    assert row.untraced_ns == 30
+    assert row.untraced_fraction == 0.3
+
+
+def test_overlapping_children_do_not_go_negative():
+    events = [
+        _event("t0", "token_generate", 0, 50, "token", token_index=0),
+        _event("a", "a", 0, 40, parent_id="t0"),
+        _event("b", "b", 30, 60, parent_id="t0"),
+    ]
+    (row,) = token_breakdown(events)
+    assert row.untraced_ns == 0
+
+
+def test_summary_means_per_token():
+    events = [
+        _event("t0", "token_generate", 0, 100, "token", token_index=0),
+        _event("f0", "forward_pass", 0, 80, parent_id="t0"),
+        _event("t1", "token_generate", 100, 140, "token", token_index=1),
+    ]
+    summary = summarize_breakdown(token_breakdown(events))
+    assert summary == {"forward_pass": 40.0, "untraced": 30.0, "total": 70.0}
+    assert summarize_breakdown([]) == {}
+
+
+def test_decode_loop_breakdown_spans():
+    t = Tracer()
+    tokens = list(
+        trace_decode_loop(
+            lambda: 0,
+            lambda s, tok: s + 1,
+            lambda tok, i: False,
+            tracer=t,
+            sample_fn=lambda s: s,
+            max_new_tokens=3,
+            kv_fn=lambda s, i: None,
+            breakdown=True,
+        )
+    )
+    assert tokens == [0, 1, 2]
+    rows = token_breakdown(t.events)
+    assert set(rows[0].children_ns) == {"sample", "stop_check"}
+    assert set(rows[1].children_ns) == {"forward_pass", "kv_report", "sample", "stop_check"}
+    assert [e.full_scope for e in t.events if e.name == "sample"][1] == "decode.token.1.sample"
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from argus.analysis.cputime import wait_bound_spans
+from argus.core.tracer import Tracer
+
+
+def test_flags_spans_with_low_cpu_ratio():
+    t = Tracer()
+    t.record_events(
+        ["compute", "wait", "short_wait", "untimed", "pool"],
+        [0, 0, 0, 0, 0],
+        [1_000_000, 2_000_000, 50_000, 1_000_000, 1_000_000],
+        metadata=[
+            {"thread_cpu_ns": 950_000},
+            {"thread_cpu_ns": 200_000},
+            {"thread_cpu_ns": 0},
+            {},
+            {"thread_cpu_ns": 300_000, "process_cpu_ns": 3_000_000},
+        ],
+    )
+    flagged = wait_bound_spans(t.events)
+    assert [s.event.name for s in flagged] == ["wait", "pool"]
+    assert flagged[0].wait_ns == 1_800_000
+    assert flagged[0].cpu_ratio == 0.1
+
+    by_process = wait_bound_spans(t.events, process=True)
+    assert by_process == []
+    assert [s.event.name for s in wait_bound_spans(t.events, min_duration_ns=0)] == [
+        "wait",
+        "pool",
+        "short_wait",
+    ]
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import json
+import random
+
+from argus.analysis.diff import diff_traces, mann_whitney_u, normalize_scope
+from argus.cli import main
+from argus.core.events import TraceEvent
+from argus.exporters.chrome import export_chrome_trace
+
+
+def _write_trace(path, durations_by_name: dict[str, list[int]]) -> None:
+    events = []
+    t = 0
+    for name, durations in durations_by_name.items():
+        for i, dur in enumerate(durations):
+            events.append(
+                TraceEvent(
+                    event_id=str(len(events)),
+                    name=name,
+                    start_ns=t,
+                    end_ns=t + dur,
+                    category="compute",
+                    scope=f"decode.token.{i}.forward",
+                )
+            )
+            t += dur
+    export_chrome_trace(events, path)
+
+
+def _noisy(mean_ns: int, n: int = 200, seed: int = 0) -> list[int]:
+    rng = random.Random(seed)
+    return [int(rng.gauss(mean_ns, mean_ns * 0.05)) for _ in range(n)]
+
+
+def test_normalize_scope():
+    assert normalize_scope("decode.token.17.forward") == "decode.token.*.forward"
+    assert normalize_scope("prefill.forward") == "prefill.forward"
+    assert normalize_scope("") == ""
+
+
+def test_mann_whitney_detects_shift():
+    a = list(range(100))
+    b = [v + 50 for v in a]
+    assert mann_whitney_u(a, b) < 0.001
+    assert mann_whitney_u(b, a) > 0.99
+
+
+def test_mann_whitney_identical_samples():
+    a = [5] * 20
+    assert mann_whitney_u(a, list(a)) == 1.0
+
+
+def test_mann_whitney_empty():
+    assert mann_whitney_u([], [1, 2]) == 1.0
+
+
+def test_no_regression_for_same_distribution(tmp_path):
+    _write_trace(tmp_path / "a.json", {"forward_pass": _noisy(100_000, seed=1)})
+    _write_trace(tmp_path / "b.json", {"forward_pass": _noisy(100_000, seed=2)})
+    diff = diff_traces(tmp_path / "a.json", tmp_path / "b.json")
+    assert diff.regressions == []
+    assert len(diff.comparisons) == 1
+    assert diff.comparisons[0].scope == "decode.token.*.forward"
+
+
+def test_regression_detected(tmp_path):
+    _write_trace(tmp_path / "a.json", {"forward_pass": _noisy(100_000, seed=1)})
+    _write_trace(tmp_path / "b.json", {"forward_pass": _noisy(130_000, seed=2)})
+    diff = diff_traces(tmp_path / "a.json", tmp_path / "b.json")
+    assert len(diff.regressions) == 1
+    c = diff.regressions[0]
+    assert c.name == "forward_pass"
+    assert 1.2 < c.ratio < 1.4
+    assert c.p_value < 0.01
+
+
+def test_improvement_detected(tmp_path):
+    _write_trace(tmp_path / "a.json", {"forward_pass": _noisy(100_000, seed=1)})
+    _write_trace(tmp_path / "b.json", {"forward_pass": _noisy(70_000, seed=2)})
+    diff = diff_traces(tmp_path / "a.json", tmp_path / "b.json")
+    assert diff.regressions == []
+    assert len(diff.improvements) == 1
+
+
+def test_small_slowdown_below_threshold_ignored(tmp_path):
+    _write_trace(tmp_path / "a.json", {"op": _noisy(100_000, n=2000, seed=1)})
+    _write_trace(tmp_path / "b.json", {"op": _noisy(102_000, n=2000, seed=2)})
+    diff = diff_traces(tmp_path / "a.json", tmp_path / "b.json", threshold=0.05)
+    assert diff.regressions == []
+
+
+def test_too_few_samples_never_flagged(tmp_path):
+    _write_trace(tmp_path / "a.json", {"op": [100_000] * 3})
+    _write_trace(tmp_path / "b.json", {"op": [500_000] * 3})
+    diff = diff_traces(tmp_path / "a.json", tmp_path / "b.json", min_count=5)
+    assert diff.regressions == []
+
+
+def test_unmatched_spans_reported(tmp_path):
+    _write_trace(tmp_path / "a.json", {"old": [1000] * 5, "shared": [1000] * 5})
+    _write_trace(tmp_path / "b.json", {"new": [1000] * 5, "shared": [1000] * 5})
+    diff = diff_traces(tmp_path / "a.json", tmp_path / "b.json")
+    assert diff.only_in_baseline == [("old", "decode.token.*.forward")]
+    assert diff.only_in_candidate == [("new", "decode.token.*.forward")]
+
+
+def test_bounded_reservoir(tmp_path):
+    _write_trace(tmp_path / "a.json", {"op": _noisy(100_000, n=5000, seed=1)})
+    _write_trace(tmp_path / "b.json", {"op": _noisy(150_000, n=5000, seed=2)})
+    diff = diff_traces(tmp_path / "a.json", tmp_path / "b.json", reservoir_size=64)
+    assert diff.comparisons[0].baseline.count == 5000
+    assert len(diff.regressions) == 1
+
+
+def test_cli_exit_codes(tmp_path, capsys):
+    _write_trace(tmp_path / "a.json", {"op": _noisy(100_000, seed=1)})
+    _write_trace(tmp_path / "b.json", {"op": _noisy(100_000, seed=2)})
+    _write_trace(tmp_path / "c.json", {"op": _noisy(150_000, seed=3)})
+    assert main(["diff", str(tmp_path / "a.json"), str(tmp_path / "b.json")]) == 0
+    assert main(["diff", str(tmp_path / "a.json"), str(tmp_path / "c.json")]) == 1
+    assert "REGRESSED" in capsys.readouterr().out
+
+
+def test_cli_json_output(tmp_path, capsys):
+    _write_trace(tmp_path / "a.json", {"op": _noisy(100_000, seed=1)})
+    _write_trace(tmp_path / "b.json", {"op": _noisy(150_000, seed=2)})
+    main(["diff", "--json", str(tmp_path / "a.json"), str(tmp_path / "b.json")])
+    data = json.loads(capsys.readouterr().out)
+    assert data["regressions"] == 1
+    assert data["comparisons"][0]["name"] == "op"
+
+
+def test_cli_json_zero_baseline_is_strict_json(tmp_path, capsys):
+    _write_trace(tmp_path / "a.json", {"mark": [0] * 5, "op": [1_000] * 5})
+    _write_trace(tmp_path / "b.json", {"mark": [500] * 5, "op": [1_000] * 5})
+    main(["diff", "--json", str(tmp_path / "a.json"), str(tmp_path / "b.json")])
+    out = capsys.readouterr().out
+
+    def reject(constant):
+        raise ValueError(constant)
+
+    data = json.loads(out, parse_constant=reject)
+    ratios = {c["name"]: c["ratio"] for c in data["comparisons"]}
+    assert ratios == {"mark": None, "op": 1.0}
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from argus.core.clock import monotonic_ns
+from argus.core.clock import clock_pair, monotonic_ns, process_cpu_ns, thread_cpu_ns
 
 
 def test_returns_int():
@@ -26,3 +26,18 @@ def test_rapid_calls_no_exceptions():
 
 def test_positive_value():
     assert monotonic_ns() > 0
+
+
+def test_clock_pair():
+    before = monotonic_ns()
+    mono, wall = clock_pair()
+    after = monotonic_ns()
+    assert before <= mono <= after
+    assert wall > 0
+
+
+def test_cpu_clocks_advance_with_work():
+    thread, process = thread_cpu_ns(), process_cpu_ns()
+    sum(i * i for i in range(200_000))
+    assert thread_cpu_ns() > thread
+    assert process_cpu_ns() > process
@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import json
+from dataclasses import replace
+from io import StringIO
+
+import pytest
+
+from argus import export_chrome
+from argus.core.compaction import CompactingTracer, compact_events
+from argus.core.events import TraceEvent
+
+
+def _token_events(n: int, slow: frozenset[int] = frozenset()) -> list[TraceEvent]:
+    """decode phase (id "0") with n token spans, each holding a forward_pass."""
+    events = []
+    eid = 1
+    t = 0
+    for i in range(n):
+        dur = 10_000 if i in slow else 1_000 + (i % 7)
+        tok_id, fwd_id = str(eid), str(eid + 1)
+        eid += 2
+        scope = f"decode.token.{i}"
+        events += [
+            TraceEvent(
+                fwd_id,
+                "forward_pass",
+                t + 10,
+                t + dur - 10,
+                "compute",
+                scope + ".forward",
+                parent_id=tok_id,
+            ),
+            TraceEvent(
+                tok_id, "token_generate", t, t + dur, "token", scope, parent_id="0", token_index=i
+            ),
+        ]
+        t += dur
+    events.append(TraceEvent("0", "decode", 0, t, "phase", "decode"))
+    return events
+
+
+def _summaries(events):
+    return [e for e in events if e.metadata.get("compacted")]
+
+
+def _kept_tokens(events) -> list[int]:
+    return sorted(
+        e.token_index
+        for e in events
+        if e.name == "token_generate" and not e.metadata.get("compacted")
+    )
+
+
+def test_keeps_first_tokens_and_outliers():
+    out = compact_events(_token_events(200, slow=frozenset({150})), keep_first=16)
+    assert _kept_tokens(out) == list(range(16)) + [150]
+    assert any(e.name == "decode" for e in out)
+    tokens = [e for e in _summaries(out) if e.name == "token_generate"]
+    assert [(e.metadata["token_start"], e.metadata["token_end"]) for e in tokens] == [
+        (16, 149),
+        (151, 199),
+    ]
+    assert all(e.parent_id == "0" and e.scope == "decode.token.*" for e in tokens)
+
+
+def test_summary_stats_and_nesting():
+    out = compact_events(_token_events(40), keep_first=0, outlier_ns=10**9)
+    token, forward = sorted(_summaries(out), key=lambda e: e.start_ns)
+    assert token.name == "token_generate"
+    assert forward.name == "forward_pass"
+    assert forward.parent_id == token.event_id
+    assert forward.scope == "decode.token.*.forward"
+    meta = token.metadata
+    assert meta["count"] == 40
+    assert meta["min_ns"] == 1_000
+    assert meta["max_ns"] == 1_006
+    assert meta["p99_ns"] == 1_006
+    assert 1_000 < meta["mean_ns"] < 1_006
+    assert (token.start_ns, token.end_ns) == (0, max(e.end_ns for e in out))
+
+
+def test_size_grows_sublinearly():
+    small = compact_events(_token_events(500, slow=frozenset({300})))
+    large = compact_events(_token_events(5_000, slow=frozenset({300})))
+    assert len(large) == len(small)
+    assert len(small) < 100
+
+
+def test_max_run_splits_ranges():
+    out = compact_events(_token_events(100), keep_first=0, outlier_ns=10**9, max_run=30)
+    tokens = [e for e in _summaries(out) if e.name == "token_generate"]
+    assert [e.metadata["count"] for e in tokens] == [30, 30, 30, 10]
+
+
+def test_runs_do_not_cross_parents():
+    first = _token_events(10)
+    second = [
+        replace(
+            e,
+            event_id=e.event_id + "b",
+            start_ns=e.start_ns + 10**6,
+            end_ns=e.end_ns + 10**6,
+            parent_id=None if e.parent_id is None else e.parent_id + "b",
+        )
+        for e in first
+    ]
+    out = compact_events(first + second, keep_first=2, outlier_ns=10**9)
+    tokens = [e for e in _summaries(out) if e.name == "token_generate"]
+    assert sorted(e.parent_id for e in tokens) == ["0", "0b"]
+
+
+def _replay(tracer, events):
+    decode = events[-1]
+    with tracer.span("decode", category="phase", scope="decode"):
+        for e in events[:-1]:
+            tracer.record_event(e)
+    return decode
+
+
+def test_tracer_mode_matches_post_pass():
+    events = _token_events(120, slow=frozenset({60}))
+    t = CompactingTracer(keep_first=8, outlier_ns=5_000)
+    _replay(t, events)
+    t.finish()
+    online = {(e.event_id, e.name, e.token_index) for e in t.events if e.name != "decode"}
+    offline = compact_events(events, keep_first=8, outlier_ns=5_000)
+    assert online == {(e.event_id, e.name, e.token_index) for e in offline if e.name != "decode"}
+
+
+def test_tracer_mode_relative_outliers_and_listeners():
+    seen = []
+    t = CompactingTracer(keep_first=4, outlier_factor=3.0)
+    t.add_listener(seen.append)
+    _replay(t, _token_events(50, slow=frozenset({30})))
+    assert len(seen) == 101
+    assert _kept_tokens(t.events) == [0, 1, 2, 3, 30]
+    # the open run is visible provisionally
+    last_run = [e for e in _summaries(t.events) if e.name == "token_generate"][-1]
+    assert last_run.metadata["token_start"] == 31
+    assert last_run.metadata["token_end"] == 49
+
+
+def test_tracer_mode_real_spans():
+    t = CompactingTracer(keep_first=2, outlier_ns=10**12)
+    with t.span("decode", category="phase", scope="decode"):
+        for i in range(20):
+            scope = f"decode.token.{i}"
+            with (
+                t.span("token_generate", category="token", scope=scope, token_index=i),
+                t.span("forward_pass", scope=f"decode.token.{i}.forward"),
+            ):
+                pass
+    t.finish()
+    names = sorted((e.name, bool(e.metadata.get("compacted"))) for e in t.events)
+    assert names.count(("token_generate", False)) == 2
+    assert ("token_generate", True) in names
+    assert ("forward_pass", True) in names
+    assert len(t.events) == 7
+
+
+def test_reset_clears_state():
+    t = CompactingTracer(keep_first=1, outlier_ns=10**9)
+    _replay(t, _token_events(5))
+    t.reset()
+    assert t.events == []
+    _replay(t, _token_events(3))
+    assert _kept_tokens(t.events) == [0]
+
+
+@pytest.mark.parametrize("keep_first", [0, 1000])
+def test_degenerate_settings(keep_first):
+    events = _token_events(20)
+    out = compact_events(events, keep_first=keep_first, outlier_ns=10**9)
+    if keep_first:
+        assert sorted(e.event_id for e in out) == sorted(e.event_id for e in events)
+    else:
+        assert len(_summaries(out)) == 2
+
+
+def test_scope_templates_fold_like_formatted_scopes():
+    events = [
+        replace(e, scope=e.scope.replace(str(e.token_index), "{}"), scope_arg=e.token_index)
+        if e.name == "token_generate"
+        else e
+        for e in _token_events(30)
+    ]
+    out = compact_events(events, keep_first=0, outlier_ns=10**9)
+    token = next(e for e in _summaries(out) if e.name == "token_generate")
+    assert token.scope == "decode.token.*"
+    assert token.metadata["count"] == 30
+
+
+def test_record_events_routed_through_compactor():
+    t = CompactingTracer(keep_first=1, outlier_ns=10**9)
+    n = 10
+    t.record_events(
+        ["token_generate"] * n,
+        [i * 100 for i in range(n)],
+        [i * 100 + 50 for i in range(n)],
+        "token",
+        "decode.token.{}",
+        token_indices=list(range(n)),
+        scope_args=list(range(n)),
+    )
+    t.finish()
+    (summary,) = [e for e in t.events if e.metadata.get("compacted")]
+    assert summary.metadata["count"] == n - 1
+
+
+def test_tracer_mode_keeps_counter_tracks():
+    t = CompactingTracer(keep_first=1)
+    for i in range(6):
+        with t.span("token_generate", category="token", token_index=i):
+            t.counter("kv_cache", cache_size_bytes=1024 * (i + 1))
+    t.finish()
+    out = StringIO()
+    export_chrome(t, out)
+    samples = [e for e in json.loads(out.getvalue())["traceEvents"] if e["ph"] == "C"]
+    assert [e["args"]["cache_size_bytes"] for e in samples] == [1024 * (i + 1) for i in range(6)]
+
+
+def test_swap_events_closes_run_and_keeps_token_counts():
+    t = CompactingTracer(keep_first=2, outlier_ns=10**9)
+    events = _token_events(10)
+    for e in events[:10]:
+        t.record_event(e)
+    swapped = t.swap_events()
+    assert _kept_tokens(swapped) == [0, 1]
+    (run,) = [e for e in _summaries(swapped) if e.name == "token_generate"]
+    assert (run.metadata["token_start"], run.metadata["token_end"]) == (2, 4)
+    assert t.events == []
+    for e in events[10:-1]:
+        t.record_event(e)
+    # tokens 0 and 1 were already kept before the swap
+    assert _kept_tokens(t.events) == []
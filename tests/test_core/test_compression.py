@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import gzip
+import lzma
+
+import pytest
+
+from argus import load_chrome
+from argus.analysis.diff import diff_traces
+from argus.core.compression import (
+    CompressedWriter,
+    compression_for,
+    open_trace,
+    open_trace_for_write,
+)
+from argus.core.events import TraceEvent
+from argus.exporters.chrome import export_chrome_trace
+from argus.exporters.flusher import PeriodicFlusher
+from argus.exporters.split import split_chrome_trace
+from argus.importers.chrome import iter_chrome_trace, load_chrome_columns, load_chrome_trace
+
+
+def _events(n: int = 50) -> list[TraceEvent]:
+    return [
+        TraceEvent(
+            event_id=str(i),
+            name="attn",
+            start_ns=i * 1_000,
+            end_ns=i * 1_000 + 400,
+            category="compute",
+            scope="layer.0.attn",
+            token_index=i,
+        )
+        for i in range(n)
+    ]
+
+
+def test_compression_for_suffix():
+    assert compression_for("t.json.gz") == "gzip"
+    assert compression_for("t.JSON.XZ") == "xz"
+    assert compression_for("t.json") is None
+
+
+@pytest.mark.parametrize(("suffix", "opener"), [(".gz", gzip.open), (".xz", lzma.open)])
+def test_writer_round_trip(tmp_path, suffix, opener):
+    path = tmp_path / f"t.txt{suffix}"
+    with open_trace_for_write(path) as f:
+        for i in range(1_000):
+            f.write(f"line {i}\n")
+    with opener(path, "rt") as f:
+        assert f.read() == "".join(f"line {i}\n" for i in range(1_000))
+
+
+def test_writer_small_buffer_uses_background_chunks(tmp_path):
+    path = tmp_path / "t.gz"
+    with CompressedWriter(path, "gzip", level=1, buffer_size=16, max_pending=1) as f:
+        for _ in range(200):
+            f.write("0123456789")
+    with gzip.open(path, "rt") as f:
+        assert f.read() == "0123456789" * 200
+
+
+def test_gzip_output_is_reproducible(tmp_path):
+    a, b = tmp_path / "a.json.gz", tmp_path / "b.json.gz"
+    export_chrome_trace(_events(), a)
+    export_chrome_trace(_events(), b)
+    assert a.read_bytes() == b.read_bytes()
+
+
+def test_level_changes_output(tmp_path):
+    fast, small = tmp_path / "1.json.gz", tmp_path / "9.json.gz"
+    export_chrome_trace(_events(2_000), fast, level=1)
+    export_chrome_trace(_events(2_000), small, level=9)
+    assert small.stat().st_size < fast.stat().st_size
+
+
+def test_explicit_compression_ignores_suffix(tmp_path):
+    path = tmp_path / "trace.json"
+    export_chrome_trace(_events(), path, compression="xz")
+    assert path.read_bytes().startswith(b"\xfd7zXZ")
+    assert len(load_chrome_trace(path)) == 50
+
+
+def test_rejects_unknown_compression(tmp_path):
+    with pytest.raises(ValueError, match="Unknown compression"):
+        CompressedWriter(tmp_path / "t", "zstd")
+
+
+@pytest.mark.parametrize("name", ["trace.json.gz", "trace.json.xz", "trace.json"])
+def test_loaders_read_compressed_transparently(tmp_path, name):
+    path = tmp_path / name
+    export_chrome_trace(_events(), path)
+    assert len(load_chrome_trace(path)) == 50
+    assert len(load_chrome_trace(path, streaming=True)) == 50
+    assert len(list(iter_chrome_trace(path, chunk_size=64))) == 50
+    assert len(load_chrome_columns(path)) == 50
+    assert len(load_chrome(path).events) == 50
+
+
+def test_open_trace_detects_by_content(tmp_path):
+    path = tmp_path / "misnamed.json"
+    with gzip.open(path, "wt") as f:
+        f.write("[]")
+    with open_trace(path) as f:
+        assert f.read() == "[]"
+
+
+def test_diff_reads_gzip(tmp_path):
+    a, b = tmp_path / "a.json.gz", tmp_path / "b.json"
+    export_chrome_trace(_events(), a)
+    export_chrome_trace(_events(), b)
+    diff = diff_traces(a, b)
+    assert not diff.regressions
+    assert diff.comparisons
+
+
+def test_split_and_flusher_compress_chunks(tmp_path):
+    chunks = split_chrome_trace(
+        _events(), tmp_path / "split", max_events=20, max_workers=1, compression="gzip"
+    )
+    assert all(c.file.endswith(".json.gz") for c in chunks)
+    assert sum(len(load_chrome_trace(tmp_path / "split" / c.file)) for c in chunks) == 50
+
+    from argus.core.tracer import Tracer
+
+    t = Tracer()
+    for e in _events(5):
+        t.record_event(e)
+    flusher = PeriodicFlusher(t, tmp_path / "flush", compression="xz")
+    path = flusher.flush()
+    assert path.name == "trace-000000.json.xz"
+    assert len(load_chrome_trace(path)) == 5
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import pytest
+
+from argus.core.counters import CounterTrack
+from argus.core.tracer import Tracer
+
+
+def test_counter_single_value():
+    t = Tracer()
+    t.counter("queue_depth", 3)
+    t.counter("queue_depth", 5)
+    track = t.counters["queue_depth"]
+    assert list(track.series["value"]) == [3, 5]
+    assert track.series["value"].typecode == "q"
+    assert t.events == []
+
+
+def test_counter_named_series():
+    t = Tracer()
+    t.counter("mem", allocated=10, reserved=20)
+    assert t.counters["mem"].last() == {"allocated": 10, "reserved": 20}
+
+
+def test_int_series_widens_to_float():
+    track = CounterTrack("c")
+    track.append(1, {"v": 1})
+    track.append(2, {"v": 2.5})
+    assert track.series["v"].typecode == "d"
+    assert list(track.series["v"]) == [1.0, 2.5]
+
+
+def test_series_mismatch_raises():
+    track = CounterTrack("c")
+    track.append(1, {"a": 1})
+    with pytest.raises(ValueError, match="expects series"):
+        track.append(2, {"b": 1})
+    with pytest.raises(ValueError, match="at least one"):
+        CounterTrack("d").append(1, {})
+
+
+def test_samples_downsample_keeps_peaks():
+    track = CounterTrack("c")
+    for i, v in enumerate([1, 9, 2, 3, 4, 8, 5, 6, 7, 0]):
+        track.append(i, {"v": v})
+    assert len(list(track.samples())) == 10
+    out = list(track.samples(max_samples=4))
+    assert out == [(2, {"v": 9}), (5, {"v": 8}), (8, {"v": 7}), (9, {"v": 0})]
+
+
+def test_since_copies_tail():
+    track = CounterTrack("c")
+    for i in range(5):
+        track.append(i, {"v": i})
+    tail = track.since(3)
+    assert list(tail.timestamps) == [3, 4]
+    assert list(tail.series["v"]) == [3, 4]
+    track.append(5, {"v": 5})
+    assert len(tail) == 2
+
+
+def test_window_leads_with_value_at_start():
+    track = CounterTrack("c")
+    for ts in (10, 20, 30):
+        track.append(ts, {"v": ts // 10})
+    window = track.window(15, 30)
+    assert list(window.timestamps) == [15, 20]
+    assert list(window.series["v"]) == [1, 2]
+    assert list(track.window(20, 25).timestamps) == [20]
+    assert list(track.window(0, 10).timestamps) == []
+    after = track.window(40, 50)
+    assert (list(after.timestamps), list(after.series["v"])) == ([40], [3])
+
+
+def test_reset_clears_counters():
+    t = Tracer()
+    t.counter("c", 1)
+    t.reset()
+    assert t.counters == {}
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from io import StringIO
+
+from argus import export_chrome
+from argus.core.cputime import CpuTimeTracer
+
+
+def _spin(seconds: float) -> None:
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_busy_span_is_cpu_bound():
+    t = CpuTimeTracer()
+    with t.span("busy"):
+        _spin(0.02)
+    (event,) = t.events
+    assert event.metadata["thread_cpu_ns"] > 10_000_000
+    assert event.metadata["thread_cpu_ratio"] > 0.5
+    assert "process_cpu_ns" not in event.metadata
+
+
+def test_sleeping_span_is_wait_bound():
+    t = CpuTimeTracer()
+    with t.span("sleep"):
+        time.sleep(0.02)
+    (event,) = t.events
+    assert event.metadata["thread_cpu_ratio"] < 0.2
+
+
+def test_process_time_includes_other_threads():
+    t = CpuTimeTracer(process=True)
+    worker = threading.Thread(target=_spin, args=(0.05,))
+    with t.span("join"):
+        worker.start()
+        worker.join()
+    (event,) = t.events
+    assert event.metadata["process_cpu_ratio"] > event.metadata["thread_cpu_ratio"]
+
+
+def test_nested_spans_and_chrome_args():
+    t = CpuTimeTracer()
+    with t.span("outer"), t.span("inner"):
+        _spin(0.001)
+    inner, outer = t.events
+    assert inner.parent_id == outer.event_id
+    assert outer.metadata["thread_cpu_ns"] >= inner.metadata["thread_cpu_ns"]
+    out = StringIO()
+    export_chrome(t, out)
+    args = [e["args"] for e in json.loads(out.getvalue())["traceEvents"] if e["ph"] == "X"]
+    assert all("thread_cpu_ratio" in a for a in args)
+
+
+def test_ratio_uses_span_duration_and_leaves_caller_metadata():
+    t = CpuTimeTracer(process=True)
+    metadata = {"step": 1}
+    with t.span("busy", metadata=metadata):
+        _spin(0.005)
+    (event,) = t.events
+    assert metadata == {"step": 1}
+    assert event.metadata["step"] == 1
+    ratio = event.metadata["thread_cpu_ns"] / event.duration_ns
+    assert event.metadata["thread_cpu_ratio"] == min(ratio, 1.0)
+    assert 0.0 <= event.metadata["thread_cpu_ratio"] <= 1.0
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import json
+import tracemalloc
+from io import StringIO
+
+from argus import export_chrome
+from argus.core.memory import MemoryTracer
+from argus.core.tracer import SpanContext
+
+
+def test_span_records_allocation_delta_and_peak():
+    with MemoryTracer() as t:
+        keep = None
+        with t.span("alloc"):
+            keep = bytearray(1_000_000)
+            scratch = bytearray(4_000_000)
+            del scratch
+        (event,) = t.events
+    assert 1_000_000 <= event.metadata["heap_delta_bytes"] < 1_500_000
+    assert event.metadata["heap_peak_bytes"] > 4_900_000
+    assert len(keep) == 1_000_000
+
+
+def test_peak_of_nested_span_reaches_parent():
+    with MemoryTracer() as t:
+        with t.span("outer"), t.span("inner"):
+            scratch = bytearray(3_000_000)
+            del scratch
+        inner, outer = t.events
+    assert inner.metadata["heap_peak_bytes"] > 2_900_000
+    assert outer.metadata["heap_peak_bytes"] > 2_900_000
+    assert abs(outer.metadata["heap_delta_bytes"]) < 100_000
+
+
+def test_only_selected_depths_are_measured():
+    with MemoryTracer(depths=(1,)) as t:
+        with t.span("phase"), t.span("token") as token_span, t.span("op") as op_span:
+            pass
+        op, token, phase = t.events
+    assert type(op_span) is SpanContext
+    assert type(token_span) is not SpanContext
+    assert "heap_delta_bytes" in token.metadata
+    assert "heap_delta_bytes" not in phase.metadata
+    assert "heap_delta_bytes" not in op.metadata
+    assert len(t.counters["memory"]) == 1
+
+
+def test_callers_metadata_left_alone():
+    metadata = {"step": 1}
+    with MemoryTracer() as t:
+        with t.span("a", metadata=metadata):
+            pass
+        (event,) = t.events
+    assert metadata == {"step": 1}
+    assert "heap_delta_bytes" in event.metadata
+
+
+def test_memory_exported_as_counter_and_args():
+    with MemoryTracer(depths=None) as t:
+        with t.span("a"):
+            pass
+        buf = StringIO()
+        export_chrome(t, buf)
+    events = json.loads(buf.getvalue())["traceEvents"]
+    (span,) = [e for e in events if e["ph"] == "X"]
+    (counter,) = [e for e in events if e["ph"] == "C"]
+    assert "heap_peak_bytes" in span["args"]
+    assert counter["name"] == "memory"
+    assert set(counter["args"]) == {"heap_bytes"}
+
+
+def test_close_stops_tracemalloc_it_started():
+    was_tracing = tracemalloc.is_tracing()
+    t = MemoryTracer()
+    assert tracemalloc.is_tracing()
+    t.close()
+    assert tracemalloc.is_tracing() == was_tracing
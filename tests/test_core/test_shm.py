@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import multiprocessing as mp
+import pickle
+
+import pytest
+
+from argus.core.shm import SharedMemoryCollector
+from argus.core.tracer import Tracer
+
+
+@pytest.fixture
+def collector():
+    c = SharedMemoryCollector(num_rings=2, capacity=64)
+    yield c
+    c.close()
+
+
+def _worker(handle, n: int) -> None:
+    with handle.span("batch", category="system", scope="worker"):
+        for i in range(n):
+            with handle.span("fetch", category="compute", scope=f"worker.fetch.{i}", token_index=i):
+                pass
+    handle.close()
+
+
+def test_drain_empty(collector):
+    t = Tracer()
+    assert collector.drain(t) == 0
+    assert t.events == []
+
+
+def test_span_round_trip(collector):
+    handle = collector.handle(0)
+    with handle.span("fetch", category="compute", scope="worker.fetch", token_index=7):
+        pass
+    t = Tracer()
+    assert collector.drain(t) == 1
+    e = t.events[0]
+    assert e.event_id == "w0.0.0"
+    assert e.name == "fetch"
+    assert e.category == "compute"
+    assert e.scope == "worker.fetch"
+    assert e.token_index == 7
+    assert e.parent_id is None
+    assert e.end_ns >= e.start_ns
+    assert e.metadata == {"worker": 0}
+    handle.close()
+
+
+def test_nested_spans_keep_parent(collector):
+    handle = collector.handle(1)
+    with handle.span("outer"), handle.span("inner"):
+        pass
+    t = Tracer()
+    collector.drain(t)
+    inner, outer = t.events
+    assert inner.parent_id == outer.event_id == "w1.0.0"
+    assert inner.token_index is None
+    handle.close()
+
+
+def test_instant(collector):
+    handle = collector.handle(0)
+    with handle.span("outer"):
+        handle.instant("marker", category="system")
+    t = Tracer()
+    collector.drain(t)
+    marker = t.events[0]
+    assert marker.duration_ns == 0
+    assert marker.parent_id == "w0.0.0"
+    handle.close()
+
+
+def test_drain_is_incremental(collector):
+    handle = collector.handle(0)
+    with handle.span("a"):
+        pass
+    t = Tracer()
+    collector.drain(t)
+    with handle.span("b"):
+        pass
+    assert collector.drain(t) == 1
+    assert [e.name for e in t.events] == ["a", "b"]
+    handle.close()
+
+
+def test_full_ring_drops(collector):
+    handle = collector.handle(0)
+    for _ in range(70):
+        with handle.span("x"):
+            pass
+    assert collector.dropped() == 6
+    t = Tracer()
+    assert collector.drain(t) == 64
+    with handle.span("after"):
+        pass
+    assert collector.drain(t) == 1
+    handle.close()
+
+
+def test_ring_wraps_around(collector):
+    handle = collector.handle(0)
+    t = Tracer()
+    for i in range(200):
+        with handle.span(f"s{i}"):
+            pass
+        if i % 50 == 49:
+            collector.drain(t)
+    assert [e.name for e in t.events] == [f"s{i}" for i in range(200)]
+    assert collector.dropped() == 0
+    handle.close()
+
+
+def test_long_strings_truncated(collector):
+    handle = collector.handle(0)
+    with handle.span("n" * 100, scope="s" * 100):
+        pass
+    t = Tracer()
+    collector.drain(t)
+    assert t.events[0].name == "n" * 47
+    assert t.events[0].scope == "s" * 63
+    handle.close()
+
+
+def test_multibyte_truncation_keeps_ring_readable(collector):
+    handle = collector.handle(0)
+    with handle.span("é" * 30, scope="ü" * 40):
+        pass
+    with handle.span("after"):
+        pass
+    t = Tracer()
+    assert collector.drain(t) == 2
+    assert t.events[0].name == "é" * 23
+    assert t.events[0].scope == "ü" * 31
+    assert t.events[1].name == "after"
+    assert collector.drain(t) == 0
+    handle.close()
+
+
+def test_unknown_category_rejected(collector):
+    with pytest.raises(KeyError):
+        collector.handle(0).span("x", category="bogus")
+
+
+def test_handle_index_checked(collector):
+    with pytest.raises(IndexError):
+        collector.handle(2)
+
+
+def test_handle_is_picklable(collector):
+    handle = pickle.loads(pickle.dumps(collector.handle(1)))
+    assert handle.ring == 1
+    with handle.span("x"):
+        pass
+    t = Tracer()
+    assert collector.drain(t) == 1
+    handle.close()
+
+
+def test_unpickled_handles_never_reuse_ids(collector):
+    handle = collector.handle(0)
+    t = Tracer()
+    for _ in range(2):
+        # a fresh worker each epoch, as with non-persistent DataLoader workers
+        worker = pickle.loads(pickle.dumps(handle))
+        with worker.span("outer"), worker.span("inner"):
+            pass
+        worker.close()
+    collector.drain(t)
+    ids = [e.event_id for e in t.events]
+    assert ids == ["w0.0.1", "w0.0.0", "w0.1.1", "w0.1.0"]
+    assert [e.parent_id for e in t.events] == ["w0.0.0", None, "w0.1.0", None]
+
+
+@pytest.mark.parametrize("method", ["fork", "spawn"])
+def test_child_processes(collector, method):
+    if method not in mp.get_all_start_methods():
+        pytest.skip(f"{method} start method unavailable")
+    ctx = mp.get_context(method)
+    procs = [ctx.Process(target=_worker, args=(collector.handle(i), 10)) for i in range(2)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(timeout=60)
+        assert p.exitcode == 0
+    t = Tracer()
+    assert collector.drain(t) == 22
+    workers = {e.metadata["worker"] for e in t.events}
+    assert workers == {0, 1}
+    batches = {e.event_id: e for e in t.events if e.name == "batch"}
+    for e in t.events:
+        if e.name == "fetch":
+            assert e.parent_id in batches
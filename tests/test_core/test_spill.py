@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import io
+import json
+
+import pytest
+
+from argus import export_chrome
+from argus.core.spill import SpillingTracer, decode_segment, encode_segment
+from argus.core.tracer import Tracer
+
+
+def _record(tracer: Tracer, n: int) -> None:
+    for i in range(n):
+        with (
+            tracer.span("outer", category="phase", scope="loop"),
+            tracer.span("inner", metadata={"i": i}, token_index=i),
+        ):
+            pass
+
+
+def test_segment_round_trip(make_event):
+    events = [
+        make_event(),
+        make_event(event_id="1", parent_id="0", token_index=3, metadata={"a": 1.5, "b": None}),
+        make_event(event_id="2", start_ns=-5, end_ns=2**40, category="memory"),
+        make_event(event_id="3", scope="decode.token.{}", scope_arg=9),
+    ]
+    assert decode_segment(encode_segment(events)) == events
+
+
+def test_segment_stringifies_unsupported_metadata(make_event):
+    event = make_event(metadata={"obj": object(), "n": 1})
+    (decoded,) = decode_segment(encode_segment([event]))
+    assert decoded.metadata["n"] == 1
+    assert decoded.metadata["obj"].startswith("<object")
+
+
+def test_decode_rejects_foreign_data():
+    with pytest.raises(ValueError, match="spill segment"):
+        decode_segment(b"not a segment")
+
+
+def test_spills_and_bounds_buffer(tmp_path):
+    with SpillingTracer(max_buffered_events=16, spill_dir=tmp_path) as t:
+        _record(t, 100)
+        assert len(t._events) < 16
+        t.flush()
+        assert t.spilled_events == 192
+        assert len(list(tmp_path.glob("segment-*.bin"))) == 12
+        events = t.events
+    assert len(events) == 200
+    assert [e.event_id for e in events[:2]] == ["1", "0"]
+    assert events[0].parent_id == "0"
+    assert events[-2].metadata == {"i": 99}
+
+
+def test_iteration_matches_plain_tracer():
+    plain = Tracer()
+    _record(plain, 50)
+    with SpillingTracer(max_buffered_events=7) as t:
+        _record(t, 50)
+        spilled = list(t.iter_events())
+        tokens = t.get_events(token_index=10)
+        phases = t.get_events(category="phase")
+    assert [(e.event_id, e.name, e.parent_id) for e in spilled] == [
+        (e.event_id, e.name, e.parent_id) for e in plain.events
+    ]
+    assert [e.name for e in tokens] == ["inner"]
+    assert len(phases) == 50
+
+
+def test_export_chrome_streams_spilled_events():
+    with SpillingTracer(max_buffered_events=10) as t:
+        _record(t, 20)
+        buf = io.StringIO()
+        export_chrome(t, buf)
+    trace = json.loads(buf.getvalue())
+    assert len(trace["traceEvents"]) == 40
+
+
+def test_reset_removes_segments(tmp_path):
+    t = SpillingTracer(max_buffered_events=4, spill_dir=tmp_path)
+    _record(t, 10)
+    t.flush()
+    assert list(tmp_path.iterdir())
+    t.reset()
+    assert t.events == []
+    assert t.spilled_events == 0
+    assert not list(tmp_path.iterdir())
+    _record(t, 1)
+    assert [e.event_id for e in t.events] == ["1", "0"]
+    t.close()
+    assert tmp_path.exists()
+
+
+def test_close_removes_owned_dir():
+    t = SpillingTracer(max_buffered_events=2)
+    _record(t, 3)
+    spill_dir = t.spill_dir
+    assert spill_dir.exists()
+    t.close()
+    assert not spill_dir.exists()
+    t.close()
+
+
+def test_listeners_see_every_event():
+    seen = []
+    with SpillingTracer(max_buffered_events=3) as t:
+        t.add_listener(seen.append)
+        _record(t, 5)
+    assert len(seen) == 10
+
+
+def test_write_failure_keeps_events(tmp_path):
+    t = SpillingTracer(max_buffered_events=2, spill_dir=tmp_path / "gone")
+    (tmp_path / "gone").rmdir()
+    with pytest.warns(UserWarning, match="keeping in memory"):
+        _record(t, 2)
+        t.flush()
+    assert len(t.events) == 4
+    assert t.spilled_events == 0
+    t.close()
+
+
+def test_rejects_empty_budget():
+    with pytest.raises(ValueError):
+        SpillingTracer(max_buffered_events=0)
+
+
+def test_swap_events_includes_spilled(tmp_path):
+    with SpillingTracer(max_buffered_events=3, spill_dir=tmp_path) as t:
+        _record(t, 4)
+        swapped = t.swap_events()
+        assert len(swapped) == 8
+        assert t.events == []
+        t.flush()
+        assert not list(tmp_path.iterdir())
+        _record(t, 2)
+        assert len(t.events) == 4
+
+
+def test_swap_leaves_seal_of_swapped_buffer_alone(tmp_path):
+    with SpillingTracer(max_buffered_events=2, spill_dir=tmp_path) as t:
+        with t.span("outer", category="phase"):
+            _record(t, 3)
+            swapped = t.swap_events()
+            # an append racing the swap lands in the old buffer without sealing it again
+            swapped.append(swapped[0])
+            swapped.append(swapped[0])
+        assert len(swapped) == 8
+        assert [e.name for e in t.events] == ["outer"]
+        _record(t, 3)
+        t.flush()
+        assert len(t.events) == 7
+        assert t.spilled_events == 6
+        assert len(list(tmp_path.iterdir())) == 3
+
+
+def test_record_events_spills_across_budget(tmp_path):
+    with SpillingTracer(max_buffered_events=16, spill_dir=tmp_path) as t:
+        t.record_events(["op"] * 40, range(40), range(1, 41))
+        assert len(t._events) == 8
+        t.flush()
+        assert t.spilled_events == 32
+        assert [e.event_id for e in t.events] == [str(i) for i in range(40)]
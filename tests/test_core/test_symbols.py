@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from argus.core.events import TraceEvent
+from argus.core.symbols import SymbolTable
+from argus.core.tracer import Tracer
+
+
+def test_intern_returns_canonical_object():
+    table = SymbolTable()
+    a = "".join(["decode.", "token"])
+    b = "".join(["decode", ".token"])
+    assert a is not b
+    assert table.intern(a) is table.intern(b)
+    assert len(table) == 1
+    assert a in table
+
+
+def test_tracer_templated_scopes_share_one_string():
+    t = Tracer()
+    for i in range(3):
+        with t.span("forward_pass", scope="decode.token.{}", scope_arg=i):
+            pass
+    first, second, _ = t.events
+    assert first.scope is second.scope
+    assert [e.full_scope for e in t.events] == [f"decode.token.{i}" for i in range(3)]
+
+
+def test_record_events_interns_names():
+    t = Tracer()
+    t.record_events(["".join(["forward", "_pass"])], [0], [1])
+    assert "forward_pass" in t.symbols
+
+
+def test_instant_scope_template():
+    t = Tracer()
+    event = t.instant("kv_cache_grow", category="memory", scope="decode.token.{}", scope_arg=7)
+    assert event.scope == "decode.token.{}"
+    assert event.full_scope == "decode.token.7"
+
+
+def test_full_scope_without_arg():
+    event = TraceEvent("0", "op", 0, 1, "compute", "literal.{braces}")
+    assert event.full_scope == "literal.{braces}"
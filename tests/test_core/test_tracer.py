@@ -1,5 +1,9 @@
 from __future__ import annotations
 
+from array import array
+
+import pytest
+
 from argus.core.tracer import Tracer
 
 
@@ -112,6 +116,14 @@ def test_reset_resets_id_counter():
     assert t.events[0].event_id == "0"
 
 
+def test_reset_advances_generation():
+    t = Tracer()
+    assert t.generation == 0
+    t.reset()
+    t.reset()
+    assert t.generation == 2
+
+
 def test_get_events_by_category():
     t = Tracer()
     with t.span("a", category="compute"):
@@ -302,3 +314,106 @@ def test_instant_inside_span_gets_parent():
     with t.span("outer") as ctx:
         event = t.instant("point")
     assert event.parent_id == ctx.event_id
+
+
+def test_record_span_parented_under_open_span():
+    t = Tracer()
+    seen = []
+    t.add_listener(seen.append)
+    assert t.current_span_id is None
+    with t.span("outer") as ctx:
+        assert t.current_span_id == ctx.event_id
+        event = t.record_span("wait", 100, 250, category="system", metadata={"batch": 3})
+    assert (event.start_ns, event.end_ns, event.category) == (100, 250, "system")
+    assert event.parent_id == ctx.event_id
+    assert event.metadata == {"batch": 3}
+    assert seen[0] is event
+    assert t.span("next").event_id != event.event_id
+
+
+def test_listener_sees_spans_instants_and_records():
+    from argus.core.events import TraceEvent
+
+    t = Tracer()
+    seen = []
+    t.add_listener(seen.append)
+    with t.span("op"):
+        t.instant("point")
+    t.record_event(
+        TraceEvent(event_id="x", name="manual", start_ns=0, end_ns=1, category="compute", scope="")
+    )
+    assert [e.name for e in seen] == ["point", "op", "manual"]
+
+
+def test_remove_listener():
+    t = Tracer()
+    seen = []
+    t.add_listener(seen.append)
+    t.remove_listener(seen.append)
+    with t.span("op"):
+        pass
+    assert seen == []
+
+
+def test_listeners_survive_reset():
+    t = Tracer()
+    seen = []
+    t.add_listener(seen.append)
+    t.reset()
+    with t.span("op"):
+        pass
+    assert len(seen) == 1
+
+
+def test_record_events_allocates_id_block():
+    t = Tracer()
+    with t.span("before"):
+        pass
+    events = t.record_events(["a", "b", "c"], [0, 10, 20], [5, 15, 25], "kernel", "gpu")
+    assert [e.event_id for e in events] == ["1", "2", "3"]
+    assert t.events[1:] == events
+    assert all(e.category == "kernel" and e.scope == "gpu" and e.metadata == {} for e in events)
+    assert events[0].metadata is not events[1].metadata
+    with t.span("after"):
+        pass
+    assert t.events[-1].event_id == "4"
+
+
+def test_record_events_parents_by_index_or_id():
+    t = Tracer()
+    with t.span("outer"):
+        pass
+    events = t.record_events(
+        ["x", "y", "z"],
+        array("q", [0, 1, 2]),
+        array("q", [9, 2, 3]),
+        parents=[-1, 0, "0"],
+        token_indices=[None, 1, 2],
+    )
+    assert [e.parent_id for e in events] == [None, "1", "0"]
+    assert [e.token_index for e in events] == [None, 1, 2]
+    assert type(events[0].start_ns) is int
+
+
+def test_record_events_interns_and_notifies_listeners():
+    t = Tracer()
+    seen = []
+    t.add_listener(seen.append)
+    events = t.record_events(["".join(["o", "p"]), "".join(["o", "p"])], [0, 1], [1, 2])
+    assert events[0].name is events[1].name
+    assert seen == events
+
+
+def test_record_events_explicit_ids_advance_next_id():
+    t = Tracer()
+    t.record_events(["a", "b", "c"], [0, 1, 2], [1, 2, 3], event_ids=["7", "x", "3"])
+    with t.span("next") as span:
+        pass
+    assert span.event_id == "8"
+    t.record_events(["d"], [0], [1], event_ids=["2"])
+    assert t.instant("later").event_id == "9"
+
+
+def test_record_events_rejects_ragged_columns():
+    with pytest.raises(ValueError, match="ends_ns has 1 values"):
+        Tracer().record_events(["a", "b"], [0, 1], [1])
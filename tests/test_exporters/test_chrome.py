@@ -3,7 +3,10 @@ from __future__ import annotations
 import json
 from io import StringIO
 
+from argus import export_chrome
+from argus.core.counters import CounterTrack
 from argus.core.events import TraceEvent
+from argus.core.tracer import Tracer
 from argus.exporters.chrome import events_to_chrome, export_chrome_trace
 
 
@@ -217,3 +220,77 @@ def test_unknown_category_warns():
         events_to_chrome([e])
     assert len(caught) == 1
     assert "bogus" in str(caught[0].message)
+
+
+def test_pid_default_and_override():
+    assert events_to_chrome([_make_event()])[0]["pid"] == 1
+    assert events_to_chrome([_make_event()], pid=4)[0]["pid"] == 4
+
+
+def test_export_matches_json_dump_of_payload():
+    events = [
+        _make_event(metadata={"x": 1, "s": 'a"b'}),
+        _make_event(event_id="1", parent_id="0", token_index=2),
+    ]
+    buf = StringIO()
+    export_chrome_trace(iter(events), buf)
+    expected = {
+        "traceEvents": events_to_chrome(events),
+        "displayTimeUnit": "ns",
+        "metadata": {"argus_version": "0.1.0", "clock_source": "monotonic_ns"},
+    }
+    assert buf.getvalue() == json.dumps(expected)
+
+
+def test_export_empty_iterable():
+    buf = StringIO()
+    export_chrome_trace([], buf)
+    assert json.loads(buf.getvalue())["traceEvents"] == []
+
+
+def test_scope_template_formatted_on_export():
+    event = _make_event(scope="decode.token.{}.forward", scope_arg=12)
+    (chrome,) = events_to_chrome([event])
+    assert chrome["args"]["scope"] == "decode.token.12.forward"
+
+
+def test_counter_tracks_exported_as_counter_events():
+    t = Tracer()
+    with t.span("op"):
+        pass
+    for size in (1024, 2048, 4096):
+        t.counter("kv_cache", cache_size_bytes=size)
+    buf = StringIO()
+    export_chrome(t, buf)
+    events = json.loads(buf.getvalue())["traceEvents"]
+    counters = [e for e in events if e["ph"] == "C"]
+    assert [e["args"] for e in counters] == [{"cache_size_bytes": s} for s in (1024, 2048, 4096)]
+    assert all(e["name"] == "kv_cache" and e["cat"] == "memory" for e in counters)
+
+    buf = StringIO()
+    export_chrome(t, buf, max_counter_samples=2)
+    events = json.loads(buf.getvalue())["traceEvents"]
+    assert [e["args"]["cache_size_bytes"] for e in events if e["ph"] == "C"] == [2048, 4096]
+
+
+def test_counter_samples_interleaved_by_timestamp():
+    events = [_make_event(event_id=str(i), start_ns=i * 100, end_ns=i * 100 + 50) for i in range(5)]
+    kv = CounterTrack("kv_cache")
+    queue = CounterTrack("queue")
+    for ts in (0, 120, 260, 900):
+        kv.append(ts, {"bytes": ts})
+    for ts in (60, 340):
+        queue.append(ts, {"value": ts})
+    buf = StringIO()
+    export_chrome_trace(events, buf, counters=[kv, queue])
+    out = json.loads(buf.getvalue())["traceEvents"]
+    ends = [e["ts"] + e.get("dur", 0) for e in out]
+    assert ends == sorted(ends)
+    assert [e["name"] for e in out if e["ph"] == "C"] == [
+        "kv_cache",
+        "queue",
+        "kv_cache",
+        "kv_cache",
+        "queue",
+        "kv_cache",
+    ]
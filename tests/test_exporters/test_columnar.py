@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import io
+import math
+import zipfile
+
+import pytest
+
+from argus.core.events import TraceEvent
+from argus.core.tracer import Tracer
+from argus.exporters.columnar import (
+    events_to_table,
+    export_arrow,
+    export_npz,
+    load_npz_dataframe,
+    read_npz,
+)
+
+
+def _events() -> list[TraceEvent]:
+    return [
+        TraceEvent(
+            "1",
+            "forward_pass",
+            10,
+            40,
+            "compute",
+            "decode.token.0.forward",
+            "0",
+            metadata={"flops": 1.5e9, "layer": "attn"},
+        ),
+        TraceEvent(
+            "2",
+            "kv_cache_grow",
+            45,
+            45,
+            "memory",
+            "decode.token.0",
+            "0",
+            1,
+            metadata={"cache_size_bytes": 4096, "nested": {"a": 1}},
+        ),
+        TraceEvent(
+            "0",
+            "token_generate",
+            0,
+            50,
+            "token",
+            "decode.token.0",
+            token_index=0,
+            metadata={"cache_size_bytes": 0, "ok": True},
+        ),
+    ]
+
+
+def test_table_columns():
+    t = events_to_table(_events())
+    assert len(t) == 3
+    assert list(t.duration_ns) == [30, 0, 50]
+    assert [t.name_dict[c] for c in t.name] == ["forward_pass", "kv_cache_grow", "token_generate"]
+    assert t.category_dict == ["compute", "memory", "token"]
+    assert list(t.parent_index) == [2, 2, -1]
+    assert list(t.token_index) == [-1, 1, 0]
+    assert t.metadata["flops"].kind == "float"
+    assert t.metadata["layer"].kind == "str"
+    assert t.metadata["cache_size_bytes"].kind == "float"  # absent on one row
+    assert t.metadata["ok"].kind == "float"
+    assert "nested" not in t.metadata
+
+
+def test_npz_round_trip_with_stdlib_reader():
+    buf = io.BytesIO()
+    export_npz(_events(), buf)
+    data = read_npz(io.BytesIO(buf.getvalue()))
+    assert list(data["start_ns"]) == [10, 45, 0]
+    assert data["scope.dict"] == ["decode.token.0.forward", "decode.token.0"]
+    assert list(data["scope"]) == [0, 1, 1]
+    assert list(data["meta.layer"]) == [0, -1, -1]
+    assert data["meta.layer.dict"] == ["attn"]
+    flops = data["meta.flops"]
+    assert flops[0] == 1.5e9 and math.isnan(flops[1])
+    assert list(data["meta.cache_size_bytes"])[1:] == [4096.0, 0.0]
+
+
+def test_npy_members_are_aligned_and_compressible():
+    buf = io.BytesIO()
+    export_npz(_events() * 100, buf, compress=True)
+    with zipfile.ZipFile(io.BytesIO(buf.getvalue())) as zf:
+        info = zf.getinfo("start_ns.npy")
+        assert info.compress_type == zipfile.ZIP_DEFLATED
+        raw = zf.read("start_ns.npy")
+    header_len = int.from_bytes(raw[8:10], "little")
+    assert (10 + header_len) % 64 == 0
+    assert len(raw) - 10 - header_len == 300 * 8
+
+
+def test_int_metadata_column():
+    events = [TraceEvent(str(i), "op", 0, 1, "compute", "s", metadata={"n": i}) for i in range(4)]
+    buf = io.BytesIO()
+    export_npz(events, buf)
+    assert list(read_npz(buf)["meta.n"]) == [0, 1, 2, 3]
+
+
+def test_empty_trace(tmp_path):
+    path = tmp_path / "empty.npz"
+    export_npz([], path)
+    data = read_npz(path)
+    assert len(data["start_ns"]) == 0
+    assert data["name.dict"] == []
+
+
+def test_npz_counter_tracks(tmp_path):
+    t = Tracer()
+    for i in range(3):
+        t.counter("kv_cache", cache_size_bytes=1024 * i, num_layers=2)
+    t.counter("util", 0.5)
+    path = tmp_path / "t.npz"
+    export_npz(_events(), path, counters=t.counters.values())
+    data = read_npz(path)
+    assert list(data["counter.kv_cache.ts_ns"]) == list(t.counters["kv_cache"].timestamps)
+    assert list(data["counter.kv_cache.cache_size_bytes"]) == [0, 1024, 2048]
+    assert list(data["counter.util.value"]) == [0.5]
+    assert len(data["start_ns"]) == 3
+
+
+def test_numpy_reads_npz(tmp_path):
+    np = pytest.importorskip("numpy")
+    path = tmp_path / "t.npz"
+    export_npz(_events(), path)
+    with np.load(path) as npz:
+        assert npz["end_ns"].dtype == np.int64
+        assert list(npz["name.dict"]) == ["forward_pass", "kv_cache_grow", "token_generate"]
+
+
+def test_dataframe_has_categoricals(tmp_path):
+    pytest.importorskip("pandas")
+    t = Tracer()
+    t.counter("util", 0.5)
+    path = tmp_path / "t.npz"
+    # counter tracks have their own length and are left out of the frame
+    export_npz(_events(), path, counters=t.counters.values())
+    df = load_npz_dataframe(path)
+    assert list(df["name"]) == ["forward_pass", "kv_cache_grow", "token_generate"]
+    assert str(df["category"].dtype) == "category"
+
+
+def test_arrow_ipc(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    path = tmp_path / "t.arrow"
+    export_arrow(_events(), path)
+    table = pa.ipc.open_file(str(path)).read_all()
+    assert table.column("name").to_pylist() == ["forward_pass", "kv_cache_grow", "token_generate"]
+    assert table.column("parent_index").to_pylist() == [2, 2, None]
+    assert table.column("meta.layer").to_pylist() == ["attn", None, None]
+
+
+def test_scope_template_column():
+    events = [
+        TraceEvent(str(i), "fwd", 0, 1, "compute", "decode.token.{}", scope_arg=i) for i in range(3)
+    ]
+    buf = io.BytesIO()
+    export_npz(events, buf)
+    data = read_npz(buf)
+    assert data["scope.dict"] == ["decode.token.{}"]
+    assert list(data["scope_arg"]) == [0, 1, 2]
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import json
+from io import StringIO
+
+import pytest
+
+from argus.cli import main
+from argus.core.counters import CounterTrack
+from argus.core.events import TraceEvent
+from argus.core.tracer import Tracer
+from argus.exporters.chrome import export_chrome_trace
+from argus.exporters.merge import (
+    HANDSHAKE_NAME,
+    merge_chrome_traces,
+    record_clock_handshake,
+)
+
+
+def _handshake(mono_ns: int, wall_ns: int, **meta) -> TraceEvent:
+    return TraceEvent(
+        event_id="hs",
+        name=HANDSHAKE_NAME,
+        start_ns=mono_ns,
+        end_ns=mono_ns,
+        category="system",
+        scope="clock",
+        metadata={"wall_ns": wall_ns, **meta},
+    )
+
+
+def _span(event_id: str, start_ns: int, end_ns: int, name: str = "op") -> TraceEvent:
+    return TraceEvent(
+        event_id=event_id,
+        name=name,
+        start_ns=start_ns,
+        end_ns=end_ns,
+        category="compute",
+        scope="test",
+    )
+
+
+def _merged(tmp_path, traces: list[list[TraceEvent]], **kwargs) -> dict:
+    paths = []
+    for i, events in enumerate(traces):
+        path = tmp_path / f"rank{i}.json"
+        export_chrome_trace(events, path)
+        paths.append(path)
+    out = StringIO()
+    merge_chrome_traces(paths, out, **kwargs)
+    return json.loads(out.getvalue())
+
+
+def _spans(data: dict) -> list[dict]:
+    return [e for e in data["traceEvents"] if e["ph"] == "X" and e["name"] != HANDSHAKE_NAME]
+
+
+def test_record_clock_handshake():
+    t = Tracer()
+    event = record_clock_handshake(t, process_name="worker", rank=3)
+    assert event.name == HANDSHAKE_NAME
+    assert event.category == "system"
+    assert event.metadata["rank"] == 3
+    assert event.metadata["process_name"] == "worker"
+    assert event.metadata["wall_ns"] > 0
+    assert t.events == [event]
+
+
+def test_record_clock_handshake_calls_barrier():
+    calls = []
+    record_clock_handshake(Tracer(), barrier=lambda: calls.append(1))
+    assert calls == [1]
+
+
+def test_merge_assigns_distinct_pids_and_names(tmp_path):
+    data = _merged(
+        tmp_path,
+        [[_span("0", 1_000, 2_000)], [_span("0", 1_000, 2_000)]],
+        align="none",
+        process_names=["tp0", "tp1"],
+    )
+    names = {
+        e["pid"]: e["args"]["name"] for e in data["traceEvents"] if e["name"] == "process_name"
+    }
+    assert names == {1: "tp0", 2: "tp1"}
+    assert sorted(e["pid"] for e in _spans(data)) == [1, 2]
+
+
+def test_merge_uses_rank_from_handshake(tmp_path):
+    data = _merged(
+        tmp_path,
+        [
+            [_handshake(0, 10_000, rank=1), _span("1", 10, 20)],
+            [_handshake(0, 10_000, rank=0), _span("1", 10, 20)],
+        ],
+    )
+    names = {
+        e["pid"]: e["args"]["name"] for e in data["traceEvents"] if e["name"] == "process_name"
+    }
+    assert names == {2: "rank 1", 1: "rank 0"}
+
+
+def test_merge_wall_alignment(tmp_path):
+    # process 1's monotonic clock reads 500 us behind process 0 at the same wall time
+    data = _merged(
+        tmp_path,
+        [
+            [_handshake(1_000_000, 5_000_000_000), _span("1", 2_000_000, 3_000_000, "a")],
+            [_handshake(500_000, 5_000_000_000), _span("1", 1_500_000, 2_500_000, "b")],
+        ],
+    )
+    by_name = {e["name"]: e for e in _spans(data)}
+    assert by_name["a"]["ts"] == by_name["b"]["ts"] == 2_000.0
+    offsets = [p["offset_ns"] for p in data["metadata"]["merged_processes"]]
+    assert offsets == [0, 500_000]
+
+
+def test_merge_barrier_alignment(tmp_path):
+    data = _merged(
+        tmp_path,
+        [
+            [_handshake(1_000_000, 1), _span("1", 2_000_000, 3_000_000, "a")],
+            [_handshake(9_000_000, 999), _span("1", 10_000_000, 11_000_000, "b")],
+        ],
+        align="barrier",
+    )
+    by_name = {e["name"]: e for e in _spans(data)}
+    assert by_name["a"]["ts"] == by_name["b"]["ts"]
+
+
+def test_merge_missing_handshake_warns(tmp_path):
+    with pytest.warns(UserWarning, match=HANDSHAKE_NAME):
+        _merged(tmp_path, [[_span("0", 0, 10)]])
+
+
+def test_merge_reads_each_source_once(tmp_path, monkeypatch):
+    from argus.exporters import merge
+
+    opened = []
+    iter_events = merge.iter_chrome_events
+
+    def counting(source, *args):
+        opened.append(source)
+        return iter_events(source, *args)
+
+    monkeypatch.setattr(merge, "iter_chrome_events", counting)
+    early = [_span(str(i), i * 10, i * 10 + 5) for i in range(3)]
+    data = _merged(tmp_path, [[*early, _handshake(0, 1_000)], [_span("0", 0, 10)]], align="none")
+    assert len(opened) == 2
+    assert len(_spans(data)) == 4
+
+
+def test_merge_is_time_ordered(tmp_path):
+    a = [_span(str(i), i * 100, i * 100 + 50) for i in range(50)]
+    b = [_span(str(i), i * 100 + 30, i * 100 + 80) for i in range(50)]
+    data = _merged(tmp_path, [a, b], align="none", reorder_window=4)
+    ends = [e["ts"] + e["dur"] for e in _spans(data)]
+    assert ends == sorted(ends)
+    assert len(ends) == 100
+
+
+def test_merge_with_counter_tracks_is_time_ordered(tmp_path):
+    paths = []
+    for rank in range(2):
+        spans = [_span(str(i), i * 100 + rank, i * 100 + rank + 50) for i in range(2_000)]
+        track = CounterTrack("kv_cache")
+        for i in range(2_000):
+            track.append(i * 100 + 25, {"bytes": i})
+        path = tmp_path / f"rank{rank}.json"
+        export_chrome_trace(spans, path, counters=[track])
+        paths.append(path)
+    out = StringIO()
+    merge_chrome_traces(paths, out, align="none", reorder_window=64)
+    events = [e for e in json.loads(out.getvalue())["traceEvents"] if e["ph"] != "M"]
+    assert sum(e["ph"] == "C" for e in events) == 4_000
+    ends = [e["ts"] + e.get("dur", 0) for e in events]
+    assert ends == sorted(ends)
+
+
+def test_merge_preserves_args(tmp_path):
+    events = [_span("7", 0, 10), _span("8", 0, 20)]
+    data = _merged(tmp_path, [events], align="none")
+    assert [e["args"]["event_id"] for e in _spans(data)] == ["7", "8"]
+
+
+def test_merge_rejects_unknown_align(tmp_path):
+    with pytest.raises(ValueError, match="align"):
+        merge_chrome_traces([], StringIO(), align="ntp")
+
+
+def test_cli_merge(tmp_path, capsys):
+    for i in range(2):
+        export_chrome_trace([_handshake(i, 1_000), _span("1", 10, 20)], tmp_path / f"r{i}.json")
+    out = tmp_path / "merged.json"
+    rc = main(["merge", "-o", str(out), str(tmp_path / "r0.json"), str(tmp_path / "r1.json")])
+    assert rc == 0
+    data = json.loads(out.read_text())
+    assert len(_spans(data)) == 2
+    assert "r1" in capsys.readouterr().out
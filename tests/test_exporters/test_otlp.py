@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from argus.core.tracer import Tracer
+from argus.exporters.otlp import OTLPExporter, events_to_otlp
+
+
+class _Collector:
+    """Local stand-in for an OTLP/HTTP collector that records each request."""
+
+    def __init__(self, status: int = 200) -> None:
+        self.requests: list[dict] = []
+        self.peers: list[tuple[str, int]] = []
+        self.status = status
+        self.gate = threading.Event()
+        self.gate.set()
+        collector = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):  # noqa: N802
+                collector.gate.wait(10)
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                collector.requests.append(json.loads(body))
+                collector.peers.append(self.client_address)
+                self.send_response(collector.status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    @property
+    def endpoint(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}/v1/traces"
+
+    def spans(self) -> list[dict]:
+        return [
+            span
+            for req in self.requests
+            for rs in req["resourceSpans"]
+            for ss in rs["scopeSpans"]
+            for span in ss["spans"]
+        ]
+
+    def close(self) -> None:
+        self.gate.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def collector():
+    c = _Collector()
+    yield c
+    c.close()
+
+
+def _attrs(span: dict) -> dict:
+    return {a["key"]: next(iter(a["value"].values())) for a in span["attributes"]}
+
+
+def test_events_to_otlp_mapping(make_event):
+    child = make_event(event_id="1", parent_id="0", token_index=4, metadata={"k": 1.5})
+    parent = make_event(event_id="0", category="token")
+    payload = events_to_otlp([child, parent], "ab" * 16, epoch_offset_ns=10)
+    spans = payload["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert spans[0]["parentSpanId"] == spans[1]["spanId"]
+    assert "parentSpanId" not in spans[1]
+    assert spans[0]["startTimeUnixNano"] == "1010"
+    assert spans[0]["endTimeUnixNano"] == "2010"
+    attrs = _attrs(spans[0])
+    assert attrs["argus.category"] == "compute"
+    assert attrs["argus.scope"] == "test"
+    assert attrs["argus.token_index"] == "4"
+    assert attrs["k"] == 1.5
+    assert len(spans[0]["spanId"]) == 16
+
+
+def test_events_to_otlp_skips_counters_and_nested_metadata(make_event):
+    counter = make_event(category="memory", start_ns=5, end_ns=5)
+    span = make_event(metadata={"nested": {"a": 1}, "flag": True})
+    spans = events_to_otlp([counter, span], "00" * 16, 0)["resourceSpans"][0]["scopeSpans"][0][
+        "spans"
+    ]
+    assert len(spans) == 1
+    attrs = _attrs(spans[0])
+    assert "nested" not in attrs
+    assert attrs["flag"] is True
+
+
+def test_exporter_sends_tracer_spans(collector):
+    t = Tracer()
+    with OTLPExporter(collector.endpoint, max_delay_s=0.05).attach(t) as exporter:
+        with t.span("outer", category="phase"), t.span("inner"):
+            t.counter("kv_cache", cache_size_bytes=1024)
+        assert exporter.flush(5)
+    spans = collector.spans()
+    # counter tracks are not sent
+    assert [s["name"] for s in spans] == ["inner", "outer"]
+    assert spans[0]["parentSpanId"] == spans[1]["spanId"]
+    assert {s["traceId"] for s in spans} == {exporter.trace_id}
+
+
+def test_exporter_keeps_spans_distinct_across_reset(collector):
+    t = Tracer()
+    exporter = OTLPExporter(collector.endpoint, max_delay_s=0.05).attach(t)
+    with t.span("before"):
+        pass
+    t.reset()
+    with t.span("after"):
+        pass
+    exporter.detach(t)
+    with t.span("detached"):
+        pass
+    exporter.shutdown(5)
+    before, after = collector.spans()
+    assert _attrs(before)["argus.event_id"] == _attrs(after)["argus.event_id"]
+    assert before["spanId"] != after["spanId"]
+
+
+def test_exporter_batches_by_size(collector, make_event):
+    with OTLPExporter(collector.endpoint, max_batch_size=10, max_delay_s=30) as exporter:
+        for i in range(25):
+            exporter(make_event(event_id=str(i)))
+        assert exporter.flush(5)
+    sizes = [len(r["resourceSpans"][0]["scopeSpans"][0]["spans"]) for r in collector.requests]
+    assert sum(sizes) == 25
+    assert max(sizes) <= 10
+
+
+def test_exporter_sends_on_delay(collector, make_event):
+    with OTLPExporter(collector.endpoint, max_batch_size=1000, max_delay_s=0.05) as exporter:
+        exporter(make_event())
+        for _ in range(100):
+            if collector.requests:
+                break
+            threading.Event().wait(0.05)
+        assert len(collector.spans()) == 1
+        assert exporter.flush(5)
+
+
+def test_exporter_reuses_connection(collector, make_event):
+    with OTLPExporter(collector.endpoint, max_batch_size=1, max_delay_s=0.01) as exporter:
+        for i in range(5):
+            exporter(make_event(event_id=str(i)))
+            assert exporter.flush(5)
+    assert len(collector.peers) == 5
+    assert len(set(collector.peers)) == 1
+
+
+def test_exporter_drops_when_queue_full(collector, make_event):
+    collector.gate.clear()
+    exporter = OTLPExporter(
+        collector.endpoint, max_batch_size=2, max_queue_size=4, max_delay_s=0.01
+    )
+    for i in range(50):
+        exporter(make_event(event_id=str(i)))
+    assert exporter.dropped > 0
+    collector.gate.set()
+    exporter.shutdown(5)
+    assert len(collector.spans()) + exporter.dropped == 50
+
+
+def test_exporter_blocks_when_configured(collector, make_event):
+    exporter = OTLPExporter(
+        collector.endpoint, max_batch_size=2, max_queue_size=4, max_delay_s=0.01, block=True
+    )
+    for i in range(50):
+        exporter(make_event(event_id=str(i)))
+    exporter.shutdown(5)
+    assert exporter.dropped == 0
+    assert len(collector.spans()) == 50
+
+
+def test_exporter_counts_rejected_batches(make_event):
+    collector = _Collector(status=400)
+    try:
+        with OTLPExporter(collector.endpoint, max_delay_s=0.01) as exporter:
+            exporter(make_event())
+            assert exporter.flush(5)
+            assert exporter.failed == 1
+    finally:
+        collector.close()
+
+
+def test_exporter_survives_unreachable_collector(make_event):
+    exporter = OTLPExporter("http://127.0.0.1:9/v1/traces", max_delay_s=0.01, max_retries=0)
+    exporter(make_event())
+    assert exporter.flush(10)
+    assert exporter.failed == 1
+    exporter.shutdown(5)
+
+
+def test_rejects_bad_scheme():
+    with pytest.raises(ValueError, match="scheme"):
+        OTLPExporter("grpc://localhost:4317")
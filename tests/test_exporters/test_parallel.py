@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from io import StringIO
+
+import pytest
+
+from argus.core.counters import CounterTrack
+from argus.core.events import TraceEvent
+from argus.exporters.chrome import export_chrome_trace
+from argus.exporters.parallel import export_chrome_trace_parallel
+from argus.importers.chrome import load_chrome_columns
+
+
+def _events(n: int) -> list[TraceEvent]:
+    return [
+        TraceEvent(
+            event_id=str(i),
+            name=f"op{i % 7}",
+            start_ns=i * 1_000,
+            end_ns=i * 1_000 + (0 if i % 5 == 0 else 500),
+            category="memory" if i % 5 == 0 else "compute",
+            scope="layer.0",
+            parent_id=str(i - 1) if i % 3 else None,
+            token_index=i if i % 2 else None,
+            metadata={"i": i, "nested": {"x": 1}} if i % 4 == 0 else {},
+        )
+        for i in range(n)
+    ]
+
+
+def _serial(events) -> str:
+    buf = StringIO()
+    export_chrome_trace(events, buf)
+    return buf.getvalue()
+
+
+def test_byte_identical_to_serial():
+    events = _events(1_003)
+    buf = StringIO()
+    export_chrome_trace_parallel(events, buf, max_workers=2, shard_size=100)
+    assert buf.getvalue() == _serial(events)
+
+
+def test_accepts_iterators_and_pid():
+    events = _events(250)
+    buf = StringIO()
+    export_chrome_trace_parallel(iter(events), buf, pid=3, max_workers=2, shard_size=64)
+    expected = StringIO()
+    export_chrome_trace(events, expected, pid=3)
+    assert buf.getvalue() == expected.getvalue()
+
+
+@pytest.mark.parametrize("n", [250, 20])
+def test_counters_match_serial(n):
+    track = CounterTrack("kv_cache")
+    for i in range(10):
+        track.append(i * 1_000, {"cache_size_bytes": 1024 * i})
+    events = _events(n)
+    buf = StringIO()
+    export_chrome_trace_parallel(
+        events, buf, max_workers=2, shard_size=64, counters=[track], max_counter_samples=4
+    )
+    expected = StringIO()
+    export_chrome_trace(events, expected, counters=[track], max_counter_samples=4)
+    assert buf.getvalue() == expected.getvalue()
+    assert '"ph": "C", "name": "kv_cache"' in buf.getvalue()
+
+
+def test_counters_spread_over_shards_match_serial():
+    track = CounterTrack("kv_cache")
+    # samples fall in every shard, between shards and after the last event
+    for i in range(40):
+        track.append(i * 7_777, {"cache_size_bytes": i})
+    events = _events(250)
+    buf = StringIO()
+    export_chrome_trace_parallel(events, buf, max_workers=2, shard_size=32, counters=[track])
+    expected = StringIO()
+    export_chrome_trace(events, expected, counters=[track])
+    assert buf.getvalue() == expected.getvalue()
+
+
+def test_columns_input_matches_serial(tmp_path):
+    src = tmp_path / "in.json"
+    export_chrome_trace(_events(300), src)
+    cols = load_chrome_columns(src)
+    out = tmp_path / "out.json"
+    export_chrome_trace_parallel(cols, out, max_workers=2, shard_size=50)
+    assert out.read_text() == _serial(cols.to_events())
+
+
+def test_small_inputs_and_empty():
+    for events in ([], _events(10)):
+        buf = StringIO()
+        export_chrome_trace_parallel(events, buf, max_workers=4, shard_size=100)
+        assert buf.getvalue() == _serial(events)
+
+
+def test_warns_on_unknown_category_in_main_process():
+    events = _events(20) + [TraceEvent("x", "odd", 0, 1, "bogus", "s")]
+    with pytest.warns(UserWarning, match="Unknown category 'bogus' in event 'odd'"):
+        export_chrome_trace_parallel(events, StringIO(), max_workers=2, shard_size=8)
+
+
+def test_scope_templates_match_serial():
+    events = [
+        TraceEvent(str(i), "fwd", i, i + 1, "compute", "decode.token.{}", scope_arg=i)
+        for i in range(300)
+    ]
+    buf = StringIO()
+    export_chrome_trace_parallel(events, buf, max_workers=2, shard_size=64)
+    assert buf.getvalue() == _serial(events)
+    assert '"scope": "decode.token.299"' in buf.getvalue()
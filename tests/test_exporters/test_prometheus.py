@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import urllib.request
+
+from argus.core.tracer import Tracer
+from argus.exporters.prometheus import (
+    MetricsAggregator,
+    MetricsServer,
+    start_metrics_server,
+)
+
+
+def _sample(text: str, prefix: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{prefix} not in output")
+
+
+def test_histogram_buckets_cumulative(make_event):
+    agg = MetricsAggregator(buckets=(0.001, 0.01))
+    for end_ns in (500_000, 1_000_000, 5_000_000, 50_000_000):
+        agg(make_event(name="forward_pass", start_ns=0, end_ns=end_ns))
+    text = agg.render()
+    labels = 'name="forward_pass",category="compute"'
+    assert _sample(text, f'argus_span_duration_seconds_bucket{{{labels},le="0.001"}}') == 2
+    assert _sample(text, f'argus_span_duration_seconds_bucket{{{labels},le="0.01"}}') == 3
+    assert _sample(text, f'argus_span_duration_seconds_bucket{{{labels},le="+Inf"}}') == 4
+    assert _sample(text, f"argus_span_duration_seconds_count{{{labels}}}") == 4
+    assert _sample(text, f"argus_span_duration_seconds_sum{{{labels}}}") == 0.0565
+
+
+def test_tokens_counter(make_event):
+    agg = MetricsAggregator()
+    for i in range(3):
+        agg(make_event(name="token_generate", category="token", token_index=i))
+    assert _sample(agg.render(), "argus_tokens_generated_total") == 3
+
+
+def test_kv_cache_gauge_from_tracer():
+    t = Tracer()
+    agg = MetricsAggregator().attach(t)
+    for i, size in enumerate((1024, 2048)):
+        t.instant(
+            "kv_cache_grow",
+            category="memory",
+            token_index=i,
+            metadata={"cache_size_bytes": size, "num_layers": 2, "token_index": i},
+        )
+    text = agg.render()
+    series = 'argus_counter_value{name="kv_cache_grow",series="cache_size_bytes"}'
+    assert _sample(text, series) == 2048
+    assert 'series="token_index"' not in text
+    assert "kv_cache_grow" not in text.split("argus_counter_value")[0]
+
+
+def test_attach_receives_spans_and_detach_stops():
+    t = Tracer()
+    agg = MetricsAggregator().attach(t)
+    with t.span("op"):
+        pass
+    agg.detach(t)
+    with t.span("op"):
+        pass
+    text = agg.render()
+    assert _sample(text, 'argus_span_duration_seconds_count{name="op",category="compute"}') == 1
+
+
+def test_label_escaping(make_event):
+    agg = MetricsAggregator()
+    agg(make_event(name='we"ird\\name'))
+    assert 'name="we\\"ird\\\\name"' in agg.render()
+
+
+def test_empty_render_is_valid():
+    text = MetricsAggregator().render()
+    assert "argus_tokens_generated_total 0" in text
+    assert text.endswith("\n")
+
+
+def test_server_serves_metrics():
+    t = Tracer()
+    with start_metrics_server(t, port=0) as server:
+        with t.span("token_generate", category="token", token_index=0):
+            pass
+        with urllib.request.urlopen(server.url, timeout=5) as resp:
+            body = resp.read().decode()
+            assert resp.headers["Content-Type"].startswith("text/plain")
+    assert "argus_tokens_generated_total 1" in body
+
+
+def test_server_404_for_other_paths():
+    import urllib.error
+
+    with MetricsServer(MetricsAggregator()).start() as server:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{server.port}/other", timeout=5)
+        except urllib.error.HTTPError as exc:
+            assert exc.code == 404
+        else:
+            raise AssertionError("expected 404")
+
+
+def test_counter_tracks_rendered_as_gauges():
+    t = Tracer()
+    agg = MetricsAggregator().attach(t)
+    t.counter("kv_cache", cache_size_bytes=1024, token_index=0)
+    t.counter("kv_cache", cache_size_bytes=4096, token_index=1)
+    text = agg.render()
+    assert _sample(text, 'argus_counter_value{name="kv_cache",series="cache_size_bytes"}') == 4096
+    assert 'series="token_index"' not in text
+    agg.detach(t)
+    assert "kv_cache" not in agg.render()
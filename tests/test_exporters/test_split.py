@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+
+import pytest
+
+from argus.cli import main
+from argus.core.counters import CounterTrack
+from argus.exporters.chrome import export_chrome_trace
+from argus.exporters.split import load_split_index, split_chrome_trace
+from argus.importers.chrome import load_chrome_trace
+
+if TYPE_CHECKING:
+    from argus.core.events import TraceEvent
+
+
+def _trace(make_event) -> list[TraceEvent]:
+    # decode phase spans 0..3000, three ops inside it, one per 1000 ns
+    events = [
+        make_event(
+            event_id=str(i + 1),
+            name=f"op{i}",
+            start_ns=i * 1_000 + 100,
+            end_ns=i * 1_000 + 200,
+            parent_id="0",
+        )
+        for i in range(3)
+    ]
+    events.append(
+        make_event(event_id="0", name="decode", category="phase", start_ns=0, end_ns=3_000)
+    )
+    return events
+
+
+def test_time_windows_clip_straddling_span(tmp_path, make_event):
+    chunks = split_chrome_trace(_trace(make_event), tmp_path, window_ns=1_000, max_workers=1)
+    # decode ends exactly on the last boundary, so no fourth chunk
+    assert [c.num_events for c in chunks] == [2, 2, 2]
+    assert [c.start_ns for c in chunks] == [0, 1_000, 2_000]
+    assert all(c.phases == ["decode"] for c in chunks)
+    first = load_chrome_trace(tmp_path / chunks[0].file)
+    decode = next(e for e in first if e.name == "decode")
+    assert (decode.start_ns, decode.end_ns) == (0, 1_000)
+    assert decode.metadata["split_start_ns"] == 0
+    assert decode.metadata["split_end_ns"] == 3_000
+    op = next(e for e in first if e.name == "op0")
+    assert op.parent_id == decode.event_id
+    assert "split_start_ns" not in op.metadata
+
+
+def test_counters_are_clipped_per_window(tmp_path, make_event):
+    track = CounterTrack("kv_cache")
+    for ts in (500, 700, 2_500):
+        track.append(ts, {"bytes": ts})
+    chunks = split_chrome_trace(
+        _trace(make_event), tmp_path, window_ns=1_000, max_workers=1, counters=[track]
+    )
+    assert [c.num_counter_samples for c in chunks] == [2, 0, 1]
+    samples = [
+        [
+            (e.start_ns, e.metadata["bytes"])
+            for e in load_chrome_trace(tmp_path / c.file)
+            if e.name == "kv_cache"
+        ]
+        for c in chunks
+    ]
+    # each later window opens with the value in effect at its start
+    assert samples == [[(500, 500), (700, 700)], [(1_000, 700)], [(2_000, 700), (2_500, 2_500)]]
+    assert load_split_index(tmp_path)[0].num_counter_samples == 2
+
+
+def test_counter_samples_alone_make_a_chunk(tmp_path, make_event):
+    track = CounterTrack("queue")
+    track.append(5_000, {"value": 1})
+    events = [make_event(start_ns=0, end_ns=10)]
+    chunks = split_chrome_trace(events, tmp_path, window_ns=1_000, max_workers=1, counters=[track])
+    assert [(c.start_ns, c.num_events, c.num_counter_samples) for c in chunks] == [
+        (0, 1, 0),
+        (5_000, 0, 1),
+    ]
+
+
+def test_event_count_chunks(tmp_path, make_event):
+    events = [make_event(event_id=str(i), start_ns=i * 10, end_ns=i * 10 + 5) for i in range(10)]
+    chunks = split_chrome_trace(events, tmp_path, max_events=4, max_workers=1)
+    assert [c.num_events for c in chunks] == [4, 4, 2]
+    assert sum(c.num_clipped for c in chunks) == 0
+    ids = [e.event_id for c in chunks for e in load_chrome_trace(tmp_path / c.file)]
+    assert ids == [str(i) for i in range(10)]
+
+
+def test_index_file(tmp_path, make_event):
+    chunks = split_chrome_trace(_trace(make_event), tmp_path, window_ns=1_500, max_workers=1)
+    assert load_split_index(tmp_path) == chunks
+    with open(tmp_path / "index.json") as f:
+        index = json.load(f)
+    assert index["window_ns"] == 1_500
+    assert index["chunks"][0]["file"] == "chunk-000000.json"
+
+
+def test_process_pool_matches_serial(tmp_path, make_event):
+    events = [
+        make_event(event_id=str(i), start_ns=i * 7, end_ns=i * 7 + 20, metadata={"i": i})
+        for i in range(500)
+    ]
+    serial = split_chrome_trace(events, tmp_path / "serial", window_ns=300, max_workers=1)
+    parallel = split_chrome_trace(events, tmp_path / "parallel", window_ns=300, max_workers=2)
+    assert serial == parallel
+    for c in serial:
+        a = (tmp_path / "serial" / c.file).read_text()
+        assert a == (tmp_path / "parallel" / c.file).read_text()
+
+
+def test_empty_windows_are_skipped(tmp_path, make_event):
+    events = [
+        make_event(event_id="0", start_ns=0, end_ns=10),
+        make_event(event_id="1", start_ns=10_000, end_ns=10_010),
+    ]
+    chunks = split_chrome_trace(events, tmp_path, window_ns=1_000, max_workers=1)
+    assert [c.start_ns for c in chunks] == [0, 10_000]
+    assert [c.file for c in chunks] == ["chunk-000000.json", "chunk-000001.json"]
+
+
+def test_empty_input_writes_index(tmp_path):
+    assert split_chrome_trace([], tmp_path, window_ns=1_000) == []
+    assert load_split_index(tmp_path) == []
+
+
+@pytest.mark.parametrize("kwargs", [{}, {"window_ns": 1, "max_events": 1}, {"window_ns": 0}])
+def test_rejects_bad_sizes(tmp_path, kwargs, make_event):
+    with pytest.raises(ValueError):
+        split_chrome_trace(_trace(make_event), tmp_path, **kwargs)
+
+
+def test_cli_split(tmp_path, capsys, make_event):
+    src = tmp_path / "trace.json"
+    export_chrome_trace(_trace(make_event), src)
+    rc = main(["split", str(src), "-o", str(tmp_path / "out"), "--window-ms", "0.001", "-j", "1"])
+    assert rc == 0
+    assert len(load_split_index(tmp_path / "out")) == 3
+    assert "chunk-000002.json" in capsys.readouterr().out
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+import argus.hooks.compile as compile_hook
+from argus.core.tracer import Tracer
+from argus.hooks.compile import (
+    COMPILE_SPAN,
+    RECOMPILE_SPAN,
+    CompileTracer,
+    compile_summary,
+)
+
+
+def _compile_args(frame_id: int, frame_compile_id: int):
+    """Stand-in for Dynamo's CallbackArgs."""
+    return SimpleNamespace(
+        compile_id=SimpleNamespace(frame_id=frame_id, frame_compile_id=frame_compile_id)
+    )
+
+
+def _decode(t: Tracer, ct: CompileTracer, compile_at: dict[int, object]) -> None:
+    with t.span("decode", category="phase"):
+        for i in range(4):
+            with t.span("token_generate", category="token", token_index=i), t.span("forward_pass"):
+                if i in compile_at:
+                    ct._on_start(compile_at[i])
+                    ct._on_end()
+
+
+def test_compiles_attributed_to_triggering_token():
+    t = Tracer()
+    ct = CompileTracer(t)
+    _decode(t, ct, {0: _compile_args(0, 0), 2: _compile_args(0, 1)})
+    assert not [e for e in t.events if e.category == "system"]
+    added = ct.stop()
+    assert [(e.name, e.token_index) for e in added] == [(COMPILE_SPAN, 0), (RECOMPILE_SPAN, 2)]
+    forwards = {e.event_id for e in t.events if e.name == "forward_pass"}
+    assert all(e.parent_id in forwards and e.category == "system" for e in added)
+    assert added[1].metadata["frame_compile_id"] == 1
+    assert ct.stop() == []
+
+
+def test_guard_failures_mark_recompile(monkeypatch):
+    utils = SimpleNamespace(
+        guard_failures={"code": []},
+        compilation_time_metrics={"compile_fx_inner": [0.5]},
+    )
+    monkeypatch.setattr(compile_hook, "_dynamo_utils", lambda: utils)
+    t = Tracer()
+    ct = CompileTracer(t)
+    with t.span("token_generate", category="token", token_index=3):
+        ct._on_start()
+        utils.guard_failures["code"].append("tensor 'x' size mismatch at index 0")
+        utils.compilation_time_metrics["compile_fx_inner"].append(0.25)
+        ct._on_end()
+    (event,) = ct.flush()
+    assert event.name == RECOMPILE_SPAN
+    assert event.token_index == 3
+    assert event.metadata["guard_failures"] == "tensor 'x' size mismatch at index 0"
+    assert event.metadata["compile_fx_inner_ns"] == 250_000_000
+
+
+def test_compile_outside_tokens_is_unattributed():
+    t = Tracer()
+    ct = CompileTracer(t)
+    ct._on_start()
+    ct._on_end()
+    ct._on_end()  # unmatched end is ignored
+    (event,) = ct.flush()
+    assert event.parent_id is None and event.token_index is None
+
+
+def test_compile_summary_separates_warmup():
+    t = Tracer()
+    t.record_events(
+        ["token_generate"] * 3,
+        [0, 100, 150],
+        [100, 150, 200],
+        categories="token",
+        token_indices=[0, 1, 2],
+    )
+    t.record_events(
+        [COMPILE_SPAN, RECOMPILE_SPAN],
+        [10, 110],
+        [90, 130],
+        categories="system",
+        token_indices=[0, 1],
+    )
+    summary = compile_summary(t.events)
+    assert (summary.compiles, summary.recompiles, summary.compile_ns) == (2, 1, 100)
+    assert summary.warmup_tokens == [0, 1]
+    assert summary.warmup_mean_ns == 75.0
+    assert summary.steady_mean_ns == 50.0
+
+
+def test_compile_summary_without_compiles():
+    summary = compile_summary([])
+    assert summary.compiles == 0 and summary.warmup_tokens == []
+    assert summary.steady_mean_ns == 0.0
+
+
+@pytest.mark.requires_torch
+def test_compiled_generate_records_compile(tiny_model):
+    import torch
+
+    from argus.hooks.pytorch import trace_generate
+
+    model, input_ids = tiny_model
+    compiled = torch.compile(model, backend="eager")
+    t = Tracer()
+    with CompileTracer(t):
+        trace_generate(compiled, input_ids, t, max_new_tokens=4)
+    compiles = [e for e in t.events if e.name in (COMPILE_SPAN, RECOMPILE_SPAN)]
+    assert compiles
+    # the first compile runs in prefill, before any token span
+    assert compiles[0].parent_id is not None
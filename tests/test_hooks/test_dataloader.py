@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import sys
+import time
+
+import pytest
+
+from argus.core.events import TraceEvent
+from argus.core.tracer import Tracer
+from argus.hooks.dataloader import (
+    COLLATE_SPAN,
+    FETCH_SPAN,
+    WAIT_SPAN,
+    TracedDataLoader,
+    input_stall_summary,
+    trace_dataloader,
+)
+
+
+class FakeFetcher:
+    """Mimics torch's _MapDatasetFetcher: index a dataset, then collate."""
+
+    def __init__(self, dataset, collate_fn) -> None:
+        self.dataset = dataset
+        self.collate_fn = collate_fn
+
+    def fetch(self, index):
+        return self.collate_fn([self.dataset[i] for i in index])
+
+
+class FakeIter:
+    def __init__(self, loader) -> None:
+        self._dataset_fetcher = FakeFetcher(loader.dataset, loader.collate_fn)
+        self._batches = iter(loader.batches)
+
+    def __next__(self):
+        return self._dataset_fetcher.fetch(next(self._batches))
+
+
+class FakeLoader:
+    """Duck-typed single-process DataLoader for testing without torch."""
+
+    def __init__(self, n_items: int = 10, batch_size: int = 2) -> None:
+        self.dataset = list(range(n_items))
+        self.batches = [
+            list(range(i, min(i + batch_size, n_items))) for i in range(0, n_items, batch_size)
+        ]
+        self.num_workers = 0
+        self.collate_fn = sum
+        self.worker_init_fn = None
+        self.pin_memory = False
+
+    def __iter__(self):
+        return FakeIter(self)
+
+    def __len__(self) -> int:
+        return len(self.batches)
+
+
+def test_yields_same_batches():
+    loader = FakeLoader()
+    assert list(TracedDataLoader(loader, Tracer())) == list(map(sum, loader.batches))
+
+
+def test_len_delegates():
+    assert len(trace_dataloader(FakeLoader(n_items=10, batch_size=3), Tracer())) == 4
+
+
+def test_wait_span_per_batch():
+    t = Tracer()
+    list(TracedDataLoader(FakeLoader(), t))
+    waits = [e for e in t.events if e.name == WAIT_SPAN]
+    assert [e.metadata["batch"] for e in waits] == [0, 1, 2, 3, 4]
+    assert all(e.category == "system" for e in waits)
+
+
+def test_fetch_and_collate_spans_in_process():
+    t = Tracer()
+    list(TracedDataLoader(FakeLoader(), t))
+    fetches = [e for e in t.events if e.name == FETCH_SPAN]
+    collates = [e for e in t.events if e.name == COLLATE_SPAN]
+    assert len(fetches) == len(collates) == 5
+    fetch_ids = {e.event_id for e in fetches}
+    assert all(c.parent_id in fetch_ids for c in collates)
+
+
+def test_loader_attributes_restored():
+    loader = FakeLoader()
+    list(TracedDataLoader(loader, Tracer()))
+    assert loader.collate_fn is sum
+    assert loader.worker_init_fn is None
+
+
+def test_wait_spans_nest_under_open_span():
+    t = Tracer()
+    with t.span("epoch", category="phase") as epoch:
+        for _ in TracedDataLoader(FakeLoader(), t):
+            pass
+    waits = [e for e in t.events if e.name == WAIT_SPAN]
+    assert all(e.parent_id == epoch.event_id for e in waits)
+
+
+def test_early_break_is_safe():
+    t = Tracer()
+    for _ in TracedDataLoader(FakeLoader(), t):
+        break
+    assert len([e for e in t.events if e.name == WAIT_SPAN]) == 1
+    assert t._parent_stack == []
+
+
+def _wait(event_id: str, start: int, end: int) -> TraceEvent:
+    return TraceEvent(
+        event_id=event_id,
+        name=WAIT_SPAN,
+        start_ns=start,
+        end_ns=end,
+        category="system",
+        scope="dataloader.main",
+    )
+
+
+def test_stall_summary_fraction():
+    # wait 10, compute 30, wait 10, compute 30, wait 10
+    events = [_wait("0", 0, 10), _wait("1", 40, 50), _wait("2", 80, 90)]
+    s = input_stall_summary(events)
+    assert s.batches == 3
+    assert s.wait_ns == 30
+    assert s.compute_ns == 60
+    assert s.stall_fraction == pytest.approx(30 / 90)
+    assert s.max_wait_ns == 10
+
+
+def test_stall_summary_empty():
+    s = input_stall_summary([])
+    assert s.batches == 0
+    assert s.stall_fraction == 0.0
+
+
+def test_stall_summary_from_traced_loop():
+    t = Tracer()
+    for _ in TracedDataLoader(FakeLoader(), t):
+        time.sleep(0.001)
+    s = input_stall_summary(t.events)
+    assert s.batches == 5
+    assert s.compute_ns >= 4 * 1_000_000
+    assert 0.0 < s.stall_fraction < 0.5
+    assert s.fetch_ns_by_worker[None] > 0
+
+
+def test_no_torch_import_on_module_load():
+    if "torch" in sys.modules:
+        pytest.skip("torch already imported by test infrastructure")
+    assert "argus.hooks.dataloader" in sys.modules
+    assert "torch" not in sys.modules
+
+
+@pytest.mark.requires_torch
+def test_multiworker_dataloader():
+    from torch.utils.data import DataLoader
+
+    t = Tracer()
+    loader = DataLoader([float(i) for i in range(32)], batch_size=4, num_workers=2)
+    with TracedDataLoader(loader, t) as traced:
+        batches = list(traced)
+    assert len(batches) == 8
+    s = input_stall_summary(t.events)
+    assert s.batches == 8
+    assert set(s.fetch_ns_by_worker) == {0, 1}
+    assert s.collate_ns > 0
+
+
+@pytest.mark.requires_torch
+def test_worker_event_ids_unique_across_epochs():
+    from torch.utils.data import DataLoader
+
+    t = Tracer()
+    loader = DataLoader([float(i) for i in range(8)], batch_size=2, num_workers=2)
+    with TracedDataLoader(loader, t) as traced:
+        for _ in range(2):
+            list(traced)
+    ids = [e.event_id for e in t.events]
+    assert len(ids) == len(set(ids))
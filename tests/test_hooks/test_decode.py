@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from argus.core.tracer import Tracer
+from argus.hooks.decode import trace_decode_loop
+
+
+def _counting_loop(t: Tracer, max_new_tokens: int = 4, stop_at: int | None = None, **kwargs):
+    """A 'model' whose state is the last token; it always predicts last + 1."""
+    return trace_decode_loop(
+        lambda: 10,
+        lambda state, token: token,
+        (lambda token, i: token == stop_at) if stop_at is not None else None,
+        tracer=t,
+        sample_fn=lambda state: state + 1,
+        max_new_tokens=max_new_tokens,
+        **kwargs,
+    )
+
+
+def test_yields_tokens_and_builds_span_tree():
+    t = Tracer()
+    assert list(_counting_loop(t)) == [11, 12, 13, 14]
+    by_id = {e.event_id: e for e in t.events}
+    phases = [e.name for e in t.events if e.category == "phase"]
+    assert phases == ["prefill", "decode"]
+    tokens = t.get_events(category="token")
+    assert [e.token_index for e in tokens] == [0, 1, 2, 3]
+    assert all(by_id[e.parent_id].name == "decode" for e in tokens)
+    forwards = [e for e in t.events if e.name == "forward_pass"]
+    assert [e.full_scope for e in forwards] == [
+        "prefill.forward",
+        "decode.token.1.forward",
+        "decode.token.2.forward",
+        "decode.token.3.forward",
+    ]
+    assert [by_id[e.parent_id].token_index for e in forwards[1:]] == [1, 2, 3]
+
+
+def test_streaming_yields_before_next_forward():
+    t = Tracer()
+    gen = _counting_loop(t)
+    assert next(gen) == 11
+    assert [e.name for e in t.events if e.name == "forward_pass"] == ["forward_pass"]
+    assert t.events[-1].name == "token_generate"
+    gen.close()
+    assert t._parent_stack == []
+    assert t.events[-1].name == "decode"
+
+
+def test_stop_fn_ends_after_yielding_stop_token():
+    t = Tracer()
+    assert list(_counting_loop(t, max_new_tokens=10, stop_at=12)) == [11, 12]
+    assert len(t.get_events(category="token")) == 2
+
+
+def test_kv_fn_and_token_counts():
+    t = Tracer()
+    reports = []
+    kv_fn = lambda s, i: reports.append((s, i))  # noqa: E731
+    list(_counting_loop(t, max_new_tokens=3, kv_fn=kv_fn, prompt_len=5, batch_size=2))
+    assert reports == [(10, 0), (11, 1), (12, 2)]
+    forwards = [e.metadata for e in t.events if e.name == "forward_pass"]
+    assert forwards == [
+        {"new_tokens": 5, "past_tokens": 0, "batch_size": 2},
+        {"new_tokens": 1, "past_tokens": 5, "batch_size": 2},
+        {"new_tokens": 1, "past_tokens": 6, "batch_size": 2},
+    ]
+
+
+def test_breaking_out_closes_decode_phase():
+    t = Tracer()
+    for token in _counting_loop(t, max_new_tokens=10):
+        if token == 12:
+            break
+    with t.span("after"):
+        pass
+    decode = next(e for e in t.events if e.name == "decode")
+    assert decode.end_ns >= t.get_events(category="token")[-1].end_ns
+    assert t.events[-1].parent_id is None
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+from argus.core.events import TraceEvent
+from argus.hooks.flops import (
+    FlopsEstimator,
+    ModelShape,
+    annotate_forward_passes,
+    roofline_summary,
+)
+
+_GPT2_CONFIG = SimpleNamespace(n_layer=2, n_embd=64, n_head=4, vocab_size=1000, n_inner=None)
+
+
+def _forward(
+    event_id: str, scope: str, duration_ns: int, new: int, past: int, batch: int = 1
+) -> TraceEvent:
+    metadata = {"new_tokens": new, "past_tokens": past, "batch_size": batch}
+    return TraceEvent(event_id, "forward_pass", 0, duration_ns, "compute", scope, metadata=metadata)
+
+
+def test_shape_from_gpt2_and_llama_configs():
+    gpt2 = ModelShape.from_config(_GPT2_CONFIG)
+    assert (gpt2.num_layers, gpt2.hidden_size, gpt2.intermediate_size) == (2, 64, 256)
+    assert gpt2.num_kv_heads == 4 and not gpt2.gated_mlp
+    llama = ModelShape.from_config(
+        SimpleNamespace(
+            num_hidden_layers=4,
+            hidden_size=128,
+            num_attention_heads=8,
+            num_key_value_heads=2,
+            vocab_size=500,
+            intermediate_size=256,
+            hidden_act="silu",
+        ),
+        bytes_per_param=4,
+    )
+    assert (llama.num_kv_heads, llama.gated_mlp, llama.bytes_per_param) == (2, True, 4)
+    with pytest.raises(ValueError, match="vocab_size"):
+        ModelShape.from_config(SimpleNamespace(n_layer=1, n_embd=8, n_head=1))
+
+
+def test_flops_and_bytes_formulas():
+    est = FlopsEstimator(ModelShape.from_config(_GPT2_CONFIG))
+    h, layers = 64, 2
+    params = layers * (4 * h * h + 2 * h * 4 * h) + h * 1000
+    # one token after 9 cached ones attends to 10 positions
+    assert est.flops(1, 9) == 2 * params + 10 * 4 * h * layers
+    # a 3-token prefill makes 1 + 2 + 3 causal pairs
+    assert est.flops(3) == 3 * 2 * params + 6 * 4 * h * layers
+    assert est.bytes_moved(1, 9) == 2 * params + 10 * 2 * layers * h * 2
+
+
+def test_annotate_adds_throughput_to_forward_passes_only():
+    est = FlopsEstimator(ModelShape.from_config(_GPT2_CONFIG))
+    other = TraceEvent("9", "token_generate", 0, 10, "token", "decode.token.0")
+    fwd = _forward("1", "decode.token.{}.forward", 1_000_000, 1, 9)
+    out_other, out_fwd = annotate_forward_passes([other, fwd], est)
+    assert out_other is other
+    meta = out_fwd.metadata
+    assert meta["flops"] == est.flops(1, 9)
+    assert meta["gflops_per_s"] == pytest.approx(meta["flops"] / 1e-3 / 1e9)
+    assert meta["arithmetic_intensity"] == pytest.approx(meta["flops"] / meta["bytes_moved"])
+    assert "flops" not in fwd.metadata
+
+
+def test_batch_scales_flops_and_kv_bytes():
+    est = FlopsEstimator(ModelShape.from_config(_GPT2_CONFIG))
+    assert est.flops(1, 9, batch_size=4) == 4 * est.flops(1, 9)
+    kv = est.bytes_moved(1, 9) - est.bytes_moved(0, 0)
+    assert est.bytes_moved(1, 9, batch_size=4) == est.bytes_moved(0, 0) + 4 * kv
+    (out,) = annotate_forward_passes(
+        [_forward("1", "decode.token.{}.forward", 1_000, 1, 9, 4)], est
+    )
+    assert out.metadata["flops"] == 4 * est.flops(1, 9)
+
+
+def test_roofline_summary_classifies_phases():
+    est = FlopsEstimator(ModelShape.from_config(_GPT2_CONFIG))
+    events = annotate_forward_passes(
+        [
+            _forward("0", "prefill.forward", 2_000_000, 512, 0),
+            _forward("1", "decode.token.{}.forward", 100_000, 1, 512),
+            _forward("2", "decode.token.{}.forward", 100_000, 1, 513),
+        ],
+        est,
+    )
+    prefill, decode = roofline_summary(events, peak_gflops=1000.0, peak_gbytes_per_s=100.0)
+    assert (prefill.phase, prefill.forward_passes, prefill.bound) == ("prefill", 1, "compute")
+    assert (decode.phase, decode.forward_passes, decode.bound) == ("decode", 2, "memory")
+    assert decode.duration_ns == 200_000
+    assert decode.utilization == pytest.approx(decode.gbytes_per_s / 100.0)
+    assert roofline_summary(events)[0].bound is None
+
+
+def test_no_torch_import_on_module_load():
+    assert "torch" not in sys.modules
+
+
+@pytest.mark.requires_torch
+def test_trace_generate_forward_passes_annotated(tiny_model):
+    from argus.core.tracer import Tracer
+    from argus.hooks.pytorch import trace_generate
+
+    model, input_ids = tiny_model
+    t = Tracer()
+    trace_generate(model, input_ids, tracer=t, max_new_tokens=3)
+    events = annotate_forward_passes(t.events, FlopsEstimator.from_model(model))
+    forwards = [e for e in events if e.name == "forward_pass"]
+    assert forwards and all(e.metadata["flops"] > 0 for e in forwards)
+    assert {s.phase for s in roofline_summary(events)} == {"prefill", "decode"}
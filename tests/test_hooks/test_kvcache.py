@@ -3,6 +3,7 @@ from __future__ import annotations
 import sys
 
 from argus.core.tracer import Tracer
+from argus.hooks.decode import trace_decode_loop
 from argus.hooks.kvcache import KVCacheTracker, _compute_kv_cache_bytes
 
 
@@ -27,52 +28,54 @@ def _make_kv(num_layers: int = 2, numel: int = 1024, elem_size: int = 2):
     )
 
 
-def test_kvcache_tracker_creates_event():
+def test_kvcache_tracker_records_counter_not_event():
     t = Tracer()
     tracker = KVCacheTracker(t)
-    tracker.record(_make_kv(), token_index=0)
-    assert len(t._events) == 1
+    tracker.record(_make_kv())
+    assert t.events == []
+    assert len(t.counters["kv_cache"]) == 1
 
 
-def test_kvcache_event_category():
+def test_kvcache_counter_series():
     t = Tracer()
     tracker = KVCacheTracker(t)
-    tracker.record(_make_kv(), token_index=0)
-    assert t._events[0].category == "memory"
+    tracker.record(_make_kv(num_layers=3, numel=512, elem_size=4))
+    sample = t.counters["kv_cache"].last()
+    assert sample == {
+        "cache_size_bytes": 3 * 2 * 512 * 4,  # 3 layers, 2 tensors each
+        "num_layers": 3,
+    }
 
 
-def test_kvcache_event_name():
-    t = Tracer()
-    tracker = KVCacheTracker(t)
-    tracker.record(_make_kv(), token_index=0)
-    assert t._events[0].name == "kv_cache_grow"
-
-
-def test_kvcache_event_scope():
-    t = Tracer()
-    tracker = KVCacheTracker(t)
-    tracker.record(_make_kv(), token_index=5)
-    assert t._events[0].scope == "decode.token.5"
-
-
-def test_kvcache_event_metadata():
+def test_kvcache_multiple_tokens():
     t = Tracer()
     tracker = KVCacheTracker(t)
-    tracker.record(_make_kv(num_layers=3, numel=512, elem_size=4), token_index=2)
-    meta = t._events[0].metadata
-    assert meta["cache_size_bytes"] == 3 * 2 * 512 * 4  # 3 layers, 2 tensors each
-    assert meta["num_layers"] == 3
-    assert meta["token_index"] == 2
+    for _ in range(10):
+        tracker.record(_make_kv())
+    track = t.counters["kv_cache"]
+    assert len(track) == 10
+    assert set(track.series) == {"cache_size_bytes", "num_layers"}
+    assert list(track.timestamps) == sorted(track.timestamps)
 
 
-def test_kvcache_multiple_tokens():
+def test_kvcache_tracker_as_decode_kv_fn():
     t = Tracer()
     tracker = KVCacheTracker(t)
-    for i in range(10):
-        tracker.record(_make_kv(), token_index=i)
-    assert len(t._events) == 10
-    for i, event in enumerate(t._events):
-        assert event.token_index == i
+    # the model state is the cache itself, one layer longer per forward pass
+    tokens = trace_decode_loop(
+        lambda: _make_kv(num_layers=1),
+        lambda state, token: _make_kv(num_layers=len(state) + 1),
+        None,
+        tracer=t,
+        sample_fn=len,
+        max_new_tokens=3,
+        kv_fn=tracker.record,
+    )
+    assert list(tokens) == [1, 2, 3]
+    # after prefill and after each decode forward pass
+    assert list(t.counters["kv_cache"].series["num_layers"]) == [1, 2, 3]
+    tracker.record(_make_kv(), token_index=3)
+    assert len(t.counters["kv_cache"]) == 4
 
 
 def test_kvcache_monotonic_growth():
@@ -81,8 +84,8 @@ def test_kvcache_monotonic_growth():
     for i in range(5):
         # each step adds more elements to simulate growing cache
         kv = _make_kv(num_layers=2, numel=1024 * (i + 1))
-        tracker.record(kv, token_index=i)
-    sizes = [e.metadata["cache_size_bytes"] for e in t._events]
+        tracker.record(kv)
+    sizes = list(t.counters["kv_cache"].series["cache_size_bytes"])
     for i in range(1, len(sizes)):
         assert sizes[i] >= sizes[i - 1]
 
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+from argus.core.tracer import Tracer
+from argus.hooks.profiler import SYNC_MARKER, ingest_profiler_events
+
+
+def _op(name: str, start_us: float, end_us: float, parent=None, self_us: float = 0.0):
+    """Stand-in for a torch.autograd.profiler FunctionEvent (times in profiler us)."""
+    return SimpleNamespace(
+        name=name,
+        time_range=SimpleNamespace(start=start_us, end=end_us),
+        cpu_parent=parent,
+        self_cpu_time_total=self_us,
+    )
+
+
+def _recorded(t: Tracer, name: str, start_ns: int, end_ns: int, **kwargs):
+    (event,) = t.record_events([name], [start_ns], [end_ns], **kwargs)
+    return event
+
+
+def test_ops_aligned_parented_and_attributed():
+    t = Tracer()
+    token = _recorded(
+        t,
+        "token_generate",
+        1_000_000,
+        2_000_000,
+        categories="token",
+        scopes="decode.token.{}",
+        token_indices=[4],
+        scope_args=[4],
+    )
+    fwd = _recorded(
+        t,
+        "forward_pass",
+        1_100_000,
+        1_900_000,
+        scopes="decode.token.{}.forward",
+        parents=[token.event_id],
+        scope_args=[4],
+    )
+    # marker midpoint 11 us read as 1_001_000 ns: profiler t us -> t * 1000 + 990_000 ns
+    marker = _op(SYNC_MARKER, 10.0, 12.0)
+    sync_ns = 1_001_000
+    linear = _op("aten::linear", 200.0, 600.0, self_us=50.0)
+    addmm = _op("aten::addmm", 250.0, 550.0, parent=linear, self_us=300.0)
+    outside = _op("aten::argmax", 950.0, 960.0)
+    ops = ingest_profiler_events(t, [marker, addmm, linear, outside], sync_ns)
+
+    assert [e.name for e in ops] == ["aten::linear", "aten::addmm", "aten::argmax"]
+    lin, mm, arg = ops
+    assert (lin.start_ns, lin.end_ns) == (1_190_000, 1_590_000)
+    assert lin.parent_id == fwd.event_id
+    assert mm.parent_id == lin.event_id
+    assert arg.parent_id == token.event_id
+    assert all(e.category == "kernel" and e.token_index == 4 for e in ops)
+    assert lin.full_scope == mm.full_scope == "decode.token.4.forward"
+    assert mm.metadata == {"self_ns": 300_000}
+    assert SYNC_MARKER not in {e.name for e in t.events}
+
+
+def test_op_outside_every_span_is_unparented():
+    t = Tracer()
+    marker = _op(SYNC_MARKER, 0.0, 0.0)
+    (op,) = ingest_profiler_events(t, [marker, _op("aten::empty", 1.0, 2.0)], 5_000)
+    assert op.parent_id is None
+    assert op.token_index is None
+    assert (op.start_ns, op.scope) == (6_000, "ops")
+
+
+def test_missing_marker_raises():
+    with pytest.raises(ValueError, match=SYNC_MARKER):
+        ingest_profiler_events(Tracer(), [_op("aten::mm", 0.0, 1.0)], 0)
+
+
+def test_no_torch_import_on_module_load():
+    assert "torch" not in sys.modules
+
+
+@pytest.mark.requires_torch
+def test_profile_generate_adds_kernel_events(tiny_model):
+    from argus.hooks.profiler import profile_generate
+
+    model, input_ids = tiny_model
+    t = Tracer()
+    profile_generate(model, input_ids, tracer=t, max_new_tokens=3)
+    kernels = t.get_events(category="kernel")
+    assert kernels
+    by_id = {e.event_id: e for e in t.events}
+    forwards = [
+        e for e in kernels if e.parent_id in by_id and by_id[e.parent_id].name == "forward_pass"
+    ]
+    assert forwards
+    for op in forwards:
+        parent = by_id[op.parent_id]
+        assert parent.start_ns <= op.start_ns and op.end_ns <= parent.end_ns
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import pytest
+
+from argus.core.tracer import Tracer
+from argus.hooks.speculative import (
+    ACCEPT_SPAN,
+    REJECT_SPAN,
+    STEP_SPAN,
+    speculative_summary,
+    trace_speculative_loop,
+)
+
+TARGET = [10, 11, 12, 13, 14, 15, 16, 17, 18, 19]
+
+
+def _run(t: Tracer, draft_seq: list[int], max_new_tokens: int = 10, draft_length: int = 3):
+    """Speculate over TARGET with a draft model that would produce `draft_seq`."""
+    pos = 0
+    commits = []
+
+    def prefill() -> int:
+        return TARGET[0]
+
+    def propose(k: int) -> list[int]:
+        return draft_seq[pos + 1 : pos + 1 + k]
+
+    def verify(drafts: list[int]) -> tuple[int, int]:
+        accepted = 0
+        while accepted < len(drafts) and drafts[accepted] == TARGET[pos + 1 + accepted]:
+            accepted += 1
+        return accepted, TARGET[pos + 1 + accepted]
+
+    def commit(drafts: list[int], accepted: int, token: int) -> None:
+        nonlocal pos
+        pos += accepted + 1
+        commits.append((accepted, token))
+
+    tokens = list(
+        trace_speculative_loop(
+            prefill,
+            propose,
+            verify,
+            tracer=t,
+            draft_length=draft_length,
+            max_new_tokens=max_new_tokens,
+            commit_fn=commit,
+        )
+    )
+    return tokens, commits
+
+
+def test_loop_reproduces_target_sequence():
+    t = Tracer()
+    draft_seq = [10, 11, 12, 0, 14, 15, 16, 17, 0, 19]
+    tokens, commits = _run(t, draft_seq)
+    assert tokens == TARGET
+    assert commits[0] == (2, 13)
+    steps = [e for e in t.events if e.name == STEP_SPAN]
+    # the last step has room for no drafts: a plain target forward
+    assert [e.token_index for e in steps] == [1, 4, 8, 9]
+    assert [e.metadata["accepted"] for e in steps] == [2, 3, 0, 0]
+    assert [e.metadata["drafted"] for e in steps] == [3, 3, 1, 0]
+    names = [e.name for e in t.events if e.name in (ACCEPT_SPAN, REJECT_SPAN)]
+    assert names == [REJECT_SPAN, ACCEPT_SPAN, REJECT_SPAN, ACCEPT_SPAN]
+    assert len(t.counters["speculative"].timestamps) == 4
+
+
+def test_loop_respects_max_new_tokens():
+    t = Tracer()
+    tokens, _ = _run(t, TARGET, max_new_tokens=3)
+    assert tokens == TARGET[:3]
+    assert _run(Tracer(), TARGET, max_new_tokens=0)[0] == []
+
+
+def test_stop_fn_ends_mid_step():
+    t = Tracer()
+    tokens = list(
+        trace_speculative_loop(
+            lambda: 0,
+            lambda k: [1, 2, 3][:k],
+            lambda drafts: (len(drafts), 4),
+            lambda token, i: token == 2,
+            tracer=t,
+        )
+    )
+    assert tokens == [0, 1, 2]
+
+
+def test_summary_from_steps():
+    t = Tracer()
+    steps = t.record_events(
+        [STEP_SPAN, STEP_SPAN],
+        [0, 1_000],
+        [1_000, 2_000],
+        metadata=[{"drafted": 4, "accepted": 4}, {"drafted": 4, "accepted": 0}],
+    )
+    t.record_events(
+        ["verify", "verify"],
+        [500, 1_500],
+        [900, 1_900],
+        parents=[steps[0].event_id, steps[1].event_id],
+    )
+    summary = speculative_summary(t.events)
+    assert (summary.steps, summary.drafted, summary.accepted) == (2, 8, 4)
+    assert summary.acceptance_lengths == [4, 0]
+    assert summary.acceptance_rate == 0.5
+    assert summary.mean_acceptance_length == 2.0
+    assert summary.tokens_per_forward == 3.0
+    assert summary.ns_per_token == pytest.approx(2_000 / 6)
+    # no baseline: one verify (400 ns) stands in for a greedy token
+    assert summary.speedup == pytest.approx(400 / (2_000 / 6))
+
+    baseline = Tracer()
+    baseline.record_events(["token_generate"] * 2, [0, 500], [500, 1_500], categories="token")
+    assert speculative_summary(t.events, baseline.events).speedup == pytest.approx(
+        750 / (2_000 / 6)
+    )
+
+
+def test_summary_without_steps():
+    summary = speculative_summary([])
+    assert summary.steps == 0 and summary.speedup is None
+    assert summary.acceptance_rate == 0.0
+
+
+@pytest.mark.requires_torch
+def test_speculative_generate_matches_greedy(tiny_model):
+    from argus.hooks.pytorch import trace_generate
+    from argus.hooks.speculative import trace_speculative_generate
+
+    model, input_ids = tiny_model
+    greedy = trace_generate(model, input_ids, Tracer(), max_new_tokens=9)
+    t = Tracer()
+    out = trace_speculative_generate(model, model, input_ids, t, max_new_tokens=9)
+    assert out.tolist() == greedy.tolist()
+    summary = speculative_summary(t.events)
+    # the draft is the target, so every proposal is accepted
+    assert summary.acceptance_rate == 1.0
+
+
+@pytest.mark.requires_torch
+def test_speculative_generate_rejects_batches(tiny_model):
+    import torch
+
+    from argus.hooks.speculative import trace_speculative_generate
+
+    model, input_ids = tiny_model
+    batch = torch.cat([input_ids, input_ids])
+    with pytest.raises(ValueError, match="batch of 2"):
+        trace_speculative_generate(model, model, batch, Tracer())
@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import json
+from io import StringIO
+from typing import TYPE_CHECKING
+
+import pytest
+
+from argus.exporters.chrome import export_chrome_trace
+from argus.importers.chrome import (
+    iter_chrome_events,
+    iter_chrome_trace,
+    load_chrome_columns,
+    load_chrome_trace,
+)
+
+if TYPE_CHECKING:
+    from argus.core.events import TraceEvent
+
+
+def _exported(events: list[TraceEvent]) -> str:
+    sio = StringIO()
+    export_chrome_trace(events, sio)
+    return sio.getvalue()
+
+
+def test_iter_matches_json_load(make_event):
+    events = [make_event(event_id=str(i), start_ns=i * 1000) for i in range(100)]
+    raw = _exported(events)
+    assert list(iter_chrome_events(StringIO(raw))) == json.loads(raw)["traceEvents"]
+
+
+def test_iter_small_chunks(make_event):
+    events = [make_event(event_id=str(i), metadata={"k": "x" * 50}) for i in range(50)]
+    raw = _exported(events)
+    streamed = list(iter_chrome_events(StringIO(raw), chunk_size=7))
+    assert streamed == json.loads(raw)["traceEvents"]
+
+
+def test_iter_empty_trace():
+    assert list(iter_chrome_events(StringIO(_exported([])))) == []
+
+
+def test_iter_bare_array_form():
+    raw = json.dumps([{"ph": "X", "name": "a"}, {"ph": "X", "name": "b"}])
+    assert [e["name"] for e in iter_chrome_events(StringIO(raw), chunk_size=3)] == ["a", "b"]
+
+
+def test_iter_trace_events_not_first_key():
+    raw = json.dumps({"metadata": {"traceEvents": "decoy"}, "traceEvents": [{"name": "real"}]})
+    assert [e["name"] for e in iter_chrome_events(StringIO(raw), chunk_size=5)] == ["real"]
+
+
+def test_iter_object_without_events():
+    assert list(iter_chrome_events(StringIO('{"displayTimeUnit": "ns"}'))) == []
+
+
+def test_iter_from_path(tmp_path, make_event):
+    path = tmp_path / "trace.json"
+    export_chrome_trace([make_event()], path)
+    assert len(list(iter_chrome_events(path))) == 1
+    assert len(list(iter_chrome_events(str(path)))) == 1
+
+
+def test_iter_rejects_non_trace():
+    with pytest.raises(ValueError):
+        list(iter_chrome_events(StringIO('"just a string"')))
+
+
+def test_iter_truncated_event_raises(make_event):
+    raw = _exported([make_event()])
+    raw = raw[: raw.index('"args"') + 10]
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_chrome_events(StringIO(raw)))
+
+
+def test_iter_unclosed_array_raises(make_event):
+    raw = _exported([make_event()])
+    raw = raw[: raw.index("]")]
+    with pytest.raises(ValueError, match="Truncated"):
+        list(iter_chrome_events(StringIO(raw)))
+
+
+@pytest.fixture
+def sample_events(make_event) -> list[TraceEvent]:
+    return [
+        make_event(event_id="0", name="forward_pass", start_ns=1_500, end_ns=4_250),
+        make_event(
+            event_id="1",
+            name="token_generate",
+            category="token",
+            scope="decode.token.3",
+            start_ns=1_000,
+            end_ns=5_000,
+            token_index=3,
+            metadata={"token_id": 42},
+        ),
+        make_event(
+            event_id="2",
+            name="kv_cache_grow",
+            category="memory",
+            scope="decode.token.3",
+            start_ns=4_500,
+            end_ns=4_500,
+            parent_id="1",
+            token_index=3,
+            metadata={"cache_size_bytes": 4096},
+        ),
+    ]
+
+
+def test_round_trip_events(sample_events):
+    assert load_chrome_trace(StringIO(_exported(sample_events))) == sample_events
+
+
+def test_round_trip_streaming(sample_events):
+    loaded = load_chrome_trace(StringIO(_exported(sample_events)), streaming=True)
+    assert loaded == sample_events
+
+
+def test_iter_chrome_trace_yields_events(sample_events):
+    assert (
+        list(iter_chrome_trace(StringIO(_exported(sample_events)), chunk_size=16)) == sample_events
+    )
+
+
+def test_round_trip_large_timestamps(make_event):
+    start = 987_654_321_123_456
+    events = [make_event(start_ns=start, end_ns=start + 123_457)]
+    loaded = load_chrome_trace(StringIO(_exported(events)))
+    assert loaded[0].start_ns == start
+    assert loaded[0].end_ns == start + 123_457
+
+
+def test_counter_event_zero_duration(sample_events):
+    loaded = load_chrome_trace(StringIO(_exported(sample_events)))
+    counter = loaded[2]
+    assert counter.duration_ns == 0
+    assert counter.category == "memory"
+    assert counter.metadata == {"cache_size_bytes": 4096}
+
+
+def test_non_argus_events_get_defaults():
+    raw = json.dumps(
+        {
+            "traceEvents": [
+                {"ph": "M", "name": "process_name", "args": {"name": "x"}},
+                {"ph": "X", "name": "op", "ts": 1.0, "dur": 2.0},
+                {"ph": "B", "name": "begin"},
+            ]
+        }
+    )
+    loaded = load_chrome_trace(StringIO(raw))
+    assert len(loaded) == 1
+    assert loaded[0].event_id == "1"
+    assert loaded[0].scope == ""
+    assert loaded[0].category == "compute"
+    assert loaded[0].duration_ns == 2_000
+
+
+def test_columns_match_events(sample_events):
+    cols = load_chrome_columns(StringIO(_exported(sample_events)))
+    assert len(cols) == 3
+    assert list(cols.start_ns) == [e.start_ns for e in sample_events]
+    assert cols.token_index == [None, 3, 3]
+    assert cols.parent_id == [None, None, "1"]
+    assert cols.to_events() == sample_events
+
+
+def test_columns_streaming(sample_events):
+    cols = load_chrome_columns(StringIO(_exported(sample_events)), streaming=True)
+    assert cols.to_events() == sample_events
+
+
+def test_batch_decode_falls_back_on_nested_args():
+    raw = json.dumps(
+        {"traceEvents": [{"ph": "X", "name": str(i), "args": {"a": {"b": i}}} for i in range(200)]}
+    )
+    names = [e["name"] for e in iter_chrome_events(StringIO(raw), chunk_size=64)]
+    assert names == [str(i) for i in range(200)]
+
+
+def test_event_larger_than_many_chunks_is_parsed_in_few_attempts(monkeypatch):
+    from argus.importers import chrome
+
+    attempts = []
+    raw_decode = chrome._DECODER.raw_decode
+
+    def counting(s, idx=0):
+        attempts.append(idx)
+        return raw_decode(s, idx)
+
+    monkeypatch.setattr(chrome._DECODER, "raw_decode", counting)
+    big = {"ph": "X", "name": "big", "args": {"a": [{"b": "x" * 10}] * 10_000}}
+    raw = json.dumps({"traceEvents": [big]})
+    assert list(iter_chrome_events(StringIO(raw), chunk_size=16)) == [big]
+    # the buffer doubles per retry instead of growing by one chunk
+    assert len(attempts) < 40
+
+
+def test_load_chrome_into_tracer(tmp_path):
+    import argus
+
+    tracer = argus.Tracer()
+    with tracer.span("outer", category="phase"), tracer.span("inner"):
+        pass
+    path = tmp_path / "trace.json"
+    argus.export_chrome(tracer, path)
+    loaded = argus.load_chrome(path)
+    assert loaded.events == tracer.events
+    with loaded.span("after"):
+        pass
+    assert loaded.events[-1].event_id == "2"
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from argus.core.events import TraceEvent
+from argus.exporters.chrome import export_chrome_trace
+
+_LEVELS = [(None, None), ("gzip", 1), ("gzip", 6), ("gzip", 9), ("xz", 0), ("xz", 6)]
+
+
+@pytest.mark.slow
+def test_export_time_vs_size_by_level(tmp_path):
+    """Export time and file size for each compression level; prints a table with -s."""
+    events = [
+        TraceEvent(
+            event_id=str(i),
+            name="attn" if i % 2 else "mlp",
+            start_ns=i * 1_000,
+            end_ns=i * 1_000 + 700,
+            category="compute",
+            scope=f"model.layers.{i % 24}.self_attn",
+            parent_id=str(i - i % 50),
+            token_index=i // 50,
+        )
+        for i in range(100_000)
+    ]
+    results = []
+    for compression, level in _LEVELS:
+        path = tmp_path / f"trace-{compression}-{level}.json"
+        start = time.perf_counter()
+        export_chrome_trace(events, path, compression=compression, level=level)
+        elapsed = time.perf_counter() - start
+        results.append((compression or "none", level, elapsed, path.stat().st_size))
+
+    raw_size = results[0][3]
+    print(f"\n{'codec':<6}{'level':>6}{'seconds':>10}{'MB':>9}{'ratio':>8}")
+    for codec, level, elapsed, size in results:
+        shown = "-" if level is None else level
+        print(f"{codec:<6}{shown:>6}{elapsed:>10.3f}{size / 1e6:>9.2f}{raw_size / size:>8.1f}")
+    # repetitive traces must compress well even at the fastest gzip level
+    assert raw_size / results[1][3] > 8
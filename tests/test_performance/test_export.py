@@ -28,3 +28,59 @@ def test_export_10k_events_time():
     export_chrome_trace(events, sio)
     elapsed_ms = (time.monotonic_ns() - start) / 1_000_000
     assert elapsed_ms < 500, f"Export time: {elapsed_ms:.0f} ms (limit: 500 ms)"
+
+
+@pytest.mark.slow
+def test_parallel_export_scales():
+    """With 4+ cores the process-pool exporter must be at least 2x the serial one."""
+    import os
+
+    from argus.exporters.parallel import export_chrome_trace_parallel
+
+    cores = min(os.cpu_count() or 1, 8)
+    if cores < 4:
+        pytest.skip("needs at least 4 cores")
+    events = [
+        TraceEvent(
+            event_id=str(i),
+            name="test",
+            start_ns=i * 1000,
+            end_ns=i * 1000 + 500,
+            category="compute",
+            scope="layer.0.attn",
+            metadata={"i": i},
+        )
+        for i in range(400_000)
+    ]
+    start = time.perf_counter()
+    export_chrome_trace(events, StringIO())
+    serial = time.perf_counter() - start
+    start = time.perf_counter()
+    export_chrome_trace_parallel(events, StringIO(), max_workers=cores)
+    parallel = time.perf_counter() - start
+    assert serial / parallel > 2.0, f"speedup {serial / parallel:.2f}x on {cores} cores"
+
+
+@pytest.mark.slow
+def test_npz_export_1m_events_time(tmp_path):
+    """Columnar export of 1M events must take < 10 s (JSON-free path for dataframes)."""
+    from argus.exporters.columnar import export_npz
+
+    events = [
+        TraceEvent(
+            event_id=str(i),
+            name="forward_pass" if i % 2 else "token_generate",
+            start_ns=i * 1000,
+            end_ns=i * 1000 + 500,
+            category="compute" if i % 2 else "token",
+            scope=f"decode.token.{i // 2}",
+            parent_id=str(i - 1) if i % 2 else None,
+            token_index=i // 2,
+            metadata={"cache_size_bytes": i},
+        )
+        for i in range(1_000_000)
+    ]
+    start = time.monotonic_ns()
+    export_npz(events, tmp_path / "t.npz")
+    elapsed_s = (time.monotonic_ns() - start) / 1e9
+    assert elapsed_s < 10, f"npz export: {elapsed_s:.1f} s (limit: 10 s)"
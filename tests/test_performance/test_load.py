@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import json
+import time
+from io import StringIO
+
+import pytest
+
+from argus.core.events import TraceEvent
+from argus.exporters.chrome import export_chrome_trace
+from argus.importers.chrome import load_chrome_columns, load_chrome_trace
+
+
+def _trace_text(n: int) -> str:
+    events = [
+        TraceEvent(
+            event_id=str(i),
+            name="forward_pass",
+            start_ns=i * 1000,
+            end_ns=i * 1000 + 500,
+            category="compute",
+            scope=f"decode.token.{i}.forward",
+            parent_id=str(i + 1),
+            token_index=i,
+        )
+        for i in range(n)
+    ]
+    sio = StringIO()
+    export_chrome_trace(events, sio)
+    return sio.getvalue()
+
+
+def _best_of(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+@pytest.mark.slow
+def test_load_throughput_vs_json_load():
+    """Loading into TraceEvents must stay within 4x of a bare json.load."""
+    raw = _trace_text(50_000)
+    baseline = _best_of(lambda: json.load(StringIO(raw)))
+    loaded = _best_of(lambda: load_chrome_trace(StringIO(raw)))
+    streamed = _best_of(lambda: load_chrome_trace(StringIO(raw), streaming=True))
+    columns = _best_of(lambda: load_chrome_columns(StringIO(raw), streaming=True))
+    for label, elapsed in (("load", loaded), ("stream", streamed), ("columns", columns)):
+        ratio = elapsed / baseline
+        assert ratio < 4, f"{label}: {ratio:.1f}x json.load (limit: 4x)"
+
+
+@pytest.mark.slow
+def test_record_events_bulk_vs_per_event():
+    """Bulk ingestion of 1M events must take under 40% of the time of 1M record_event calls."""
+    from argus.core.tracer import Tracer
+
+    n = 1_000_000
+    names = ["kernel"] * n
+    starts = list(range(0, 10 * n, 10))
+    ends = [s + 5 for s in starts]
+
+    def per_event() -> None:
+        t = Tracer()
+        for i in range(n):
+            t.record_event(TraceEvent(str(i), names[i], starts[i], ends[i], "kernel", "gpu"))
+
+    def bulk() -> None:
+        Tracer().record_events(names, starts, ends, "kernel", "gpu")
+
+    slow, fast = _best_of(per_event, 1), _best_of(bulk, 1)
+    assert fast < 0.4 * slow, f"bulk {fast:.2f}s vs per-event {slow:.2f}s"
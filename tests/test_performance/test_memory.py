@@ -21,3 +21,28 @@ def test_memory_per_event():
     )
     size = sys.getsizeof(event)
     assert size < 512, f"Event size: {size} bytes (limit: 512)"
+
+
+@pytest.mark.slow
+def test_scope_templates_allocate_less_than_fstrings():
+    """Templated per-token scopes must retain less memory than formatted ones."""
+    import tracemalloc
+
+    from argus.core.tracer import Tracer
+
+    def retained(templated: bool) -> int:
+        t = Tracer()
+        tracemalloc.start()
+        for i in range(20_000):
+            if templated:
+                span = t.span("forward_pass", scope="decode.token.{}.forward", scope_arg=i)
+            else:
+                span = t.span("forward_pass", scope=f"decode.token.{i}.forward")
+            with span:
+                pass
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        assert len(t.events) == 20_000
+        return size
+
+    assert retained(templated=True) < retained(templated=False)
@@ -41,3 +41,126 @@ def test_clock_read_overhead():
     elapsed = time.monotonic_ns() - start
     per_call = elapsed / n
     assert per_call < 200, f"Clock overhead: {per_call:.0f} ns (limit: 200 ns)"
+
+
+@pytest.mark.slow
+def test_ring_span_overhead_vs_tracer():
+    """Shared-memory ring spans must cost no more than 1.5x an in-process span."""
+    from argus.core.shm import SharedMemoryCollector
+
+    n = 50_000
+    with SharedMemoryCollector(capacity=n) as collector:
+        handle = collector.handle(0)
+        tracer = Tracer()
+        for _ in range(1_000):
+            with tracer.span("warmup"):
+                pass
+        tracer.reset()
+        start = time.monotonic_ns()
+        for _ in range(n):
+            with tracer.span("test", category="compute"):
+                pass
+        in_process = time.monotonic_ns() - start
+        start = time.monotonic_ns()
+        for _ in range(n):
+            with handle.span("test", category="compute"):
+                pass
+        ring = time.monotonic_ns() - start
+        handle.close()
+    ratio = ring / in_process
+    assert ratio < 1.5, f"Ring span cost: {ratio:.2f}x in-process (limit: 1.5x)"
+
+
+@pytest.mark.slow
+def test_counter_cheaper_than_instant():
+    """Tracer.counter must cost at most half of the instant() it replaces."""
+    n = 50_000
+
+    def per_call(record) -> float:
+        for i in range(1_000):
+            record(i)
+        start = time.monotonic_ns()
+        for i in range(n):
+            record(i)
+        return (time.monotonic_ns() - start) / n
+
+    t = Tracer()
+    instant = per_call(
+        lambda i: t.instant(
+            "kv_cache_grow",
+            category="memory",
+            scope=f"decode.token.{i}",
+            token_index=i,
+            metadata={"cache_size_bytes": i, "num_layers": 2, "token_index": i},
+        )
+    )
+    counter = per_call(lambda i: t.counter("kv_cache", cache_size_bytes=i, num_layers=2))
+    assert counter < 0.5 * instant, f"counter {counter:.0f} ns vs instant {instant:.0f} ns"
+
+
+@pytest.mark.slow
+def test_memory_tracer_unmeasured_depth_overhead():
+    """Unmeasured-depth spans are plain spans: < 1.5x their cost (tracemalloc on for both)."""
+    from argus.core.memory import MemoryTracer
+
+    n = 50_000
+
+    def per_span(tracer: Tracer) -> float:
+        with tracer.span("outer"):
+            start = time.monotonic_ns()
+            for _ in range(n):
+                with tracer.span("op"):
+                    pass
+            return (time.monotonic_ns() - start) / n
+
+    with MemoryTracer(depths=(0,)) as memory_tracer:
+        plain = per_span(Tracer())
+        measured = per_span(memory_tracer)
+    assert measured < 1.5 * plain, f"{measured:.0f} ns vs {plain:.0f} ns"
+
+
+@pytest.mark.slow
+def test_decode_loop_overhead_matches_inline_spans():
+    """trace_decode_loop must add < 1.25x the cost of writing the same spans inline."""
+    from argus.hooks.decode import trace_decode_loop
+
+    n = 20_000
+
+    def inline(t: Tracer) -> None:
+        state = 0
+        with t.span("decode", category="phase", scope="decode"):
+            for i in range(n):
+                with t.span(
+                    "token_generate",
+                    category="token",
+                    scope="decode.token.{}",
+                    scope_arg=i,
+                    token_index=i,
+                ):
+                    if i:
+                        with t.span(
+                            "forward_pass",
+                            category="compute",
+                            scope="decode.token.{}.forward",
+                            scope_arg=i,
+                        ):
+                            state = state + 1
+                    _ = state + 1
+
+    def looped(t: Tracer) -> None:
+        for _ in trace_decode_loop(
+            lambda: 0, lambda s, tok: s + 1, tracer=t, sample_fn=lambda s: s + 1, max_new_tokens=n
+        ):
+            pass
+
+    def best(fn) -> float:
+        times = []
+        for _ in range(3):
+            t = Tracer()
+            start = time.perf_counter()
+            fn(t)
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    base, generic = best(inline), best(looped)
+    assert generic < 1.25 * base, f"loop {generic:.3f}s vs inline {base:.3f}s"